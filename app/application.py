@@ -3,31 +3,106 @@ from pathlib import Path
 from litestar import Litestar
 from litestar.config.cors import CORSConfig
 from litestar.contrib.sqlalchemy.plugins import SQLAlchemyPlugin
+from litestar.datastructures import State
+from litestar.di import Provide
 from litestar.openapi import OpenAPIConfig
 from litestar.openapi.spec import Contact
+from loguru import logger
 
 from controllers import GiftController
+from controllers import HealthController
 from controllers import UserController
+from controllers.users import account_deletion_jobs
+from controllers.users import start_account_deletion_job
 from core import setup_logging
 from core.config import settings
+from core.config.database import HealthCheck
+from core.database import READ_YOUR_WRITES_STORE
+from core.database import idle_connection_validation
+from core.database import pin_writer
+from core.database import replica_sqlalchemy_config
+from core.database import run_with_session
 from core.database import sqlalchemy_config
+from core.security import webapp_secret_key
+from dependencies import provide_friend_suggestions
+from dependencies import provide_wishlist_stats
+from dependencies.provide_friend_suggestions import FRIEND_SUGGESTIONS_STORE
+from dependencies.provide_friend_suggestions import friend_suggestions_cache
+from dependencies.provide_idempotency import IDEMPOTENCY_STORE
+from dependencies.provide_wishlist_stats import WISHLIST_STATS_STORE
+from dependencies.provide_wishlist_stats import wishlist_stats_cache
 from exceptions.handlers import get_exception_handlers
+from repositories import warm_up_connections
+from services import UserService
+from utils import BoundedMemoryStore
 
 PARENT_DIR = Path(__file__).resolve().parent
 
 setup_logging()
 
 
+database_configs = [config for config in (sqlalchemy_config, replica_sqlalchemy_config) if config]
+
+
+async def warm_up(app: Litestar) -> None:
+    """Fill the connection pools, prepare the hot statements and derive the auth key before reporting ready.
+
+    A failed warm-up is logged and leaves the app not ready instead of failing startup.
+    """
+    if settings.db.warm_up:
+        try:
+            for config in database_configs:
+                await warm_up_connections(config.create_session_maker(), settings.db.engine.persistent_connections)
+        except Exception as e:  # noqa: BLE001
+            logger.error('Failed to warm up database connections: {}', type(e).__name__)
+            return
+    webapp_secret_key()
+    app.state.ready = True
+
+
+async def resume_account_deletions(app: Litestar) -> None:
+    """Restart the account deletions that the previous shutdown stopped."""
+    try:
+        user_ids = await run_with_session(lambda session: UserService(session).resume_account_deletions())
+    except Exception:  # noqa: BLE001
+        return  # The service has logged it; the deletions are resumed on the next startup.
+    for user_id in user_ids:
+        start_account_deletion_job(user_id, wishlist_stats_cache(app), friend_suggestions_cache(app))
+
+
 cors_config = CORSConfig(
     allow_origins=[settings.app.frontend_host],
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['ETag', 'X-Next-Cursor'],
 )
 
 app = Litestar(
-    route_handlers=[UserController, GiftController],
+    route_handlers=[UserController, GiftController, HealthController],
+    state=State({'ready': False}),
+    on_startup=[warm_up, resume_account_deletions],
+    on_shutdown=[account_deletion_jobs.cancel_all],
+    stores={
+        IDEMPOTENCY_STORE: BoundedMemoryStore(settings.idempotency.max_entries),
+        WISHLIST_STATS_STORE: BoundedMemoryStore(settings.wishlist_stats.max_entries),
+        FRIEND_SUGGESTIONS_STORE: BoundedMemoryStore(settings.friend_suggestions.max_entries),
+        READ_YOUR_WRITES_STORE: BoundedMemoryStore(settings.db.read_your_writes_max_pins),
+    },
+    dependencies={
+        'wishlist_stats': Provide(provide_wishlist_stats, sync_to_thread=False),
+        'friend_suggestions': Provide(provide_friend_suggestions, sync_to_thread=False),
+    },
     cors_config=cors_config,
-    plugins=[SQLAlchemyPlugin(config=sqlalchemy_config)],
+    plugins=[SQLAlchemyPlugin(config=database_configs)],
+    lifespan=[
+        idle_connection_validation(
+            *(config.get_engine for config in database_configs),
+            interval=settings.db.engine.idle_validation_interval,
+        ),
+    ]
+    if settings.db.engine.health_check is HealthCheck.OPTIMISTIC
+    else None,
+    before_request=pin_writer if replica_sqlalchemy_config else None,
     exception_handlers=get_exception_handlers(),
     openapi_config=OpenAPIConfig(
         title=settings.app.title,
@@ -37,6 +112,8 @@ app = Litestar(
             name=settings.app.developer_name,
             email=settings.app.developer_email,
         ),
-    ),
+    )
+    if settings.app.openapi_enabled
+    else None,
     debug=False,
 )
@@ -1,2 +1,3 @@
 from .gifts import GiftController as GiftController
+from .health import HealthController as HealthController
 from .users import UserController as UserController
@@ -1,15 +1,69 @@
+from typing import Annotated
+from typing import Final
+
 from litestar import Controller
+from litestar import Request
+from litestar import Response
 from litestar import delete
 from litestar import get
+from litestar import patch
 from litestar import post
 from litestar.di import Provide
+from litestar.enums import MediaType
+from litestar.params import Parameter
+from litestar.response import Stream
 
+from core.database import run_with_session
+from core.database import stream_with_session
 from dependencies import provide_access_jwt_auth
+from dependencies import provide_gift_read_service
 from dependencies import provide_gift_service
-from domain.gifts import Gift
+from dependencies import provide_idempotency
+from dependencies import provide_read_session
+from domain.gifts import MAX_PRICE
+from domain.gifts import MAX_WISH_RATE
+from domain.gifts import MIN_WISH_RATE
 from dto.gifts import GiftCreateDTO
-from dto.gifts import GiftWithOwnerDTO
+from dto.gifts import GiftFeedResponse
+from dto.gifts import GiftResponse
+from dto.gifts import GiftSearchResponse
+from dto.gifts import GiftSortField
+from dto.gifts import GiftUpdateDTO
+from dto.gifts import GiftWithOwnerResponse
+from dto.gifts import SortOrder
+from dto.gifts import WishlistQueryDTO
+from dto.users import WishlistStatsDTO
 from services import GiftService
+from utils import ArchiveFormat
+from utils import IdempotentRequest
+from utils import MsgspecResponse
+from utils import StoreCache
+from utils import decode_archive
+from utils import decode_cursor
+from utils import encode_archive
+from utils import encode_cursor
+from utils import parse_if_match
+from utils import stream_json_array
+from utils import version_etag
+
+DEFAULT_FEED_LIMIT: Final[int] = 20
+DEFAULT_FEED_PER_FRIEND: Final[int] = 3
+MAX_FEED_LIMIT: Final[int] = 100
+DEFAULT_SEARCH_LIMIT: Final[int] = 20
+MAX_SEARCH_LIMIT: Final[int] = 50
+MAX_SEARCH_OFFSET: Final[int] = 1000
+MAX_SEARCH_QUERY_LENGTH: Final[int] = 100
+MAX_WISHLIST_LIMIT: Final[int] = 100
+NEXT_CURSOR_HEADER: Final[str] = 'X-Next-Cursor'
+
+READ_DEPENDENCIES: Final = {
+    'service': Provide(provide_gift_read_service, sync_to_thread=False),
+    'read_session': Provide(provide_read_session),
+}
+IDEMPOTENT_DEPENDENCIES: Final = {
+    'current_user_id': Provide(provide_access_jwt_auth),
+    'idempotency': Provide(provide_idempotency),
+}
 
 
 class GiftController(Controller):
@@ -20,17 +74,42 @@ class GiftController(Controller):
     @post(
         status_code=201,
         summary='Add gift',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies=IDEMPOTENT_DEPENDENCIES,
     )
     async def add(
         self,
-        service: GiftService,
         data: GiftCreateDTO,
         current_user_id: int,
+        idempotency: IdempotentRequest,
+        wishlist_stats: StoreCache[WishlistStatsDTO] | None,
     ) -> dict[str, int]:
-        tg_id = await service.add(current_user_id, **data.__dict__)
+        # Idempotent writes run in a session of their own: a duplicate request may be the one waiting on the result
+        # after the request that started the write has gone away.
+        tg_id = await idempotency.run(
+            lambda: run_with_session(
+                lambda session: GiftService(session, wishlist_stats).add(current_user_id, **data.__dict__),
+            ),
+            int,
+        )
         return {'tg_id': tg_id}
 
+    @patch(
+        '/{gift_id:int}',
+        summary='Update gift',
+        description='Partial update. Send the ETag of the gift in If-Match; 412 means it was changed meanwhile.',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def update(
+        self,
+        service: GiftService,
+        gift_id: int,
+        data: GiftUpdateDTO,
+        current_user_id: int,
+        if_match: Annotated[str | None, Parameter(header='If-Match')] = None,
+    ) -> Response[GiftResponse]:
+        gift = await service.update(gift_id, current_user_id, data.changes(), parse_if_match(if_match))
+        return MsgspecResponse(GiftResponse.from_domain(gift), headers={'ETag': version_etag(gift.version)})
+
     @delete(
         '/{gift_id:int}',
         status_code=204,
@@ -49,15 +128,21 @@ class GiftController(Controller):
         '/{gift_id:int}/reserve',
         status_code=201,
         summary='Add gift reservation',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies=IDEMPOTENT_DEPENDENCIES,
     )
     async def add_reservation(
         self,
-        service: GiftService,
         gift_id: int,
         current_user_id: int,
+        idempotency: IdempotentRequest,
+        wishlist_stats: StoreCache[WishlistStatsDTO] | None,
     ) -> None:
-        await service.add_reservation(gift_id, current_user_id)
+        await idempotency.run(
+            lambda: run_with_session(
+                lambda session: GiftService(session, wishlist_stats).add_reservation(gift_id, current_user_id),
+            ),
+            type(None),
+        )
 
     @delete(
         '/{gift_id:int}/reserve',
@@ -82,18 +167,126 @@ class GiftController(Controller):
         self,
         service: GiftService,
         current_user_id: int,
-    ) -> list[GiftWithOwnerDTO]:
-        return await service.get_my_reservations(current_user_id)
+    ) -> Response[list[GiftWithOwnerResponse]]:
+        gifts = await service.get_my_reservations(current_user_id)
+        return MsgspecResponse([GiftWithOwnerResponse.from_dto(gift) for gift in gifts])
+
+    @get(
+        '/my/reserve/stream',
+        summary='Stream gifts reserved by me',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def stream_my_reservations(self, current_user_id: int) -> Stream:
+        batches = stream_with_session(lambda session: GiftService(session).stream_my_reservations(current_user_id))
+        return Stream(stream_json_array(batches, GiftWithOwnerResponse.from_dto), media_type=MediaType.JSON)
+
+    @get(
+        '/feed',
+        summary="Get latest gifts from friends' wishlists",
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def get_friends_feed(
+        self,
+        service: GiftService,
+        current_user_id: int,
+        limit: Annotated[int, Parameter(ge=1, le=MAX_FEED_LIMIT)] = DEFAULT_FEED_LIMIT,
+        per_friend: Annotated[int, Parameter(ge=1, le=MAX_FEED_LIMIT)] = DEFAULT_FEED_PER_FRIEND,
+        cursor: str | None = None,
+    ) -> Response[GiftFeedResponse]:
+        before = decode_cursor(cursor) if cursor else None
+        page = await service.get_friends_feed(current_user_id, limit, per_friend, before)
+        last = page.gifts[-1] if page.has_more else None
+        return MsgspecResponse(
+            GiftFeedResponse(
+                items=[GiftWithOwnerResponse.from_dto(gift) for gift in page.gifts],
+                next_cursor=encode_cursor(last.created_at, last.id) if last else None,  # ty:ignore[invalid-argument-type]
+            )
+        )
+
+    @get(
+        '/search',
+        summary="Search gifts in friends' wishlists",
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def search_gifts(
+        self,
+        service: GiftService,
+        current_user_id: int,
+        q: Annotated[str, Parameter(min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH)],
+        limit: Annotated[int, Parameter(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+        offset: Annotated[int, Parameter(ge=0, le=MAX_SEARCH_OFFSET)] = 0,
+    ) -> Response[GiftSearchResponse]:
+        page = await service.search(current_user_id, q, limit, offset)
+        return MsgspecResponse(
+            GiftSearchResponse(
+                items=[GiftWithOwnerResponse.from_dto(gift) for gift in page.gifts],
+                next_offset=offset + limit if page.has_more else None,
+            )
+        )
+
+    @get(
+        '/export',
+        summary='Export my wishlist and reservations',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def export_wishlist(
+        self,
+        current_user_id: int,
+        archive_format: Annotated[ArchiveFormat, Parameter(query='format')] = ArchiveFormat.NDJSON,
+    ) -> Stream:
+        batches = stream_with_session(lambda session: GiftService(session).export_wishlist(current_user_id))
+        return Stream(encode_archive(batches, archive_format), media_type=archive_format.media_type)
+
+    @post(
+        '/import',
+        status_code=201,
+        summary='Import wishlist and reservations',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def import_wishlist(
+        self,
+        service: GiftService,
+        request: Request,
+        current_user_id: int,
+    ) -> dict[str, int]:
+        archive_format = ArchiveFormat.from_media_type(request.content_type[0])
+        return await service.import_wishlist(current_user_id, decode_archive(request.stream(), archive_format))
 
     @get(
         '/user/{tg_id:int}',
         summary='Get user wishlist',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
     )
     async def get_user_gifts(
         self,
         service: GiftService,
         tg_id: int,
         current_user_id: int,
-    ) -> list[Gift]:
-        return await service.get_gifts_by_user_id(tg_id, current_user_id)
+        sort: GiftSortField = GiftSortField.CREATED_AT,
+        order: SortOrder = SortOrder.DESC,
+        min_price: Annotated[int | None, Parameter(ge=0, le=MAX_PRICE)] = None,
+        max_price: Annotated[int | None, Parameter(ge=0, le=MAX_PRICE)] = None,
+        min_wish_rate: Annotated[int | None, Parameter(ge=MIN_WISH_RATE, le=MAX_WISH_RATE)] = None,
+        reserved: bool | None = None,  # noqa: FBT001
+        limit: Annotated[int | None, Parameter(ge=1, le=MAX_WISHLIST_LIMIT)] = None,
+        cursor: str | None = None,
+    ) -> Response[list[GiftResponse]]:
+        listing = WishlistQueryDTO(sort, order, min_price, max_price, min_wish_rate, reserved)
+        after = decode_cursor(cursor, sort.value_type) if cursor else None
+        page = await service.get_gifts_by_user_id(tg_id, current_user_id, listing, limit, after)
+        last = page.gifts[-1] if page.has_more else None
+        return MsgspecResponse(
+            [GiftResponse.from_domain(gift) for gift in page.gifts],
+            headers={NEXT_CURSOR_HEADER: encode_cursor(sort.key(last), last.id)} if last else None,  # ty:ignore[invalid-argument-type]
+        )
+
+    @get(
+        '/user/{tg_id:int}/stream',
+        summary='Stream user wishlist',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def stream_user_gifts(self, tg_id: int, current_user_id: int) -> Stream:
+        batches = stream_with_session(
+            lambda session: GiftService(session).stream_gifts_by_user_id(tg_id, current_user_id)
+        )
+        return Stream(stream_json_array(batches, GiftResponse.from_domain), media_type=MediaType.JSON)
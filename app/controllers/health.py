@@ -0,0 +1,21 @@
+from litestar import Controller
+from litestar import Request
+from litestar import Response
+from litestar import get
+from litestar.status_codes import HTTP_200_OK
+from litestar.status_codes import HTTP_503_SERVICE_UNAVAILABLE
+
+
+class HealthController(Controller):
+    path = '/health'
+    tags = ('Health',)
+
+    @get('/live', summary='Liveness probe', sync_to_thread=False)
+    def live(self) -> dict[str, str]:
+        return {'status': 'alive'}
+
+    @get('/ready', summary='Readiness probe: ready once the startup warm-up has finished', sync_to_thread=False)
+    def ready(self, request: Request) -> Response[dict[str, str]]:
+        if request.app.state.get('ready', False):
+            return Response({'status': 'ready'}, status_code=HTTP_200_OK)
+        return Response({'status': 'warming up'}, status_code=HTTP_503_SERVICE_UNAVAILABLE)
@@ -1,19 +1,79 @@
+from typing import Annotated
+from typing import Final
+
 from litestar import Controller
+from litestar import Response
 from litestar import delete
 from litestar import get
 from litestar import patch
 from litestar import post
 from litestar.di import Provide
 from litestar.dto import DataclassDTO
+from litestar.enums import MediaType
+from litestar.params import Parameter
+from litestar.response import Stream
 
+from core.database import run_with_session
+from core.database import stream_with_session
 from core.security import TelegramInitData
 from core.security import TokenOut
 from dependencies import provide_access_jwt_auth
+from dependencies import provide_idempotency
+from dependencies import provide_read_session
 from dependencies import provide_telegram_init_data
+from dependencies import provide_user_read_service
 from dependencies import provide_user_service
 from domain import User
-from dto.users import FriendRequestDTO
+from dto.users import AccountDeletionResponse
+from dto.users import FriendRequestResponse
+from dto.users import FriendSuggestionResponse
+from dto.users import FriendWithStatsResponse
+from dto.users import MutualFriendsDTO
+from dto.users import UserResponse
+from dto.users import UserSearchResponse
+from dto.users import WishlistStatsDTO
 from services import UserService
+from services.users import MAX_FRIEND_SUGGESTIONS
+from utils import BackgroundJobs
+from utils import IdempotentRequest
+from utils import MsgspecResponse
+from utils import SingleFlight
+from utils import StoreCache
+from utils import stream_json_array
+
+MAX_BATCH_USERS: Final[int] = 100
+DEFAULT_SEARCH_LIMIT: Final[int] = 20
+MAX_SEARCH_LIMIT: Final[int] = 50
+MAX_SEARCH_OFFSET: Final[int] = 1000
+MAX_SEARCH_QUERY_LENGTH: Final[int] = 100
+DEFAULT_SUGGESTIONS_LIMIT: Final[int] = 20
+
+login_flights: SingleFlight[int, TokenOut] = SingleFlight()
+account_deletion_jobs: BackgroundJobs[int] = BackgroundJobs()
+
+READ_DEPENDENCIES: Final = {
+    'service': Provide(provide_user_read_service, sync_to_thread=False),
+    'read_session': Provide(provide_read_session),
+}
+IDEMPOTENT_DEPENDENCIES: Final = {
+    'current_user_id': Provide(provide_access_jwt_auth),
+    'idempotency': Provide(provide_idempotency),
+}
+
+
+def start_account_deletion_job(
+    user_id: int,
+    wishlist_stats: StoreCache[WishlistStatsDTO] | None,
+    friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None,
+) -> None:
+    """Run the account deletion of ``user_id`` in the background, unless it is running already."""
+    # The job outlives the request, so it runs in a session of its own.
+    account_deletion_jobs.start(
+        user_id,
+        lambda: run_with_session(
+            lambda session: UserService(session, wishlist_stats, friend_suggestions).delete_account(user_id),
+        ),
+    )
 
 
 class UserController(Controller):
@@ -24,14 +84,15 @@ class UserController(Controller):
     @post(
         '/auth',
         summary='Telegram Mini App auth',
-        dependencies={'init_data': Provide(provide_telegram_init_data, sync_to_thread=False)},
+        dependencies={'init_data': Provide(provide_telegram_init_data)},
     )
-    async def telegram_login(
-        self,
-        service: UserService,
-        init_data: TelegramInitData,
-    ) -> TokenOut:
-        return await service.telegram_login(init_data)
+    async def telegram_login(self, init_data: TelegramInitData) -> TokenOut:
+        # Concurrent logins of one user share a single DB round trip and token. The shared call runs in a session
+        # of its own, as it may outlive the request that started it.
+        return await login_flights.do(
+            init_data['id'],
+            lambda: run_with_session(lambda session: UserService(session).telegram_login(init_data)),
+        )
 
     @get(
         '/me',
@@ -46,7 +107,51 @@ class UserController(Controller):
     ) -> User:
         return await service.get(current_user_id)
 
-    @get('/{tg_id:int}', return_dto=DataclassDTO[User], summary='Get user')
+    @delete(
+        '/me',
+        status_code=202,
+        summary='Delete my account',
+        description=(
+            'Starts deleting the account with everything in it in the background and returns its progress, '
+            'which `GET /users/me/deletion` keeps reporting. A deletion stopped by a restart is resumed on startup; '
+            'repeating the request resumes one that failed.'
+        ),
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def delete_me(
+        self,
+        service: UserService,
+        current_user_id: int,
+        wishlist_stats: StoreCache[WishlistStatsDTO] | None,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None,
+    ) -> Response[AccountDeletionResponse]:
+        deletion = await service.start_account_deletion(current_user_id)
+        start_account_deletion_job(current_user_id, wishlist_stats, friend_suggestions)
+        return MsgspecResponse(AccountDeletionResponse.from_dto(deletion), status_code=202)
+
+    @get(
+        '/me/deletion',
+        summary='Get the progress of my account deletion',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def get_my_deletion(
+        self,
+        service: UserService,
+        current_user_id: int,
+    ) -> Response[AccountDeletionResponse]:
+        deletion = await service.get_account_deletion(current_user_id)
+        return MsgspecResponse(AccountDeletionResponse.from_dto(deletion))
+
+    @get('/batch', summary='Get users by ids')
+    async def get_users(
+        self,
+        service: UserService,
+        ids: Annotated[list[int], Parameter(min_items=1, max_items=MAX_BATCH_USERS)],
+    ) -> Response[list[UserResponse]]:
+        users = await service.get_many(ids)
+        return MsgspecResponse([UserResponse.from_domain(user) for user in users])
+
+    @get('/{tg_id:int}', return_dto=DataclassDTO[User], summary='Get user', dependencies=READ_DEPENDENCIES)
     async def get_user(
         self,
         service: UserService,
@@ -58,29 +163,39 @@ class UserController(Controller):
         '/me/friends/{receiver_id:int}/request',
         status_code=201,
         summary='Send friend request',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies=IDEMPOTENT_DEPENDENCIES,
     )
     async def send_friend_request(
         self,
-        service: UserService,
         current_user_id: int,
         receiver_id: int,
+        idempotency: IdempotentRequest,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None,
     ) -> dict[str, str]:
-        await service.send_friend_request(current_user_id, receiver_id)
+        await idempotency.run(
+            lambda: run_with_session(
+                lambda session: UserService(session, friend_suggestions=friend_suggestions).send_friend_request(
+                    current_user_id,
+                    receiver_id,
+                ),
+            ),
+            type(None),
+        )
         return {'message': 'Friend request has been sent'}
 
     @get(
         '/me/friend-requests',
         status_code=200,
         summary='Get pending friend requests',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
     )
     async def get_friend_requests(
         self,
         service: UserService,
         current_user_id: int,
-    ) -> list[FriendRequestDTO]:
-        return await service.get_pending_requests(current_user_id)
+    ) -> Response[list[FriendRequestResponse]]:
+        requests = await service.get_pending_requests(current_user_id)
+        return MsgspecResponse([FriendRequestResponse.from_dto(request) for request in requests])
 
     @patch(
         '/me/friends/{sender_id:int}/accept',
@@ -127,11 +242,71 @@ class UserController(Controller):
     @get(
         '/me/friends',
         summary='Get my friends with details',
-        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
     )
     async def get_my_friends(
         self,
         service: UserService,
         current_user_id: int,
-    ) -> list[User]:
-        return await service.get_friends(current_user_id)
+    ) -> Response[list[UserResponse]]:
+        friends = await service.get_friends(current_user_id)
+        return MsgspecResponse([UserResponse.from_domain(friend) for friend in friends])
+
+    @get(
+        '/me/friends/stats',
+        summary='Get my friends with their wishlist stats',
+        description='Friends with their gift count, unreserved gift count and latest gift time, latest first.',
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def get_my_friends_with_stats(
+        self,
+        service: UserService,
+        current_user_id: int,
+    ) -> Response[list[FriendWithStatsResponse]]:
+        friends = await service.get_friends_with_stats(current_user_id)
+        return MsgspecResponse([FriendWithStatsResponse.from_dto(friend) for friend in friends])
+
+    @get(
+        '/me/friends/suggestions',
+        summary='People you may know',
+        description='Friends of your friends who are not your friends yet, most mutual friends first.',
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def get_friend_suggestions(
+        self,
+        service: UserService,
+        current_user_id: int,
+        limit: Annotated[int, Parameter(ge=1, le=MAX_FRIEND_SUGGESTIONS)] = DEFAULT_SUGGESTIONS_LIMIT,
+    ) -> Response[list[FriendSuggestionResponse]]:
+        suggestions = await service.get_friend_suggestions(current_user_id, limit)
+        return MsgspecResponse([FriendSuggestionResponse.from_dto(suggestion) for suggestion in suggestions])
+
+    @get(
+        '/me/friends/search',
+        summary='Search my friends by username or name',
+        dependencies={**READ_DEPENDENCIES, 'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def search_my_friends(
+        self,
+        service: UserService,
+        current_user_id: int,
+        q: Annotated[str, Parameter(min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH)],
+        limit: Annotated[int, Parameter(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+        offset: Annotated[int, Parameter(ge=0, le=MAX_SEARCH_OFFSET)] = 0,
+    ) -> Response[UserSearchResponse]:
+        page = await service.search_friends(current_user_id, q, limit, offset)
+        return MsgspecResponse(
+            UserSearchResponse(
+                items=[UserResponse.from_domain(friend) for friend in page.users],
+                next_offset=offset + limit if page.has_more else None,
+            )
+        )
+
+    @get(
+        '/me/friends/stream',
+        summary='Stream my friends with details',
+        dependencies={'current_user_id': Provide(provide_access_jwt_auth)},
+    )
+    async def stream_my_friends(self, current_user_id: int) -> Stream:
+        batches = stream_with_session(lambda session: UserService(session).stream_friends(current_user_id))
+        return Stream(stream_json_array(batches, UserResponse.from_domain), media_type=MediaType.JSON)
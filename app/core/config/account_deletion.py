@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class AccountDeletionConfig(BaseModel):
+    batch_size: int = 1000
@@ -9,5 +9,6 @@ class AppConfig(BaseModel):
     developer_email: str = 'machen3228@gmail.com'
 
     max_tg_token_age: int = 86400
+    openapi_enabled: bool = True
 
     frontend_host: str
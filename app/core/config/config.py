@@ -3,11 +3,17 @@ from pathlib import Path
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 
+from core.config.account_deletion import AccountDeletionConfig
 from core.config.app import AppConfig
 from core.config.bot import BotConfig
 from core.config.database import DatabaseConfig
+from core.config.friend_suggestions import FriendSuggestionsConfig
+from core.config.idempotency import IdempotencyConfig
 from core.config.jwt import JWTConfig
 from core.config.logger import LoggerConfig
+from core.config.rate_limit import RateLimitConfig
+from core.config.server import ServerConfig
+from core.config.wishlist_stats import WishlistStatsConfig
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -25,9 +31,15 @@ class Settings(BaseSettings):
 
     app: AppConfig
     logger: LoggerConfig = LoggerConfig()
+    server: ServerConfig = ServerConfig()
     bot: BotConfig
     db: DatabaseConfig
     jwt: JWTConfig
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    idempotency: IdempotencyConfig = IdempotencyConfig()
+    wishlist_stats: WishlistStatsConfig = WishlistStatsConfig()
+    friend_suggestions: FriendSuggestionsConfig = FriendSuggestionsConfig()
+    account_deletion: AccountDeletionConfig = AccountDeletionConfig()
 
 
 settings = Settings.model_validate({})
@@ -1,3 +1,5 @@
+import enum
+
 from pydantic import BaseModel
 from pydantic import SecretStr
 from sqlalchemy import URL
@@ -8,14 +10,37 @@ class SessionConfig(BaseModel):
     autoflush: bool = True
 
 
+class PoolProfile(enum.StrEnum):
+    DIRECT = 'direct'
+    TRANSACTION_POOLER = 'transaction_pooler'
+
+
+class HealthCheck(enum.StrEnum):
+    PRE_PING = 'pre_ping'
+    OPTIMISTIC = 'optimistic'
+
+
 class EngineConfig(BaseModel):
+    profile: PoolProfile = PoolProfile.DIRECT
     echo: bool = False
     pool_size: int = 10
     max_overflow: int = 10
     pool_timeout: int = 30
     pool_recycle: int = 3600
-    pool_pre_ping: bool = True
+    health_check: HealthCheck = HealthCheck.PRE_PING
+    idle_validation_interval: float = 30.0
     pool_reset_on_return: str = 'rollback'
+    # Used only by the transaction pooler profile; 0 opens a connection per checkout (NullPool).
+    pooler_pool_size: int = 0
+
+    @property
+    def persistent_connections(self) -> int:
+        return self.pool_size if self.profile is PoolProfile.DIRECT else self.pooler_pool_size
+
+
+class ReplicaConfig(BaseModel):
+    host: str
+    port: int = 5432
 
 
 class DatabaseConfig(BaseModel):
@@ -27,6 +52,13 @@ class DatabaseConfig(BaseModel):
 
     session: SessionConfig = SessionConfig()
     engine: EngineConfig = EngineConfig()
+    replica: ReplicaConfig | None = None
+    read_your_writes_window: float = 5.0
+    read_your_writes_max_pins: int = 100_000
+    warm_up: bool = True
+
+    stream_batch_size: int = 500
+    write_batch_size: int = 1000
 
     @property
     def async_url(self) -> URL:
@@ -39,6 +71,12 @@ class DatabaseConfig(BaseModel):
             password=self.password.get_secret_value(),
         )
 
+    @property
+    def replica_async_url(self) -> URL | None:
+        if self.replica is None:
+            return None
+        return self.async_url.set(host=self.replica.host, port=self.replica.port)
+
     @property
     def test_async_url(self) -> URL:
         return URL.create(
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class FriendSuggestionsConfig(BaseModel):
+    cache_ttl: int = 300
+    max_entries: int = 10_000
+    max_sources: int = 500
+    max_per_source: int = 500
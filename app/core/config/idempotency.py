@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class IdempotencyConfig(BaseModel):
+    ttl: int = 86400
+    max_entries: int = 10_000
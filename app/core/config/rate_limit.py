@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = True
+    auth_capacity: int = 5
+    auth_refill_rate: float = 0.1
@@ -0,0 +1,18 @@
+import os
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class ServerConfig(BaseModel):
+    host: str = '0.0.0.0'  # noqa: S104
+    port: int = 80
+    workers: int = 1
+    loop: Literal['auto', 'asyncio', 'uvloop'] = 'auto'
+    http: Literal['auto', 'h11', 'httptools'] = 'auto'
+    graceful_shutdown_timeout: int = 30
+
+    @property
+    def worker_count(self) -> int:
+        """Number of worker processes; ``workers=0`` starts one per CPU."""
+        return self.workers or os.cpu_count() or 1
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class WishlistStatsConfig(BaseModel):
+    cache_ttl: int = 60
+    max_entries: int = 10_000
@@ -1 +1,11 @@
+from .health import IdleConnectionValidator as IdleConnectionValidator
+from .health import ReconnectingAsyncSession as ReconnectingAsyncSession
+from .health import idle_connection_validation as idle_connection_validation
+from .routing import READ_YOUR_WRITES_STORE as READ_YOUR_WRITES_STORE
+from .routing import ReadYourWritesGuard as ReadYourWritesGuard
+from .routing import pin_writer as pin_writer
+from .routing import should_use_replica as should_use_replica
+from .sqlalchemy_config import replica_sqlalchemy_config as replica_sqlalchemy_config
+from .sqlalchemy_config import run_with_session as run_with_session
 from .sqlalchemy_config import sqlalchemy_config as sqlalchemy_config
+from .sqlalchemy_config import stream_with_session as stream_with_session
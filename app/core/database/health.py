@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from contextlib import suppress
+from functools import partial
+from typing import Any
+
+from litestar import Litestar
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncResult
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import QueuePool
+
+type EngineGetter = Callable[[], AsyncEngine]
+
+
+class ReconnectingAsyncSession(AsyncSession):
+    """``AsyncSession`` that survives a dead pooled connection without pre-pinging every checkout.
+
+    A connection whose server went away is only noticed when a statement fails on it; SQLAlchemy then invalidates
+    it together with every connection pooled before it. If that statement was the first of its transaction nothing
+    has been lost yet, so it is rolled back and executed once more on a fresh connection.
+    """
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        return await self._retry_on_disconnect(partial(super().execute, *args, **kwargs))
+
+    async def stream(self, *args: Any, **kwargs: Any) -> AsyncResult[Any]:  # noqa: ANN401
+        return await self._retry_on_disconnect(partial(super().stream, *args, **kwargs))
+
+    async def _retry_on_disconnect[T](self, call: Callable[[], Awaitable[T]]) -> T:
+        first_use = not self.in_transaction()
+        try:
+            return await call()
+        except DBAPIError as e:
+            if not (first_use and e.connection_invalidated):
+                raise
+            logger.warning('Pooled connection was closed by the server, retrying on a new one')
+            await self.rollback()
+        return await call()
+
+
+class IdleConnectionValidator:
+    """Ping idle pooled connections in the background, so that requests rarely meet a dead one."""
+
+    def __init__(self, engine: AsyncEngine, interval: float) -> None:
+        self._engine = engine
+        self._interval = interval
+
+    async def validate(self) -> int:
+        """Check out and ping as many connections as are idle, returning how many turned out to be dead.
+
+        The pool hands connections out oldest first, so consecutive checkouts walk through all idle ones. Pools
+        other than a ``QueuePool`` (``NullPool`` behind a transaction pooler) keep no idle connections to check.
+        """
+        pool = self._engine.pool
+        if not isinstance(pool, QueuePool):
+            return 0
+        dead = 0
+        for _ in range(pool.checkedin()):
+            try:
+                async with self._engine.connect() as connection:
+                    await connection.exec_driver_sql('SELECT 1')
+            except DBAPIError as e:
+                if not e.connection_invalidated:
+                    raise
+                dead += 1
+        if dead:
+            logger.warning('Idle connection validator discarded {} dead connection(s)', dead)
+        return dead
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.validate()
+            except Exception as e:  # noqa: BLE001
+                logger.error('Idle connection validation failed: {}', type(e).__name__)
+
+
+def idle_connection_validation(*engines: EngineGetter, interval: float) -> Callable[[Litestar], Any]:
+    """Build a Litestar lifespan that runs an :class:`IdleConnectionValidator` per pooling engine while the app is up.
+
+    Engines without a ``QueuePool`` keep no idle connections and get no validator.
+    """
+
+    @asynccontextmanager
+    async def lifespan(_: Litestar) -> AsyncGenerator[None]:
+        pooled = [engine for engine in (get_engine() for get_engine in engines) if isinstance(engine.pool, QueuePool)]
+        tasks = [asyncio.create_task(IdleConnectionValidator(engine, interval).run()) for engine in pooled]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    return lifespan
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from typing import Final
+from typing import Self
+
+from litestar import Litestar
+from litestar import Request
+from litestar.enums import HttpMethod
+from litestar.stores.base import Store
+
+from core.config import settings
+from core.security import BaseJWTAuth
+from exceptions.http import UnauthorizedError
+
+READ_METHODS: Final[frozenset[str]] = frozenset({HttpMethod.GET, HttpMethod.HEAD})
+READ_YOUR_WRITES_STORE: Final[str] = 'read_your_writes'
+
+
+class ReadYourWritesGuard:
+    """Remember who wrote recently, so that their reads stay on the primary until the replica has caught up.
+
+    Pins are kept in a Litestar ``Store`` by user id and expire after ``window`` seconds. A ``MemoryStore`` keeps
+    them per process; a shared store such as ``RedisStore`` makes them hold across workers and instances.
+    """
+
+    def __init__(self, store: Store, window: float) -> None:
+        self._store = store
+        self._window = timedelta(seconds=window)
+
+    @classmethod
+    def from_app(cls, app: Litestar) -> Self:
+        return cls(app.stores.get(READ_YOUR_WRITES_STORE), settings.db.read_your_writes_window)
+
+    async def pin(self, user_id: int) -> None:
+        await self._store.set(str(user_id), b'1', expires_in=self._window)
+
+    async def is_pinned(self, user_id: int) -> bool:
+        return await self._store.get(str(user_id)) is not None
+
+
+def request_user_id(request: Request) -> int | None:
+    """Return the user id of a valid bearer token, or ``None`` for anonymous and invalid requests."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        return int(BaseJWTAuth.verify_token(token)['sub'])
+    except UnauthorizedError:
+        return None
+
+
+async def should_use_replica(request: Request, guard: ReadYourWritesGuard | None = None) -> bool:
+    if request.method not in READ_METHODS:
+        return False
+    user_id = request_user_id(request)
+    return user_id is None or not await (guard or ReadYourWritesGuard.from_app(request.app)).is_pinned(user_id)
+
+
+async def pin_writer(request: Request, guard: ReadYourWritesGuard | None = None) -> None:
+    """``before_request`` hook: pin the author of a write to the primary for the read-your-writes window.
+
+    Pinning before the write runs means the next read can never outrun it, whatever the response timing.
+    """
+    if request.method in READ_METHODS:
+        return
+    user_id = request_user_id(request)
+    if user_id is not None:
+        await (guard or ReadYourWritesGuard.from_app(request.app)).pin(user_id)
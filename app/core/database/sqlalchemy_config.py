@@ -1,28 +1,84 @@
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Final
+from uuid import uuid4
+
 from advanced_alchemy.extensions.litestar import AsyncSessionConfig
 from advanced_alchemy.extensions.litestar import EngineConfig
 from advanced_alchemy.extensions.litestar import SQLAlchemyAsyncConfig
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import NullPool
 
 from core.config import settings
+from core.config.database import EngineConfig as EngineSettings
+from core.config.database import HealthCheck
+from core.config.database import PoolProfile
+
+from .health import ReconnectingAsyncSession
+
+SERVER_SETTINGS: Final[dict[str, str]] = {
+    'application_name': 'wish_list_app',
+    'jit': 'off',
+    'timezone': 'UTC',
+}
+# Startup parameters a transaction pooler forwards; anything else (e.g. ``jit``) is rejected by PgBouncer
+# and has to be set on the database role instead.
+POOLER_SERVER_SETTINGS: Final[dict[str, str]] = {
+    'application_name': 'wish_list_app',
+    'timezone': 'UTC',
+}
+
+
+def _prepared_statement_name() -> str:
+    return f'__asyncpg_{uuid4().hex}__'
 
-engine_config = EngineConfig(
-    echo=settings.db.engine.echo,
-    pool_size=settings.db.engine.pool_size,
-    max_overflow=settings.db.engine.max_overflow,
-    pool_timeout=settings.db.engine.pool_timeout,
-    pool_recycle=settings.db.engine.pool_recycle,
-    pool_pre_ping=settings.db.engine.pool_pre_ping,
-    pool_reset_on_return=settings.db.engine.pool_reset_on_return,
-    connect_args={
-        'server_settings': {
-            'application_name': 'wish_list_app',
-            'jit': 'off',
-            'timezone': 'UTC',
-        },
+
+def build_engine_config(engine_settings: EngineSettings) -> EngineConfig:
+    """Build the engine config for the configured pooling profile.
+
+    ``direct`` keeps a pool of server connections per process. ``transaction_pooler`` is meant for running behind
+    PgBouncer in transaction mode: a server connection is only borrowed for one transaction, so prepared
+    statements are never cached and get unique names, the pool stays small (``NullPool`` by default) and the
+    pre-ping round trip is skipped since the pooler already checks its server connections.
+    """
+    if engine_settings.profile is PoolProfile.DIRECT:
+        return EngineConfig(
+            echo=engine_settings.echo,
+            pool_size=engine_settings.pool_size,
+            max_overflow=engine_settings.max_overflow,
+            pool_timeout=engine_settings.pool_timeout,
+            pool_recycle=engine_settings.pool_recycle,
+            pool_pre_ping=engine_settings.health_check is HealthCheck.PRE_PING,
+            pool_reset_on_return=engine_settings.pool_reset_on_return,
+            connect_args={'server_settings': SERVER_SETTINGS, 'command_timeout': 60},
+        )
+
+    connect_args = {
+        'server_settings': POOLER_SERVER_SETTINGS,
         'command_timeout': 60,
-    },
-)
+        'statement_cache_size': 0,
+        'prepared_statement_cache_size': 0,
+        'prepared_statement_name_func': _prepared_statement_name,
+    }
+    if not engine_settings.pooler_pool_size:
+        return EngineConfig(echo=engine_settings.echo, poolclass=NullPool, connect_args=connect_args)
+    return EngineConfig(
+        echo=engine_settings.echo,
+        pool_size=engine_settings.pooler_pool_size,
+        max_overflow=0,
+        pool_timeout=engine_settings.pool_timeout,
+        pool_pre_ping=False,
+        pool_reset_on_return=engine_settings.pool_reset_on_return,
+        connect_args=connect_args,
+    )
+
+
+engine_config = build_engine_config(settings.db.engine)
 
 session_config = AsyncSessionConfig(
+    class_=ReconnectingAsyncSession if settings.db.engine.health_check is HealthCheck.OPTIMISTIC else AsyncSession,
     expire_on_commit=settings.db.session.expire_on_commit,
     autoflush=settings.db.session.autoflush,
 )
@@ -34,3 +90,35 @@ sqlalchemy_config = SQLAlchemyAsyncConfig(
     engine_config=engine_config,
     session_config=session_config,
 )
+
+replica_sqlalchemy_config = (
+    SQLAlchemyAsyncConfig(
+        connection_string=settings.db.replica_async_url.render_as_string(hide_password=False),
+        session_dependency_key='db_replica_session',
+        engine_dependency_key='db_replica_engine',
+        engine_app_state_key='db_replica_engine',
+        session_maker_app_state_key='db_replica_session_maker',
+        session_scope_key='_sqlalchemy_replica_db_session',
+        engine_config=engine_config,
+        session_config=session_config,
+    )
+    if settings.db.replica_async_url is not None
+    else None
+)
+
+
+async def run_with_session[T](work: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Run ``work`` inside a session of its own, for work that must not be tied to one request's ``db_session``."""
+    async with sqlalchemy_config.get_session() as session:
+        return await work(session)
+
+
+async def stream_with_session[T](produce: Callable[[AsyncSession], AsyncIterable[T]]) -> AsyncIterator[T]:
+    """Iterate ``produce`` inside a session of its own.
+
+    The request-scoped ``db_session`` is closed as soon as the response starts, so response bodies that keep
+    reading from the database after the handler returns (``Stream``) must not use it.
+    """
+    async with sqlalchemy_config.get_session() as session:
+        async for item in produce(session):
+            yield item
@@ -4,3 +4,4 @@ from .jwt_auth import Payload as Payload
 from .jwt_auth import TokenOut as TokenOut
 from .telegram_auth import TelegramInitData as TelegramInitData
 from .telegram_auth import get_telegram_init_data as get_telegram_init_data
+from .telegram_auth import webapp_secret_key as webapp_secret_key
@@ -1,3 +1,4 @@
+from functools import cache
 import hashlib
 import hmac
 import json
@@ -58,9 +59,13 @@ def build_data_check_string(parsed_data: dict) -> str:
     return '\n'.join(f'{k}={v}' for k, v in sorted(parsed_data.items()))
 
 
+@cache
+def webapp_secret_key(bot_token: str = settings.bot.token.get_secret_value()) -> bytes:
+    return hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+
+
 def compute_hmac_signature(data_check_string: str, bot_token: str = settings.bot.token.get_secret_value()) -> str:
-    secret_key = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
-    return hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return hmac.new(webapp_secret_key(bot_token), data_check_string.encode(), hashlib.sha256).hexdigest()
 
 
 def verify_signature(calculated_hash: str, received_hash: str) -> None:
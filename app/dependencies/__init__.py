@@ -1,4 +1,10 @@
 from .provide_access_jwt_auth import provide_access_jwt_auth as provide_access_jwt_auth
+from .provide_friend_suggestions import provide_friend_suggestions as provide_friend_suggestions
+from .provide_gift_read_service import provide_gift_read_service as provide_gift_read_service
 from .provide_gift_service import provide_gift_service as provide_gift_service
+from .provide_idempotency import provide_idempotency as provide_idempotency
+from .provide_read_session import provide_read_session as provide_read_session
 from .provide_telegram_init_data import provide_telegram_init_data as provide_telegram_init_data
+from .provide_user_read_service import provide_user_read_service as provide_user_read_service
 from .provide_user_service import provide_user_service as provide_user_service
+from .provide_wishlist_stats import provide_wishlist_stats as provide_wishlist_stats
@@ -0,0 +1,25 @@
+from typing import Final
+
+from litestar import Litestar
+from litestar import Request
+
+from core.config import settings
+from dto.users import MutualFriendsDTO
+from utils import StoreCache
+
+FRIEND_SUGGESTIONS_STORE: Final[str] = 'friend_suggestions'
+
+
+def friend_suggestions_cache(app: Litestar) -> StoreCache[list[MutualFriendsDTO]] | None:
+    """Cache of ranked friend suggestions by user id, or ``None`` when turned off with a ``cache_ttl`` of 0."""
+    if settings.friend_suggestions.cache_ttl <= 0:
+        return None
+    return StoreCache(
+        app.stores.get(FRIEND_SUGGESTIONS_STORE),
+        list[MutualFriendsDTO],
+        settings.friend_suggestions.cache_ttl,
+    )
+
+
+def provide_friend_suggestions(request: Request) -> StoreCache[list[MutualFriendsDTO]] | None:
+    return friend_suggestions_cache(request.app)
@@ -0,0 +1,7 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services import GiftService
+
+
+def provide_gift_read_service(read_session: AsyncSession) -> GiftService:
+    return GiftService(read_session)
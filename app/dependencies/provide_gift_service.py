@@ -1,7 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from dto.users import WishlistStatsDTO
 from services import GiftService
+from utils import StoreCache
 
 
-def provide_gift_service(db_session: AsyncSession) -> GiftService:
-    return GiftService(db_session)
+def provide_gift_service(
+    db_session: AsyncSession,
+    wishlist_stats: StoreCache[WishlistStatsDTO] | None,
+) -> GiftService:
+    return GiftService(db_session, wishlist_stats)
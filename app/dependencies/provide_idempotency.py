@@ -0,0 +1,36 @@
+from typing import Final
+
+from litestar import Request
+
+from core.config import settings
+from exceptions.http import BadRequestError
+from utils import IdempotentRequest
+from utils import SingleFlight
+from utils.idempotency import IdempotencyFlights
+
+IDEMPOTENCY_STORE: Final[str] = 'idempotency'
+IDEMPOTENCY_KEY_HEADER: Final[str] = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH: Final[int] = 255
+
+idempotency_flights: IdempotencyFlights = SingleFlight()
+
+
+async def provide_idempotency(request: Request, current_user_id: int) -> IdempotentRequest:
+    """Bind the request's ``Idempotency-Key`` to the current user and fingerprint the request it was sent with.
+
+    Without the header the returned ``IdempotentRequest`` simply runs the write.
+    """
+    store = request.app.stores.get(IDEMPOTENCY_STORE)
+    key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    if key is None:
+        return IdempotentRequest(store, idempotency_flights, None, '', settings.idempotency.ttl)
+    if not 0 < len(key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise BadRequestError(detail=f'{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters')
+    fingerprint = IdempotentRequest.fingerprint(
+        request.method,
+        request.url.path,
+        request.url.query,
+        await request.body(),
+    )
+    scoped_key = f'{current_user_id}:{key}'
+    return IdempotentRequest(store, idempotency_flights, scoped_key, fingerprint, settings.idempotency.ttl)
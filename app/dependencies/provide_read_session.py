@@ -0,0 +1,15 @@
+from collections.abc import AsyncGenerator
+
+from litestar import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import replica_sqlalchemy_config
+from core.database import should_use_replica
+
+
+async def provide_read_session(request: Request, db_session: AsyncSession) -> AsyncGenerator[AsyncSession]:
+    if replica_sqlalchemy_config is None or not await should_use_replica(request):
+        yield db_session
+        return
+    async with replica_sqlalchemy_config.get_session() as session:
+        yield session
@@ -1,8 +1,31 @@
+import math
+from typing import Final
+
 from litestar import Request
+from loguru import logger
 
+from core.config import settings
 from core.security import TelegramInitData
 from core.security import get_telegram_init_data
+from exceptions.http import TooManyRequestsError
+from utils import TokenBucketLimiter
+
+AUTH_RATE_LIMIT_STORE: Final[str] = 'auth_rate_limit'
+
+auth_rate_limiter = TokenBucketLimiter(settings.rate_limit.auth_capacity, settings.rate_limit.auth_refill_rate)
+
 
+async def provide_telegram_init_data(request: Request) -> TelegramInitData:
+    """Validate the init data, then rate limit logins per Telegram user.
 
-def provide_telegram_init_data(request: Request) -> TelegramInitData:
-    return get_telegram_init_data(request)
+    The limit is keyed by the verified user id, so a forged header can neither spend nor dodge someone's budget.
+    Buckets live in the app's ``auth_rate_limit`` store, an in-memory store unless the app registers a shared one.
+    """
+    init_data = get_telegram_init_data(request)
+    if settings.rate_limit.enabled:
+        store = request.app.stores.get(AUTH_RATE_LIMIT_STORE)
+        retry_after = await auth_rate_limiter.acquire(store, str(init_data['id']))
+        if retry_after:
+            logger.warning('Login rate limit exceeded: tg_id={}', init_data['id'])
+            raise TooManyRequestsError(headers={'Retry-After': str(math.ceil(retry_after))})
+    return init_data
@@ -0,0 +1,14 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dto.users import MutualFriendsDTO
+from dto.users import WishlistStatsDTO
+from services import UserService
+from utils import StoreCache
+
+
+def provide_user_read_service(
+    read_session: AsyncSession,
+    wishlist_stats: StoreCache[WishlistStatsDTO] | None,
+    friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None,
+) -> UserService:
+    return UserService(read_session, wishlist_stats, friend_suggestions)
@@ -1,7 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from dto.users import MutualFriendsDTO
+from dto.users import WishlistStatsDTO
 from services import UserService
+from utils import StoreCache
 
 
-def provide_user_service(db_session: AsyncSession) -> UserService:
-    return UserService(db_session)
+def provide_user_service(
+    db_session: AsyncSession,
+    wishlist_stats: StoreCache[WishlistStatsDTO] | None,
+    friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None,
+) -> UserService:
+    return UserService(db_session, wishlist_stats, friend_suggestions)
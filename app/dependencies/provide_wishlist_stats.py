@@ -0,0 +1,21 @@
+from typing import Final
+
+from litestar import Litestar
+from litestar import Request
+
+from core.config import settings
+from dto.users import WishlistStatsDTO
+from utils import StoreCache
+
+WISHLIST_STATS_STORE: Final[str] = 'wishlist_stats'
+
+
+def wishlist_stats_cache(app: Litestar) -> StoreCache[WishlistStatsDTO] | None:
+    """Cache of wishlist stats by owner id, or ``None`` when caching is turned off with a ``cache_ttl`` of 0."""
+    if settings.wishlist_stats.cache_ttl <= 0:
+        return None
+    return StoreCache(app.stores.get(WISHLIST_STATS_STORE), WishlistStatsDTO, settings.wishlist_stats.cache_ttl)
+
+
+def provide_wishlist_stats(request: Request) -> StoreCache[WishlistStatsDTO] | None:
+    return wishlist_stats_cache(request.app)
@@ -1,2 +1,3 @@
 from .gifts import Gift as Gift
+from .gifts import GiftChanges as GiftChanges
 from .users import User as User
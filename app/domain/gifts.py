@@ -3,15 +3,25 @@ from datetime import UTC
 from datetime import datetime
 from typing import Final
 from typing import Self
+from typing import TypedDict
 
 MAX_NAME_LENGTH: Final[int] = 100
 MAX_URL_LENGTH: Final[int] = 500
 MIN_WISH_RATE: Final[int] = 1
 MAX_WISH_RATE: Final[int] = 10
 MAX_PRICE: Final[int] = 99_999_999
+INITIAL_VERSION: Final[int] = 1
 
 
-@dataclass(frozen=True)
+class GiftChanges(TypedDict, total=False):
+    name: str
+    url: str | None
+    wish_rate: int | None
+    price: int | None
+    note: str | None
+
+
+@dataclass(frozen=True, slots=True)
 class Gift:
     id: int | None
     user_id: int
@@ -22,6 +32,7 @@ class Gift:
     note: str | None
     created_at: datetime
     updated_at: datetime
+    version: int
     is_reserved: bool
     reserved_by: int | None
 
@@ -60,10 +71,23 @@ class Gift:
             note=note,
             created_at=now,
             updated_at=now,
+            version=INITIAL_VERSION,
             is_reserved=False,
             reserved_by=None,
         )
 
+    @classmethod
+    def validate_changes(cls, changes: GiftChanges) -> None:
+        """Validate the fields of a partial update, without needing the gift they apply to."""
+        if 'name' in changes:
+            cls._validate_name(changes['name'])
+        if 'url' in changes:
+            cls._validate_url(changes['url'])
+        if 'wish_rate' in changes:
+            cls._validate_wish_rate(changes['wish_rate'])
+        if 'price' in changes:
+            cls._validate_price(changes['price'])
+
     @staticmethod
     def _validate_user_id(user_id: int) -> None:
         if user_id <= 0:
@@ -100,5 +124,8 @@ class Gift:
     def can_delete_gift(self, user_id: int) -> bool:
         return self.user_id == user_id
 
+    def can_update_gift(self, user_id: int) -> bool:
+        return self.user_id == user_id
+
     def can_delete_reservation(self, user_id: int) -> bool:
         return user_id in (self.user_id, self.reserved_by) and self.is_reserved
@@ -1,3 +1,4 @@
+from collections.abc import Set as AbstractSet
 from dataclasses import dataclass
 from dataclasses import field
 from datetime import UTC
@@ -18,7 +19,21 @@ class FriendAction(enum.StrEnum):
     REQUEST_ALREADY_SENT = 'request_already_sent'
 
 
-@dataclass
+class AccountDeletionStatus(enum.StrEnum):
+    RUNNING = 'running'
+    STOPPED = 'stopped'
+    FAILED = 'failed'
+    COMPLETED = 'completed'
+
+
+class AccountDeletionStep(enum.StrEnum):
+    FRIEND_REQUESTS = 'friend_requests'
+    FRIENDS = 'friends'
+    RESERVATIONS = 'reservations'
+    GIFTS = 'gifts'
+
+
+@dataclass(slots=True)
 class User:
     tg_id: int
     tg_username: str | None
@@ -27,9 +42,9 @@ class User:
     avatar_url: str | None
     created_at: datetime
     updated_at: datetime
-    _friends_ids: set[int] = field(default_factory=set, repr=False)
-    _incoming_request_ids: set[int] = field(default_factory=set, repr=False)
-    _outgoing_request_ids: set[int] = field(default_factory=set, repr=False)
+    _friends_ids: AbstractSet[int] = field(default=frozenset(), repr=False)
+    _incoming_request_ids: AbstractSet[int] = field(default=frozenset(), repr=False)
+    _outgoing_request_ids: AbstractSet[int] = field(default=frozenset(), repr=False)
 
     def __repr__(self) -> str:
         return f'<User {self.tg_id}>'
@@ -1,6 +1,18 @@
 from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+import enum
+from typing import TYPE_CHECKING
+from typing import Final
+from typing import Self
+
+import msgspec
 
 from domain.gifts import Gift
+from domain.gifts import GiftChanges
+
+if TYPE_CHECKING:
+    from utils import SortValue
 
 
 @dataclass
@@ -12,13 +24,198 @@ class GiftCreateDTO:
     note: str | None
 
 
-@dataclass(frozen=True)
+class GiftUpdateDTO(msgspec.Struct, forbid_unknown_fields=True):
+    """Partial gift update: fields left out of the request body keep their current value."""
+
+    name: str | msgspec.UnsetType = msgspec.UNSET
+    url: str | msgspec.UnsetType | None = msgspec.UNSET
+    wish_rate: int | msgspec.UnsetType | None = msgspec.UNSET
+    price: int | msgspec.UnsetType | None = msgspec.UNSET
+    note: str | msgspec.UnsetType | None = msgspec.UNSET
+
+    def changes(self) -> GiftChanges:
+        changes = GiftChanges()
+        if self.name is not msgspec.UNSET:
+            changes['name'] = self.name
+        if self.url is not msgspec.UNSET:
+            changes['url'] = self.url
+        if self.wish_rate is not msgspec.UNSET:
+            changes['wish_rate'] = self.wish_rate
+        if self.price is not msgspec.UNSET:
+            changes['price'] = self.price
+        if self.note is not msgspec.UNSET:
+            changes['note'] = self.note
+        return changes
+
+
+class GiftSortField(enum.StrEnum):
+    CREATED_AT = 'created_at'
+    WISH_RATE = 'wish_rate'
+    PRICE = 'price'
+
+    @property
+    def value_type(self) -> type['SortValue']:
+        return {GiftSortField.CREATED_AT: datetime, GiftSortField.WISH_RATE: int, GiftSortField.PRICE: Decimal}[self]
+
+    def key(self, gift: Gift) -> 'SortValue':
+        """Sort value of ``gift``; a missing wish rate or price sorts as 0, like the SQL ordering does."""
+        match self:
+            case GiftSortField.CREATED_AT:
+                return gift.created_at
+            case GiftSortField.WISH_RATE:
+                return gift.wish_rate or 0
+            case GiftSortField.PRICE:
+                return Decimal(gift.price or 0)
+
+
+class SortOrder(enum.StrEnum):
+    ASC = 'asc'
+    DESC = 'desc'
+
+
+@dataclass(frozen=True, slots=True)
+class WishlistQueryDTO:
+    """Ordering and filters of a wishlist listing; ``reserved`` keeps only reserved or only free gifts."""
+
+    sort: GiftSortField = GiftSortField.CREATED_AT
+    order: SortOrder = SortOrder.DESC
+    min_price: int | None = None
+    max_price: int | None = None
+    min_wish_rate: int | None = None
+    reserved: bool | None = None
+
+
+DEFAULT_WISHLIST_QUERY: Final = WishlistQueryDTO()
+
+
+@dataclass(frozen=True, slots=True)
+class WishlistPageDTO:
+    gifts: list[Gift]
+    has_more: bool
+
+
+@dataclass(frozen=True, slots=True)
 class GiftOwnerDTO:
     first_name: str | None
     last_name: str | None
     avatar_url: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GiftWithOwnerDTO(Gift):
     owner: GiftOwnerDTO
+
+
+@dataclass(frozen=True, slots=True)
+class GiftFeedPageDTO:
+    gifts: list[GiftWithOwnerDTO]
+    has_more: bool
+
+
+class GiftResponse(msgspec.Struct, gc=False):
+    id: int | None
+    user_id: int
+    name: str
+    url: str | None
+    wish_rate: int | None
+    price: Decimal | int | None
+    note: str | None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    is_reserved: bool
+    reserved_by: int | None
+
+    @classmethod
+    def from_domain(cls, gift: Gift) -> Self:
+        return cls(
+            gift.id,
+            gift.user_id,
+            gift.name,
+            gift.url,
+            gift.wish_rate,
+            gift.price,
+            gift.note,
+            gift.created_at,
+            gift.updated_at,
+            gift.version,
+            gift.is_reserved,
+            gift.reserved_by,
+        )
+
+
+class GiftOwnerResponse(msgspec.Struct, gc=False):
+    first_name: str | None
+    last_name: str | None
+    avatar_url: str | None
+
+
+class GiftWithOwnerResponse(msgspec.Struct, gc=False):
+    id: int | None
+    user_id: int
+    name: str
+    url: str | None
+    wish_rate: int | None
+    price: Decimal | int | None
+    note: str | None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    is_reserved: bool
+    reserved_by: int | None
+    owner: GiftOwnerResponse
+
+    @classmethod
+    def from_dto(cls, gift: GiftWithOwnerDTO) -> Self:
+        owner = gift.owner
+        return cls(
+            gift.id,
+            gift.user_id,
+            gift.name,
+            gift.url,
+            gift.wish_rate,
+            gift.price,
+            gift.note,
+            gift.created_at,
+            gift.updated_at,
+            gift.version,
+            gift.is_reserved,
+            gift.reserved_by,
+            GiftOwnerResponse(owner.first_name, owner.last_name, owner.avatar_url),
+        )
+
+
+class GiftFeedResponse(msgspec.Struct, gc=False):
+    items: list[GiftWithOwnerResponse]
+    next_cursor: str | None
+
+
+class GiftSearchResponse(msgspec.Struct, gc=False):
+    items: list[GiftWithOwnerResponse]
+    next_offset: int | None
+
+
+class GiftArchiveRecord(msgspec.Struct, tag='gift', tag_field='type', gc=False):
+    name: str
+    url: str | None = None
+    wish_rate: int | None = None
+    price: Decimal | int | None = None
+    note: str | None = None
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_domain(cls, gift: Gift) -> Self:
+        return cls(gift.name, gift.url, gift.wish_rate, gift.price, gift.note, gift.created_at)
+
+
+class ReservationArchiveRecord(msgspec.Struct, tag='reservation', tag_field='type', gc=False):
+    gift_id: int
+    owner_id: int | None = None
+    name: str | None = None
+
+    @classmethod
+    def from_dto(cls, gift: GiftWithOwnerDTO) -> Self:
+        return cls(gift.id, gift.user_id, gift.name)  # ty:ignore[invalid-argument-type]
+
+
+type ArchiveRecord = GiftArchiveRecord | ReservationArchiveRecord
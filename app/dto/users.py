@@ -1,8 +1,15 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Self
 
+import msgspec
 
-@dataclass
+if TYPE_CHECKING:
+    from domain.users import User
+
+
+@dataclass(slots=True)
 class FriendRequestDTO:
     sender_tg_id: int
     receiver_tg_id: int
@@ -12,8 +19,173 @@ class FriendRequestDTO:
     sender_username: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class UserPageDTO:
+    users: list['User']
+    has_more: bool
+
+
+@dataclass(frozen=True, slots=True)
+class WishlistStatsDTO:
+    gift_count: int
+    unreserved_count: int
+    latest_gift_at: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class FriendWithStatsDTO:
+    user: 'User'
+    stats: WishlistStatsDTO
+
+
+@dataclass(frozen=True, slots=True)
+class MutualFriendsDTO:
+    tg_id: int
+    mutual_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class FriendSuggestionDTO:
+    user: 'User'
+    mutual_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class AccountDeletionDTO:
+    user_tg_id: int
+    status: str
+    friend_requests_deleted: int
+    friends_deleted: int
+    reservations_deleted: int
+    gifts_deleted: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
+
+
+@dataclass(slots=True)
 class UserRelationsDTO:
     friends_ids: set[int]
     incoming_request_ids: set[int]
     outgoing_request_ids: set[int]
+
+
+class UserResponse(msgspec.Struct, gc=False):
+    tg_id: int
+    tg_username: str | None
+    first_name: str | None
+    last_name: str | None
+    avatar_url: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_domain(cls, user: 'User') -> Self:
+        return cls(
+            user.tg_id,
+            user.tg_username,
+            user.first_name,
+            user.last_name,
+            user.avatar_url,
+            user.created_at,
+            user.updated_at,
+        )
+
+
+class FriendRequestResponse(msgspec.Struct, gc=False):
+    sender_tg_id: int
+    receiver_tg_id: int
+    status: str
+    created_at: datetime
+    sender_name: str | None = None
+    sender_username: str | None = None
+
+    @classmethod
+    def from_dto(cls, request: FriendRequestDTO) -> Self:
+        return cls(
+            request.sender_tg_id,
+            request.receiver_tg_id,
+            request.status,
+            request.created_at,
+            request.sender_name,
+            request.sender_username,
+        )
+
+
+class UserSearchResponse(msgspec.Struct, gc=False):
+    items: list[UserResponse]
+    next_offset: int | None
+
+
+class FriendWithStatsResponse(msgspec.Struct, gc=False):
+    tg_id: int
+    tg_username: str | None
+    first_name: str | None
+    last_name: str | None
+    avatar_url: str | None
+    created_at: datetime
+    updated_at: datetime
+    gift_count: int
+    unreserved_count: int
+    latest_gift_at: datetime | None
+
+    @classmethod
+    def from_dto(cls, friend: FriendWithStatsDTO) -> Self:
+        user, stats = friend.user, friend.stats
+        return cls(
+            user.tg_id,
+            user.tg_username,
+            user.first_name,
+            user.last_name,
+            user.avatar_url,
+            user.created_at,
+            user.updated_at,
+            stats.gift_count,
+            stats.unreserved_count,
+            stats.latest_gift_at,
+        )
+
+
+class FriendSuggestionResponse(msgspec.Struct, gc=False):
+    tg_id: int
+    tg_username: str | None
+    first_name: str | None
+    last_name: str | None
+    avatar_url: str | None
+    mutual_count: int
+
+    @classmethod
+    def from_dto(cls, suggestion: FriendSuggestionDTO) -> Self:
+        user = suggestion.user
+        return cls(
+            user.tg_id,
+            user.tg_username,
+            user.first_name,
+            user.last_name,
+            user.avatar_url,
+            suggestion.mutual_count,
+        )
+
+
+class AccountDeletionResponse(msgspec.Struct, gc=False):
+    status: str
+    friend_requests_deleted: int
+    friends_deleted: int
+    reservations_deleted: int
+    gifts_deleted: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
+
+    @classmethod
+    def from_dto(cls, deletion: AccountDeletionDTO) -> Self:
+        return cls(
+            deletion.status,
+            deletion.friend_requests_deleted,
+            deletion.friends_deleted,
+            deletion.reservations_deleted,
+            deletion.gifts_deleted,
+            deletion.created_at,
+            deletion.updated_at,
+            deletion.finished_at,
+        )
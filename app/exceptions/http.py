@@ -10,10 +10,11 @@ class HttpError(HTTPException):
         self,
         status_code: int | None = None,
         detail: str | None = None,
+        headers: dict[str, str] | None = None,
     ) -> None:
         status_code = status_code or self.status_code
         detail = detail or self.detail
-        super().__init__(status_code=status_code, detail=detail)
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 
 class BadRequestError(HttpError):
@@ -29,3 +30,23 @@ class UnauthorizedError(HttpError):
 class ForbiddenError(HttpError):
     status_code: int = status_codes.HTTP_403_FORBIDDEN
     detail: str = 'Forbidden'
+
+
+class PreconditionFailedError(HttpError):
+    status_code: int = status_codes.HTTP_412_PRECONDITION_FAILED
+    detail: str = 'Precondition failed'
+
+
+class UnprocessableEntityError(HttpError):
+    status_code: int = status_codes.HTTP_422_UNPROCESSABLE_ENTITY
+    detail: str = 'Unprocessable entity'
+
+
+class PreconditionRequiredError(HttpError):
+    status_code: int = status_codes.HTTP_428_PRECONDITION_REQUIRED
+    detail: str = 'Precondition required'
+
+
+class TooManyRequestsError(HttpError):
+    status_code: int = status_codes.HTTP_429_TOO_MANY_REQUESTS
+    detail: str = 'Too many requests'
@@ -1,13 +1,25 @@
+from loguru import logger
 import uvicorn
 
-import application  # noqa: F401
-from core import logger  # noqa: F401
+from core import setup_logging
+from core.config import settings
 
 if __name__ == '__main__':
+    setup_logging()
+    server = settings.server
+    logger.info(
+        'Starting {} worker(s), each with its own pool of {} database connection(s)',
+        server.worker_count,
+        settings.db.engine.persistent_connections,
+    )
     uvicorn.run(
         'application:app',
-        host='0.0.0.0',  # noqa: S104
-        port=80,
+        host=server.host,
+        port=server.port,
+        workers=server.worker_count,
+        loop=server.loop,
+        http=server.http,
+        timeout_graceful_shutdown=server.graceful_shutdown_timeout,
         reload=False,
         log_config=None,
     )
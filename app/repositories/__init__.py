@@ -1,2 +1,4 @@
 from .gifts import GiftRepository as GiftRepository
+from .unit_of_work import UnitOfWork as UnitOfWork
 from .users import UserRepository as UserRepository
+from .warm_up import warm_up_connections as warm_up_connections
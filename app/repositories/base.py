@@ -1,6 +1,38 @@
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import Final
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from utils import DataLoader
+
+_LOADERS_KEY: Final[str] = 'loaders'
+
+
+def reset_identity_map(session: AsyncSession) -> None:
+    """Forget everything loaded through the session's loaders, e.g. after a rollback."""
+    session.info.pop(_LOADERS_KEY, None)
+
 
 class BaseRepository[T]:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
+
+    def _loader[K: Hashable, V](
+        self,
+        name: str,
+        batch_load: Callable[[Sequence[K]], Awaitable[Mapping[K, V]]],
+    ) -> DataLoader[K, V]:
+        """Return the loader registered under ``name`` on the session.
+
+        The loader lives in ``session.info``, so it is shared by every repository and service working with the
+        same session and acts as the request's identity map.
+        """
+        loaders: dict[str, DataLoader] = self._session.info.setdefault(_LOADERS_KEY, {})
+        loader = loaders.get(name)
+        if loader is None:
+            loader = loaders[name] = DataLoader(batch_load)
+        return loader
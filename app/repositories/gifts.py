@@ -1,5 +1,9 @@
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
 from datetime import UTC
 from datetime import datetime
+from typing import Final
 
 from loguru import logger
 from sqlalchemy import TextClause
@@ -7,17 +11,45 @@ from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 
 from domain.gifts import Gift
-from dto.gifts import GiftOwnerDTO
+from domain.gifts import GiftChanges
+from dto.gifts import DEFAULT_WISHLIST_QUERY
+from dto.gifts import GiftSortField
 from dto.gifts import GiftWithOwnerDTO
+from dto.gifts import SortOrder
+from dto.gifts import WishlistQueryDTO
 from exceptions.database import NotFoundInDbError
 from repositories.base import BaseRepository
+from repositories.mappers import GIFT_COLUMNS
+from repositories.mappers import GIFT_SEARCH_QUERY
+from repositories.mappers import GIFT_SEARCH_VECTOR
+from repositories.mappers import OWNER_COLUMNS
+from repositories.mappers import gift_from_row
+from repositories.mappers import gift_with_owner_from_row
+from utils import DataLoader
+from utils import Keyset
+from utils import SortValue
 from utils import handle_integrity_error_message
 
+UPDATABLE_COLUMNS: Final[tuple[str, ...]] = ('name', 'url', 'wish_rate', 'price', 'note')
+# Each expression leads an index after user_id, so that a wishlist is read in order and its keyset continues it.
+WISHLIST_SORT_EXPRESSIONS: Final[dict[GiftSortField, str]] = {
+    GiftSortField.CREATED_AT: 'g.created_at',
+    GiftSortField.WISH_RATE: 'COALESCE(g.wish_rate, 0)',
+    GiftSortField.PRICE: 'COALESCE(g.price, 0)',
+}
 
-def _gift_select_query(where_clause: str) -> TextClause:
+# Only the owner and their friends may read a wishlist. The condition refers to parameters only, so Postgres
+# evaluates it once per query (a single probe of the friends primary key) instead of once per gift.
+WISHLIST_ACCESS: Final[str] = """(
+    CAST(:user_id AS bigint) = CAST(:current_user_id AS bigint)
+    OR EXISTS (SELECT 1 FROM friends f WHERE f.user_tg_id = :user_id AND f.friend_tg_id = :current_user_id)
+)"""
+
+
+def _gift_select_query(where_clause: str, order_clause: str = '') -> TextClause:
     return text(f"""
         SELECT
-            g.*,
+            {GIFT_COLUMNS},
             gr.gift_id IS NOT NULL AS is_reserved,
             CASE
                 WHEN gr.reserved_by_tg_id = :current_user_id THEN gr.reserved_by_tg_id
@@ -26,10 +58,123 @@ def _gift_select_query(where_clause: str) -> TextClause:
         FROM gifts g
         LEFT JOIN gift_reservations gr ON g.id = gr.gift_id
         WHERE {where_clause}
+        {order_clause}
+    """)
+
+
+def _wishlist_query(listing: WishlistQueryDTO, *, with_cursor: bool, with_limit: bool) -> TextClause:
+    sort = WISHLIST_SORT_EXPRESSIONS[listing.sort]
+    direction, comparison = ('DESC', '<') if listing.order is SortOrder.DESC else ('ASC', '>')
+    conditions = ['g.user_id = :user_id', WISHLIST_ACCESS]
+    if listing.min_price is not None:
+        conditions.append('g.price >= :min_price')
+    if listing.max_price is not None:
+        conditions.append('g.price <= :max_price')
+    if listing.min_wish_rate is not None:
+        conditions.append('g.wish_rate >= :min_wish_rate')
+    if listing.reserved is not None:
+        conditions.append('gr.gift_id IS NOT NULL' if listing.reserved else 'gr.gift_id IS NULL')
+    if with_cursor:
+        conditions.append(f'({sort}, g.id) {comparison} (:after_value, :after_id)')
+    limit_clause = 'LIMIT :limit' if with_limit else ''
+    return _gift_select_query(' AND '.join(conditions), f'ORDER BY {sort} {direction}, g.id {direction} {limit_clause}')
+
+
+def _gift_update_query(columns: Sequence[str], *, check_version: bool) -> TextClause:
+    assignments = ', '.join(f'{column} = :{column}' for column in columns)
+    version_clause = 'AND version = :version' if check_version else ''
+    return text(f"""
+        WITH g AS (
+            UPDATE gifts
+            SET {assignments}, version = version + 1, updated_at = :updated_at
+            WHERE id = :gift_id AND user_id = :current_user_id {version_clause}
+            RETURNING *
+        )
+        SELECT
+            {GIFT_COLUMNS},
+            gr.gift_id IS NOT NULL AS is_reserved,
+            CASE
+                WHEN gr.reserved_by_tg_id = :current_user_id THEN gr.reserved_by_tg_id
+                ELSE NULL
+            END AS reserved_by
+        FROM g
+        LEFT JOIN gift_reservations gr ON g.id = gr.gift_id
+    """)
+
+
+def _reservations_query() -> TextClause:
+    return text(f"""
+        SELECT
+            {GIFT_COLUMNS},
+            gr.gift_id IS NOT NULL AS is_reserved,
+            gr.reserved_by_tg_id AS reserved_by,
+            {OWNER_COLUMNS}
+        FROM gifts g
+        JOIN gift_reservations gr ON g.id = gr.gift_id
+        JOIN users u ON g.user_id = u.tg_id
+        WHERE gr.reserved_by_tg_id = :current_user_id
+    """)
+
+
+def _friends_feed_query(*, with_cursor: bool) -> TextClause:
+    cursor_clause = 'AND (fg.created_at, fg.id) < (:before_created_at, :before_id)' if with_cursor else ''
+    return text(f"""
+        SELECT
+            {GIFT_COLUMNS},
+            gr.gift_id IS NOT NULL AS is_reserved,
+            CASE
+                WHEN gr.reserved_by_tg_id = :current_user_id THEN gr.reserved_by_tg_id
+                ELSE NULL
+            END AS reserved_by,
+            {OWNER_COLUMNS}
+        FROM friends f
+        JOIN users u ON u.tg_id = f.friend_tg_id
+        CROSS JOIN LATERAL (
+            SELECT fg.*
+            FROM gifts fg
+            WHERE fg.user_id = f.friend_tg_id
+            {cursor_clause}
+            ORDER BY fg.created_at DESC, fg.id DESC
+            LIMIT :per_friend
+        ) g
+        LEFT JOIN gift_reservations gr ON g.id = gr.gift_id
+        WHERE f.user_tg_id = :current_user_id
+        ORDER BY g.created_at DESC, g.id DESC
+        LIMIT :limit
     """)
 
 
+def _gift_search_query() -> TextClause:
+    return text(f"""
+        SELECT
+            {GIFT_COLUMNS},
+            gr.gift_id IS NOT NULL AS is_reserved,
+            CASE
+                WHEN gr.reserved_by_tg_id = :current_user_id THEN gr.reserved_by_tg_id
+                ELSE NULL
+            END AS reserved_by,
+            {OWNER_COLUMNS}
+        FROM friends f
+        CROSS JOIN ({GIFT_SEARCH_QUERY}) AS q
+        JOIN gifts g ON g.user_id = f.friend_tg_id
+        JOIN users u ON u.tg_id = g.user_id
+        LEFT JOIN gift_reservations gr ON g.id = gr.gift_id
+        WHERE f.user_tg_id = :current_user_id
+        AND {GIFT_SEARCH_VECTOR} @@ q.query
+        ORDER BY ts_rank({GIFT_SEARCH_VECTOR}, q.query) DESC, g.id DESC
+        LIMIT :limit
+        OFFSET :offset
+    """)
+
+
+type _GiftKey = tuple[int, int]
+
+
 class GiftRepository(BaseRepository[Gift]):
+    @property
+    def _gifts(self) -> DataLoader[_GiftKey, Gift]:
+        return self._loader('gifts', self._fetch_gifts)
+
     async def add(self, obj: Gift) -> int:
         stmt = text("""
             INSERT INTO gifts (user_id, name, url, wish_rate, price, note, created_at, updated_at)
@@ -48,7 +193,6 @@ class GiftRepository(BaseRepository[Gift]):
         }
         try:
             result = await self._session.execute(stmt, params)
-            await self._session.commit()
         except IntegrityError as e:
             context = {'user_id': obj.user_id}
             message = handle_integrity_error_message(e, context)
@@ -56,86 +200,199 @@ class GiftRepository(BaseRepository[Gift]):
             raise NotFoundInDbError(message) from None
         return result.scalar_one()
 
+    async def add_many(self, objs: Sequence[Gift], batch_size: int) -> int:
+        stmt = text("""
+            INSERT INTO gifts (user_id, name, url, wish_rate, price, note, created_at, updated_at)
+            VALUES (:user_id, :name, :url, :wish_rate, :price, :note, :created_at, :updated_at)
+        """)
+        try:
+            for start in range(0, len(objs), batch_size):
+                params = [
+                    {
+                        'user_id': obj.user_id,
+                        'name': obj.name,
+                        'url': obj.url,
+                        'wish_rate': obj.wish_rate,
+                        'price': obj.price,
+                        'note': obj.note,
+                        'created_at': obj.created_at,
+                        'updated_at': obj.updated_at,
+                    }
+                    for obj in objs[start : start + batch_size]
+                ]
+                await self._session.execute(stmt, params)
+        except IntegrityError as e:
+            context = {'user_id': objs[0].user_id}
+            message = handle_integrity_error_message(e, context)
+            logger.critical('Failed to add gifts: IntegrityError for user_id={}: {}', objs[0].user_id, message)
+            raise NotFoundInDbError(message) from None
+        return len(objs)
+
     async def get(self, obj_id: int, current_user_id: int) -> Gift:
-        query = _gift_select_query('g.id = :gift_id')
-        params = {'gift_id': obj_id, 'current_user_id': current_user_id}
         try:
-            result = await self._session.execute(query, params)
-            row = result.mappings().one_or_none()
+            gift = await self._gifts.load((obj_id, current_user_id))
         except Exception as e:
             logger.error('Failed to get gift with id={}: {}', obj_id, type(e).__name__)
             raise
 
-        if row is None:
+        if gift is None:
             logger.warning('Gift with id={} not found', obj_id)
             raise NotFoundInDbError(f'Gift with id={obj_id} not found')
-        return Gift(**row)
+        return gift
 
-    async def get_gifts_by_user_id(self, tg_id: int, current_user_id: int) -> list[Gift]:
-        query = _gift_select_query('g.user_id = :user_id')
-        params = {'user_id': tg_id, 'current_user_id': current_user_id}
+    async def _fetch_gifts(self, keys: Sequence[_GiftKey]) -> dict[_GiftKey, Gift]:
+        gift_ids_by_user: defaultdict[int, list[int]] = defaultdict(list)
+        for gift_id, current_user_id in keys:
+            gift_ids_by_user[current_user_id].append(gift_id)
+
+        query = _gift_select_query('g.id = ANY(CAST(:gift_ids AS bigint[]))')
+        gifts: dict[_GiftKey, Gift] = {}
+        for current_user_id, gift_ids in gift_ids_by_user.items():
+            result = await self._session.execute(query, {'gift_ids': gift_ids, 'current_user_id': current_user_id})
+            for row in result:
+                gift = gift_from_row(row)
+                gifts[gift.id, current_user_id] = gift  # ty:ignore[invalid-assignment]
+        return gifts
+
+    async def get_gifts_by_user_id(
+        self,
+        tg_id: int,
+        current_user_id: int,
+        listing: WishlistQueryDTO = DEFAULT_WISHLIST_QUERY,
+        limit: int | None = None,
+        after: tuple[SortValue, int] | None = None,
+    ) -> list[Gift]:
+        """Gifts of ``tg_id`` in ``listing`` order, optionally only ``limit`` of them following the ``after`` keyset."""
+        query = _wishlist_query(listing, with_cursor=after is not None, with_limit=limit is not None)
+        params: dict[str, object] = {
+            'user_id': tg_id,
+            'current_user_id': current_user_id,
+            'min_price': listing.min_price,
+            'max_price': listing.max_price,
+            'min_wish_rate': listing.min_wish_rate,
+            'limit': limit,
+        }
+        if after is not None:
+            params['after_value'], params['after_id'] = after
         try:
             result = await self._session.execute(query, params)
-            gifts = [Gift(**row) for row in result.mappings()]
+            gifts = [gift_from_row(row) for row in result]
         except Exception as e:
             logger.error('Failed to get gifts for user_id={}: {}', tg_id, type(e).__name__)
             raise
         return gifts
 
+    async def stream_gifts_by_user_id(
+        self,
+        tg_id: int,
+        current_user_id: int,
+        batch_size: int,
+    ) -> AsyncIterator[list[Gift]]:
+        query = _gift_select_query(f'g.user_id = :user_id AND {WISHLIST_ACCESS}')
+        params = {'user_id': tg_id, 'current_user_id': current_user_id}
+        try:
+            result = await self._session.stream(query, params, execution_options={'yield_per': batch_size})
+            async for rows in result.partitions(batch_size):
+                yield [gift_from_row(row) for row in rows]
+        except Exception as e:
+            logger.error('Failed to stream gifts for user_id={}: {}', tg_id, type(e).__name__)
+            raise
+
     async def get_my_reservations(self, current_user_id: int) -> list[GiftWithOwnerDTO]:
-        query = text("""
-            SELECT
-                g.*,
-                gr.gift_id IS NOT NULL AS is_reserved,
-                gr.reserved_by_tg_id AS reserved_by,
-                u.first_name AS owner_first_name,
-                u.last_name AS owner_last_name,
-                u.avatar_url AS owner_avatar_url
-            FROM gifts g
-            JOIN gift_reservations gr ON g.id = gr.gift_id
-            JOIN users u ON g.user_id = u.tg_id
-            WHERE gr.reserved_by_tg_id = :current_user_id
-        """)
+        query = _reservations_query()
         params = {'current_user_id': current_user_id}
         try:
             result = await self._session.execute(query, params)
-            rows = result.mappings().all()
+            gifts = [gift_with_owner_from_row(row) for row in result]
         except Exception as e:
             logger.error('Failed to get reservations for user_id={}: {}', current_user_id, type(e).__name__)
             raise
-        gifts = []
-        for row in rows:
-            owner = GiftOwnerDTO(
-                first_name=row['owner_first_name'],
-                last_name=row['owner_last_name'],
-                avatar_url=row['owner_avatar_url'],
-            )
-            gifts.append(
-                GiftWithOwnerDTO(
-                    id=row['id'],
-                    user_id=row['user_id'],
-                    name=row['name'],
-                    url=row['url'],
-                    wish_rate=row['wish_rate'],
-                    price=row['price'],
-                    note=row['note'],
-                    created_at=row['created_at'],
-                    updated_at=row['updated_at'],
-                    is_reserved=row['is_reserved'],
-                    reserved_by=row['reserved_by'],
-                    owner=owner,
-                )
-            )
         return gifts
 
+    async def get_friends_feed(
+        self,
+        current_user_id: int,
+        limit: int,
+        per_friend: int,
+        before: Keyset | None = None,
+    ) -> list[GiftWithOwnerDTO]:
+        query = _friends_feed_query(with_cursor=before is not None)
+        params: dict[str, object] = {'current_user_id': current_user_id, 'limit': limit, 'per_friend': per_friend}
+        if before is not None:
+            params['before_created_at'], params['before_id'] = before
+        try:
+            result = await self._session.execute(query, params)
+            gifts = [gift_with_owner_from_row(row) for row in result]
+        except Exception as e:
+            logger.error('Failed to get friends feed for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+        return gifts
+
+    async def search(self, current_user_id: int, query: str, limit: int, offset: int) -> list[GiftWithOwnerDTO]:
+        """Rank friends' gifts whose name or note contains words starting with every word of the query."""
+        params = {'current_user_id': current_user_id, 'query': query, 'limit': limit, 'offset': offset}
+        try:
+            result = await self._session.execute(_gift_search_query(), params)
+            gifts = [gift_with_owner_from_row(row) for row in result]
+        except Exception as e:
+            logger.error('Failed to search gifts for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+        return gifts
+
+    async def stream_my_reservations(
+        self,
+        current_user_id: int,
+        batch_size: int,
+    ) -> AsyncIterator[list[GiftWithOwnerDTO]]:
+        query = _reservations_query()
+        params = {'current_user_id': current_user_id}
+        try:
+            result = await self._session.stream(query, params, execution_options={'yield_per': batch_size})
+            async for rows in result.partitions(batch_size):
+                yield [gift_with_owner_from_row(row) for row in rows]
+        except Exception as e:
+            logger.error('Failed to stream reservations for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+
+    async def update(
+        self,
+        gift_id: int,
+        current_user_id: int,
+        changes: GiftChanges,
+        version: int | None,
+    ) -> Gift | None:
+        """Apply ``changes`` to a gift of the current user if it is still at ``version`` (any version for ``None``).
+
+        Returns the updated gift, or ``None`` when no row matched: the gift does not exist, belongs to someone else
+        or was changed in the meantime.
+        """
+        columns = [column for column in UPDATABLE_COLUMNS if column in changes]
+        query = _gift_update_query(columns, check_version=version is not None)
+        params: dict[str, object] = {
+            **changes,
+            'gift_id': gift_id,
+            'current_user_id': current_user_id,
+            'updated_at': datetime.now(UTC),
+        }
+        if version is not None:
+            params['version'] = version
+        self._gifts.clear_all()
+        try:
+            result = await self._session.execute(query, params)
+            row = result.first()
+        except Exception as e:
+            logger.error('Failed to update gift with id={}: {}', gift_id, type(e).__name__)
+            raise
+        return gift_from_row(row) if row is not None else None
+
     async def delete(self, obj_id: int) -> None:
         stmt = text("""
             DELETE FROM gifts WHERE id = :gift_id;
         """)
         params = {'gift_id': obj_id}
+        self._gifts.clear_all()
         try:
             await self._session.execute(stmt, params)
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to delete gift with id={}: {}', obj_id, type(e).__name__)
             raise
@@ -150,9 +407,9 @@ class GiftRepository(BaseRepository[Gift]):
             'reserved_by_tg_id': current_user_id,
             'created_at': datetime.now(UTC),
         }
+        self._gifts.clear_all()
         try:
             await self._session.execute(stmt, params)
-            await self._session.commit()
         except IntegrityError as e:
             context = {
                 'gift_id': gift_id,
@@ -165,14 +422,48 @@ class GiftRepository(BaseRepository[Gift]):
             logger.error('Failed to add reservation for gift_id={}: {}', gift_id, type(e).__name__)
             raise
 
+    async def add_reservations(self, gift_ids: Sequence[int], current_user_id: int) -> list[int]:
+        """Reserve the gifts of ``gift_ids`` the user may reserve, returning the owner of every gift reserved."""
+        stmt = text("""
+            WITH reserved AS (
+                INSERT INTO gift_reservations (gift_id, reserved_by_tg_id, created_at)
+                SELECT g.id, :current_user_id, :created_at
+                FROM gifts g
+                WHERE g.id = ANY(CAST(:gift_ids AS bigint[]))
+                AND (
+                  g.user_id = :current_user_id
+                  OR EXISTS (
+                    SELECT 1 FROM friends f
+                    WHERE f.user_tg_id = g.user_id
+                    AND f.friend_tg_id = :current_user_id
+                  )
+                )
+                ON CONFLICT DO NOTHING
+                RETURNING gift_id
+            )
+            SELECT g.user_id FROM reserved r JOIN gifts g ON g.id = r.gift_id
+        """)
+        params = {
+            'gift_ids': list(gift_ids),
+            'current_user_id': current_user_id,
+            'created_at': datetime.now(UTC),
+        }
+        self._gifts.clear_all()
+        try:
+            result = await self._session.execute(stmt, params)
+        except Exception as e:
+            logger.error('Failed to add reservations for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+        return list(result.scalars())
+
     async def delete_reservation(self, gift_id: int) -> None:
         stmt = text("""
           DELETE FROM gift_reservations WHERE gift_id = :gift_id
         """)
         params = {'gift_id': gift_id}
+        self._gifts.clear_all()
         try:
             await self._session.execute(stmt, params)
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to delete reservation for gift_id={}: {}', gift_id, type(e).__name__)
             raise
@@ -198,8 +489,25 @@ class GiftRepository(BaseRepository[Gift]):
         }
         try:
             result = await self._session.execute(query, params)
-            await self._session.commit()
             return result.scalar()
         except Exception as e:
             logger.error('Failed to check if user is friend or owner for gift_id={}: {}', gift_id, type(e).__name__)
             raise
+
+    async def can_view_wishlist(self, tg_id: int, current_user_id: int) -> bool:
+        query = text(f'SELECT {WISHLIST_ACCESS}')
+        params = {'user_id': tg_id, 'current_user_id': current_user_id}
+        try:
+            result = await self._session.execute(query, params)
+            return result.scalar_one()
+        except Exception as e:
+            logger.error('Failed to check wishlist access for user_id={}: {}', tg_id, type(e).__name__)
+            raise
+
+    async def warm_up(self) -> None:
+        """Run the hot read statements once for an id that matches nothing, so the connection has them prepared."""
+        await self._fetch_gifts([(0, 0)])
+        await self.get_gifts_by_user_id(0, 0)
+        await self.get_my_reservations(0)
+        await self.get_friends_feed(0, 1, 1)
+        await self.is_friend_or_owner(0, 0)
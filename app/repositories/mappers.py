@@ -0,0 +1,107 @@
+from collections.abc import Sequence
+from typing import Any
+from typing import Final
+
+from domain.gifts import Gift
+from domain.users import User
+from dto.gifts import GiftOwnerDTO
+from dto.gifts import GiftWithOwnerDTO
+from dto.users import AccountDeletionDTO
+from dto.users import FriendRequestDTO
+from dto.users import FriendWithStatsDTO
+from dto.users import WishlistStatsDTO
+
+# Column lists are spelled out instead of ``g.*`` / ``u.*`` so that the position of every column is fixed
+# by the query rather than by the physical table layout (``price`` and ``note`` were added to ``gifts`` later).
+# They follow the field order of the corresponding dataclasses, which lets the mappers build objects positionally.
+GIFT_COLUMNS: Final[str] = (
+    'g.id, g.user_id, g.name, g.url, g.wish_rate, g.price, g.note, g.created_at, g.updated_at, g.version'
+)
+USER_COLUMNS: Final[str] = 'u.tg_id, u.tg_username, u.first_name, u.last_name, u.avatar_url, u.created_at, u.updated_at'
+OWNER_COLUMNS: Final[str] = 'u.first_name, u.last_name, u.avatar_url'
+ACCOUNT_DELETION_COLUMNS: Final[str] = (
+    'd.user_tg_id, d.status, d.friend_requests_deleted, d.friends_deleted, d.reservations_deleted, d.gifts_deleted, '
+    'd.created_at, d.updated_at, d.finished_at'
+)
+
+# Search expressions must stay identical to the expressions of the GIN indexes built on them, or the indexes go unused.
+GIFT_SEARCH_VECTOR: Final[str] = "to_tsvector('simple', g.name || ' ' || COALESCE(g.note, ''))"
+# Every word of the search box as a prefix, so that a half-typed word already matches. Quoting the lexemes keeps
+# tsquery operators typed by the user from being interpreted; a query without words yields NULL and matches nothing.
+GIFT_SEARCH_QUERY: Final[str] = (
+    "SELECT to_tsquery('simple', string_agg(quote_literal(word) || ':*', ' & ')) AS query "
+    "FROM unnest(to_tsvector('simple', CAST(:query AS text))) AS t(word)"
+)
+USER_SEARCH_TEXT: Final[str] = (
+    "COALESCE(u.tg_username, '') || ' ' || COALESCE(u.first_name, '') || ' ' || COALESCE(u.last_name, '')"
+)
+# Aggregates of one wishlist, for a ``CROSS JOIN LATERAL`` correlated on ``g.user_id``: each owner is counted with
+# a scan of their own index range of ``gifts`` and an owner without gifts still yields a row of zeros.
+WISHLIST_STATS: Final[str] = """
+    SELECT
+        count(*) AS gift_count,
+        count(*) FILTER (WHERE gr.gift_id IS NULL) AS unreserved_count,
+        max(g.created_at) AS latest_gift_at
+    FROM gifts g
+    LEFT JOIN gift_reservations gr ON gr.gift_id = g.id
+"""
+WISHLIST_STATS_COLUMNS: Final[str] = 's.gift_count, s.unreserved_count, s.latest_gift_at'
+
+type RowTuple = Sequence[Any]
+
+
+def gift_from_row(row: RowTuple) -> Gift:
+    """Build a gift from ``GIFT_COLUMNS, is_reserved, reserved_by``."""
+    return Gift(*row)
+
+
+def gift_with_owner_from_row(row: RowTuple) -> GiftWithOwnerDTO:
+    """Build a gift with its owner from ``GIFT_COLUMNS, is_reserved, reserved_by, OWNER_COLUMNS``."""
+    return GiftWithOwnerDTO(
+        row[0],
+        row[1],
+        row[2],
+        row[3],
+        row[4],
+        row[5],
+        row[6],
+        row[7],
+        row[8],
+        row[9],
+        row[10],
+        row[11],
+        GiftOwnerDTO(row[12], row[13], row[14]),
+    )
+
+
+def user_from_row(row: RowTuple) -> User:
+    """Build a user from ``USER_COLUMNS``."""
+    return User(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
+
+
+def wishlist_stats_from_row(row: RowTuple) -> WishlistStatsDTO:
+    """Build wishlist stats from ``WISHLIST_STATS_COLUMNS``."""
+    return WishlistStatsDTO(row[0], row[1], row[2])
+
+
+def friend_with_stats_from_row(row: RowTuple) -> FriendWithStatsDTO:
+    """Build a friend with their wishlist stats from ``USER_COLUMNS, WISHLIST_STATS_COLUMNS``."""
+    return FriendWithStatsDTO(user_from_row(row), wishlist_stats_from_row(row[7:]))
+
+
+def friend_request_from_row(row: RowTuple) -> FriendRequestDTO:
+    """Build a friend request from ``sender, receiver, status, created_at, first_name, last_name, username``."""
+    first_name, last_name = row[4], row[5]
+    return FriendRequestDTO(
+        row[0],
+        row[1],
+        row[2],
+        row[3],
+        f'{first_name} {last_name}' if last_name else first_name,
+        row[6],
+    )
+
+
+def account_deletion_from_row(row: RowTuple) -> AccountDeletionDTO:
+    """Build an account deletion from ``ACCOUNT_DELETION_COLUMNS``."""
+    return AccountDeletionDTO(*row)
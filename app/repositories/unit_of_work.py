@@ -0,0 +1,40 @@
+from types import TracebackType
+from typing import Final
+from typing import Self
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.base import reset_identity_map
+
+_DEPTH_KEY: Final[str] = 'unit_of_work_depth'
+
+
+class UnitOfWork:
+    """Transaction boundary of a service call.
+
+    Repositories never commit; the outermost ``async with`` block commits once on success and rolls back on error.
+    Nested blocks on the same session (a service method calling another one) join the outer transaction.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def __aenter__(self) -> Self:
+        self._session.info[_DEPTH_KEY] = self._session.info.get(_DEPTH_KEY, 0) + 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        depth = self._session.info[_DEPTH_KEY] - 1
+        self._session.info[_DEPTH_KEY] = depth
+        if depth:
+            return
+        if exc_type is None:
+            await self._session.commit()
+        else:
+            await self._session.rollback()
+            reset_identity_map(self._session)
@@ -1,20 +1,223 @@
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
 from datetime import UTC
 from datetime import datetime
+from typing import Final
 
 from loguru import logger
+from sqlalchemy import TextClause
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 
+from domain.users import AccountDeletionStatus
+from domain.users import AccountDeletionStep
+from domain.users import FriendAction
 from domain.users import User
+from dto.users import AccountDeletionDTO
 from dto.users import FriendRequestDTO
+from dto.users import FriendWithStatsDTO
+from dto.users import MutualFriendsDTO
 from dto.users import UserRelationsDTO
+from dto.users import WishlistStatsDTO
 from exceptions.database import AlreadyExistsInDbError
 from exceptions.database import NotFoundInDbError
 from repositories.base import BaseRepository
+from repositories.mappers import ACCOUNT_DELETION_COLUMNS
+from repositories.mappers import USER_COLUMNS
+from repositories.mappers import USER_SEARCH_TEXT
+from repositories.mappers import WISHLIST_STATS
+from repositories.mappers import WISHLIST_STATS_COLUMNS
+from repositories.mappers import account_deletion_from_row
+from repositories.mappers import friend_request_from_row
+from repositories.mappers import friend_with_stats_from_row
+from repositories.mappers import user_from_row
+from repositories.mappers import wishlist_stats_from_row
+from utils import DataLoader
 from utils import handle_integrity_error_message
 
 
+def _friends_query() -> TextClause:
+    return text(f"""
+        SELECT {USER_COLUMNS}
+        FROM users u
+        JOIN friends f ON f.friend_tg_id = u.tg_id
+        WHERE f.user_tg_id = :tg_id
+    """)
+
+
+def _friends_search_query() -> TextClause:
+    return text(f"""
+        SELECT {USER_COLUMNS}
+        FROM friends f
+        JOIN users u ON u.tg_id = f.friend_tg_id
+        WHERE f.user_tg_id = :tg_id
+        AND CAST(:query AS text) <% ({USER_SEARCH_TEXT})
+        ORDER BY word_similarity(CAST(:query AS text), {USER_SEARCH_TEXT}) DESC, u.tg_id
+        LIMIT :limit
+        OFFSET :offset
+    """)
+
+
+def _friends_with_stats_query() -> TextClause:
+    return text(f"""
+        SELECT {USER_COLUMNS}, {WISHLIST_STATS_COLUMNS}
+        FROM friends f
+        JOIN users u ON u.tg_id = f.friend_tg_id
+        CROSS JOIN LATERAL ({WISHLIST_STATS} WHERE g.user_id = f.friend_tg_id) s
+        WHERE f.user_tg_id = :tg_id
+        ORDER BY s.latest_gift_at DESC NULLS LAST, u.tg_id
+    """)
+
+
+def _wishlist_stats_query() -> TextClause:
+    return text(f"""
+        SELECT o.user_id, {WISHLIST_STATS_COLUMNS}
+        FROM unnest(CAST(:ids AS bigint[])) AS o(user_id)
+        CROSS JOIN LATERAL ({WISHLIST_STATS} WHERE g.user_id = o.user_id) s
+    """)
+
+
+def _friend_suggestions_query() -> TextClause:
+    return text("""
+        WITH sources AS (
+            SELECT f.friend_tg_id
+            FROM friends f
+            WHERE f.user_tg_id = :tg_id
+            ORDER BY f.created_at DESC
+            LIMIT :max_sources
+        )
+        SELECT fof.friend_tg_id, count(*) AS mutual_count
+        FROM sources s
+        CROSS JOIN LATERAL (
+            SELECT n.friend_tg_id
+            FROM friends n
+            WHERE n.user_tg_id = s.friend_tg_id
+            LIMIT :max_per_source
+        ) fof
+        WHERE fof.friend_tg_id <> :tg_id
+        AND NOT EXISTS (
+            SELECT 1 FROM friends mine
+            WHERE mine.user_tg_id = :tg_id AND mine.friend_tg_id = fof.friend_tg_id
+        )
+        GROUP BY fof.friend_tg_id
+        ORDER BY mutual_count DESC, fof.friend_tg_id
+        LIMIT :limit
+    """)
+
+
+def _delete_friend_query() -> TextClause:
+    return text("""
+        WITH user_reservations AS (
+            DELETE FROM gift_reservations gr
+            WHERE gr.reserved_by_tg_id = :user_id
+            AND (SELECT g.user_id FROM gifts g WHERE g.id = gr.gift_id) = :friend_id
+        ),
+        friend_reservations AS (
+            DELETE FROM gift_reservations gr
+            WHERE gr.reserved_by_tg_id = :friend_id
+            AND (SELECT g.user_id FROM gifts g WHERE g.id = gr.gift_id) = :user_id
+        )
+        DELETE
+        FROM friends
+        WHERE (user_tg_id = :user_id AND friend_tg_id = :friend_id)
+            OR (user_tg_id = :friend_id AND friend_tg_id = :user_id)
+    """)
+
+
+# Per step of an account deletion: the progress counter it adds to, and CTEs ending in ``deleted``, which removes
+# up to ``:limit`` rows and returns one id per row, found through an index on the user's id.
+_ACCOUNT_DELETION_BATCHES: Final[dict[AccountDeletionStep, tuple[str, str]]] = {
+    AccountDeletionStep.FRIEND_REQUESTS: (
+        'friend_requests_deleted',
+        """
+        batch AS (
+            SELECT sender_tg_id, receiver_tg_id
+            FROM friend_requests
+            WHERE sender_tg_id = :user_id OR receiver_tg_id = :user_id
+            LIMIT :limit
+        ),
+        deleted AS (
+            DELETE FROM friend_requests fr
+            USING batch b
+            WHERE fr.sender_tg_id = b.sender_tg_id
+            AND fr.receiver_tg_id = b.receiver_tg_id
+            RETURNING CASE WHEN fr.sender_tg_id = :user_id THEN fr.receiver_tg_id ELSE fr.sender_tg_id END AS id
+        )
+        """,
+    ),
+    AccountDeletionStep.FRIENDS: (
+        'friends_deleted',
+        """
+        batch AS (
+            SELECT friend_tg_id
+            FROM friends
+            WHERE user_tg_id = :user_id
+            LIMIT :limit
+        ),
+        reverse AS (
+            DELETE FROM friends f
+            USING batch b
+            WHERE f.user_tg_id = b.friend_tg_id
+            AND f.friend_tg_id = :user_id
+        ),
+        deleted AS (
+            DELETE FROM friends f
+            USING batch b
+            WHERE f.user_tg_id = :user_id
+            AND f.friend_tg_id = b.friend_tg_id
+            RETURNING f.friend_tg_id AS id
+        )
+        """,
+    ),
+    AccountDeletionStep.RESERVATIONS: (
+        'reservations_deleted',
+        """
+        batch AS (
+            SELECT gift_id
+            FROM gift_reservations
+            WHERE reserved_by_tg_id = :user_id
+            LIMIT :limit
+        ),
+        deleted AS (
+            DELETE FROM gift_reservations gr
+            USING batch b, gifts g
+            WHERE gr.gift_id = b.gift_id
+            AND g.id = gr.gift_id
+            RETURNING g.user_id AS id
+        )
+        """,
+    ),
+    AccountDeletionStep.GIFTS: (
+        'gifts_deleted',
+        """
+        deleted AS (
+            DELETE FROM gifts
+            WHERE id IN (SELECT id FROM gifts WHERE user_id = :user_id LIMIT :limit)
+            RETURNING id
+        )
+        """,
+    ),
+}
+
+
+def _account_deletion_batch_query(step: AccountDeletionStep) -> TextClause:
+    counter, ctes = _ACCOUNT_DELETION_BATCHES[step]
+    return text(f"""
+        WITH {ctes},
+        progress AS (
+            UPDATE account_deletions
+            SET {counter} = {counter} + (SELECT count(*) FROM deleted), updated_at = :now
+            WHERE user_tg_id = :user_id
+        )
+        SELECT id FROM deleted
+    """)
+
+
 class UserRepository(BaseRepository[User]):
+    @property
+    def _users(self) -> DataLoader[int, User]:
+        return self._loader('users', self._fetch_users)
+
     async def add(self, obj: User) -> int:
         stmt = text("""
             INSERT INTO users (tg_id, tg_username, first_name, last_name, avatar_url, created_at, updated_at)
@@ -32,7 +235,6 @@ class UserRepository(BaseRepository[User]):
 
         try:
             await self._session.execute(stmt, params)
-            await self._session.commit()
         except IntegrityError as e:
             context = {'tg_id': obj.tg_id}
             message = handle_integrity_error_message(e, context)
@@ -41,6 +243,7 @@ class UserRepository(BaseRepository[User]):
         except Exception as e:
             logger.error('Unexpected error adding user with tg_id={}: {}', obj.tg_id, type(e).__name__)
             raise
+        self._users.prime(obj.tg_id, obj)
         return obj.tg_id
 
     async def update(self, tg_id: int, **fields: str | int | datetime) -> None:
@@ -52,49 +255,127 @@ class UserRepository(BaseRepository[User]):
         query = f'UPDATE users SET {set_clause} WHERE tg_id = :tg_id'
         stmt = text(query)
         params = {'tg_id': tg_id, **fields}
+        self._users.clear(tg_id)
 
         try:
             await self._session.execute(stmt, params)
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to update user with tg_id={}: {}', tg_id, type(e).__name__)
             raise
 
     async def get_friends(self, user_id: int) -> list[User]:
-        query = text("""
-          SELECT u.*
-          FROM users u
-          JOIN friends f ON f.friend_tg_id = u.tg_id
-          WHERE f.user_tg_id = :tg_id
-        """)
+        query = _friends_query()
         params = {'tg_id': user_id}
 
         try:
             query_result = await self._session.execute(query, params)
-            rows = query_result.mappings().all()
-            return [User(**row) for row in rows]
+            return [user_from_row(row) for row in query_result]
         except Exception as e:
             logger.error('Failed to get friends for user with tg_id={}: {}', user_id, type(e).__name__)
             raise
 
-    async def get(self, obj_id: int) -> User:
-        query = text("""
-          SELECT *
-          FROM users u
-          WHERE u.tg_id = :tg_id;
-        """)
+    async def stream_friends(self, user_id: int, batch_size: int) -> AsyncIterator[list[User]]:
+        query = _friends_query()
+        params = {'tg_id': user_id}
+
+        try:
+            result = await self._session.stream(query, params, execution_options={'yield_per': batch_size})
+            async for rows in result.partitions(batch_size):
+                yield [user_from_row(row) for row in rows]
+        except Exception as e:
+            logger.error('Failed to stream friends for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
+
+    async def get_friends_with_stats(self, user_id: int) -> list[FriendWithStatsDTO]:
+        """Return the user's friends with their wishlist stats, most recently added to first, in one query."""
+        params = {'tg_id': user_id}
+
+        try:
+            query_result = await self._session.execute(_friends_with_stats_query(), params)
+            return [friend_with_stats_from_row(row) for row in query_result]
+        except Exception as e:
+            logger.error('Failed to get friends with stats for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
+
+    async def get_wishlist_stats(self, ids: Sequence[int]) -> dict[int, WishlistStatsDTO]:
+        """Return the wishlist stats of every user in ``ids``, zeros for users without gifts, in one query."""
+        try:
+            result = await self._session.execute(_wishlist_stats_query(), {'ids': list(ids)})
+            return {row[0]: wishlist_stats_from_row(row[1:]) for row in result}
+        except Exception as e:
+            logger.error('Failed to get wishlist stats, count={}: {}', len(ids), type(e).__name__)
+            raise
+
+    async def get_friend_suggestions(
+        self,
+        user_id: int,
+        limit: int,
+        max_sources: int,
+        max_per_source: int,
+    ) -> list[MutualFriendsDTO]:
+        """Rank friends of the user's friends who are not yet their friends by mutual friend count.
+
+        The self-join reads at most ``max_sources`` friends, the most recently added, and ``max_per_source`` friends
+        of each, so a user with thousands of friends costs a bounded number of index reads. Counts are exact below
+        those limits and a lower bound above them.
+        """
+        params = {
+            'tg_id': user_id,
+            'limit': limit,
+            'max_sources': max_sources,
+            'max_per_source': max_per_source,
+        }
+
+        try:
+            result = await self._session.execute(_friend_suggestions_query(), params)
+            return [MutualFriendsDTO(tg_id, mutual_count) for tg_id, mutual_count in result]
+        except Exception as e:
+            logger.error('Failed to get friend suggestions for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
+
+    async def search_friends(self, user_id: int, query: str, limit: int, offset: int) -> list[User]:
+        """Rank friends by trigram word similarity of the query to their username and names."""
+        params = {'tg_id': user_id, 'query': query, 'limit': limit, 'offset': offset}
+
+        try:
+            query_result = await self._session.execute(_friends_search_query(), params)
+            return [user_from_row(row) for row in query_result]
+        except Exception as e:
+            logger.error('Failed to search friends for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
 
+    async def get(self, obj_id: int) -> User:
         try:
-            result = await self._session.execute(query, {'tg_id': obj_id})
-            row = result.mappings().one_or_none()
+            user = await self._users.load(obj_id)
         except Exception as e:
             logger.error('Failed to get user with tg_id={}: {}', obj_id, type(e).__name__)
             raise
-        if row is None:
+        if user is None:
             logger.warning('User with tg_id={} not found in DB', obj_id)
             raise NotFoundInDbError(f'User with id={obj_id} not found')
 
-        return User(**row)
+        return user
+
+    async def load_many(self, ids: Sequence[int]) -> list[User]:
+        """Return the users found for ``ids``, in the order of ``ids``, through the request's identity map."""
+        return [user for user in await self._users.load_many(ids) if user is not None]
+
+    async def get_many(self, ids: Sequence[int]) -> list[User]:
+        query = text(f"""
+          SELECT {USER_COLUMNS}
+          FROM users u
+          WHERE u.tg_id = ANY(CAST(:ids AS bigint[]));
+        """)
+
+        try:
+            result = await self._session.execute(query, {'ids': list(ids)})
+            return [user_from_row(row) for row in result]
+        except Exception as e:
+            logger.error('Failed to get users by ids, count={}: {}', len(ids), type(e).__name__)
+            raise
+
+    async def _fetch_users(self, ids: Sequence[int]) -> dict[int, User]:
+        return {user.tg_id: user for user in await self.get_many(ids)}
 
     async def get_user_relations(self, user_id: int) -> UserRelationsDTO:
         stmt = text("""
@@ -117,20 +398,19 @@ class UserRepository(BaseRepository[User]):
 
         try:
             result = await self._session.execute(stmt, {'user_id': user_id})
-            rows = result.mappings().all()
 
             friends_ids: set[int] = set()
             incoming: set[int] = set()
             outgoing: set[int] = set()
 
-            for row in rows:
-                match row['relation_type']:
+            for relation_type, target_id in result:
+                match relation_type:
                     case 'friend':
-                        friends_ids.add(row['target_id'])
+                        friends_ids.add(target_id)
                     case 'incoming':
-                        incoming.add(row['target_id'])
+                        incoming.add(target_id)
                     case 'outgoing':
-                        outgoing.add(row['target_id'])
+                        outgoing.add(target_id)
 
             return UserRelationsDTO(
                 friends_ids=friends_ids,
@@ -151,11 +431,88 @@ class UserRepository(BaseRepository[User]):
 
         try:
             await self._session.execute(stmt, {'sender_id': sender_id, 'receiver_id': receiver_id})
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to send friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
             raise
 
+    async def apply_friend_request(self, sender_id: int, receiver_id: int) -> FriendAction:
+        """Resolve the pair's ``FriendAction`` and apply it in one statement.
+
+        Mirrors ``User.resolve_friend_action``: an existing friendship wins, then a reciprocal pending request is
+        accepted, then an already sent request is left alone, otherwise a new request is sent.
+        Only the two users' rows are read.
+        """
+        stmt = text("""
+            WITH pair AS (
+                SELECT
+                    EXISTS (SELECT 1 FROM users WHERE tg_id = :sender_id) AS sender_exists,
+                    EXISTS (SELECT 1 FROM users WHERE tg_id = :receiver_id) AS receiver_exists,
+                    EXISTS (
+                        SELECT 1 FROM friends
+                        WHERE user_tg_id = :sender_id AND friend_tg_id = :receiver_id
+                    ) AS are_friends,
+                    EXISTS (
+                        SELECT 1 FROM friend_requests
+                        WHERE sender_tg_id = :receiver_id AND receiver_tg_id = :sender_id AND status = 'pending'
+                    ) AS has_incoming,
+                    EXISTS (
+                        SELECT 1 FROM friend_requests
+                        WHERE sender_tg_id = :sender_id AND receiver_tg_id = :receiver_id AND status = 'pending'
+                    ) AS has_outgoing
+            ),
+            resolved AS (
+                SELECT
+                    sender_exists,
+                    receiver_exists,
+                    CASE
+                        WHEN NOT (sender_exists AND receiver_exists) THEN NULL
+                        WHEN are_friends THEN 'already_friends'
+                        WHEN has_incoming THEN 'add_friend'
+                        WHEN has_outgoing THEN 'request_already_sent'
+                        ELSE 'send_request'
+                    END AS action
+                FROM pair
+            ),
+            accepted AS (
+                UPDATE friend_requests
+                SET status = 'accepted', updated_at = NOW()
+                WHERE sender_tg_id = :receiver_id AND receiver_tg_id = :sender_id AND status = 'pending'
+                AND (SELECT action FROM resolved) = 'add_friend'
+            ),
+            befriended AS (
+                INSERT INTO friends (user_tg_id, friend_tg_id)
+                SELECT v.user_tg_id, v.friend_tg_id
+                FROM (
+                    VALUES
+                        (CAST(:sender_id AS bigint), CAST(:receiver_id AS bigint)),
+                        (CAST(:receiver_id AS bigint), CAST(:sender_id AS bigint))
+                ) AS v (user_tg_id, friend_tg_id)
+                WHERE (SELECT action FROM resolved) = 'add_friend'
+                ON CONFLICT DO NOTHING
+            ),
+            requested AS (
+                INSERT INTO friend_requests (sender_tg_id, receiver_tg_id, status)
+                SELECT :sender_id, :receiver_id, 'pending'
+                WHERE (SELECT action FROM resolved) = 'send_request'
+                ON CONFLICT (sender_tg_id, receiver_tg_id)
+                DO UPDATE SET status = 'pending', updated_at = NOW()
+            )
+            SELECT sender_exists, receiver_exists, action FROM resolved
+        """)
+        params = {'sender_id': sender_id, 'receiver_id': receiver_id}
+
+        try:
+            result = await self._session.execute(stmt, params)
+            sender_exists, receiver_exists, action = result.one()
+        except Exception as e:
+            logger.error('Failed to apply friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
+            raise
+        for tg_id, exists in ((sender_id, sender_exists), (receiver_id, receiver_exists)):
+            if not exists:
+                logger.warning('User with tg_id={} not found in DB', tg_id)
+                raise NotFoundInDbError(f'User with id={tg_id} not found')
+        return FriendAction(action)
+
     async def get_pending_requests(self, user_id: int) -> list[FriendRequestDTO]:
         stmt = text("""
             SELECT
@@ -174,21 +531,7 @@ class UserRepository(BaseRepository[User]):
 
         try:
             result = await self._session.execute(stmt, {'user_id': user_id})
-            rows = result.mappings().all()
-
-            return [
-                FriendRequestDTO(
-                    sender_tg_id=row['sender_tg_id'],
-                    receiver_tg_id=row['receiver_tg_id'],
-                    status=row['status'],
-                    created_at=row['created_at'],
-                    sender_name=f'{row["sender_first_name"]} {row["sender_last_name"]}'
-                    if row['sender_last_name']
-                    else row['sender_first_name'],
-                    sender_username=row['sender_username'],
-                )
-                for row in rows
-            ]
+            return [friend_request_from_row(row) for row in result]
         except Exception as e:
             logger.error('Failed to get pending requests for user_id={}: {}', user_id, type(e).__name__)
             raise
@@ -210,7 +553,6 @@ class UserRepository(BaseRepository[User]):
         try:
             await self._session.execute(stmt_update, {'sender_id': sender_id, 'receiver_id': receiver_id})
             await self._session.execute(stmt_friends, {'user1': sender_id, 'user2': receiver_id})
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to accept friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
             raise
@@ -224,34 +566,143 @@ class UserRepository(BaseRepository[User]):
 
         try:
             await self._session.execute(stmt, {'sender_id': sender_id, 'receiver_id': receiver_id})
-            await self._session.commit()
         except Exception as e:
             logger.error('Failed to reject friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
             raise
 
     async def delete_friend(self, user_id: int, friend_id: int) -> None:
-        stmt1 = text("""
-            DELETE
-            FROM gift_reservations
-            WHERE gift_id IN (
-                SELECT g.id FROM gifts g
-                WHERE (g.user_id = :user_id OR g.user_id = :friend_id)
-            )
-            AND (reserved_by_tg_id = :user_id OR reserved_by_tg_id = :friend_id)
+        """Delete the friendship both ways together with each side's reservations of the other's gifts.
+
+        Each reservation delete starts from the reserver's few rows in ``idx_gift_reservations_reserved_by_tg_id``
+        and checks the gift's owner by primary key, so the size of either wishlist does not matter. The owner check
+        is a correlated subquery rather than a join so that a generic plan of the prepared statement cannot start
+        from the owner's gifts instead.
+        """
+        stmt = _delete_friend_query()
+        params = {'user_id': user_id, 'friend_id': friend_id}
+
+        try:
+            await self._session.execute(stmt, params)
+        except Exception as e:
+            logger.error('Failed to delete friend {} for user {}: {}', friend_id, user_id, type(e).__name__)
+            raise
+
+    async def start_account_deletion(self, user_id: int) -> AccountDeletionDTO:
+        """Mark the deletion of the user's account as running.
+
+        A deletion that was stopped keeps its progress; a completed one of an account that has been registered
+        again since is started over.
+        """
+        restart = text("""
+            DELETE FROM account_deletions
+            WHERE user_tg_id = :user_id
+            AND status = :completed
+            AND EXISTS (SELECT 1 FROM users WHERE tg_id = :user_id)
         """)
+        start = text(f"""
+            INSERT INTO account_deletions AS d (user_tg_id, status, created_at, updated_at)
+            SELECT tg_id, :running, :now, :now FROM users WHERE tg_id = :user_id
+            ON CONFLICT (user_tg_id) DO UPDATE
+            SET status = EXCLUDED.status, updated_at = EXCLUDED.updated_at, finished_at = NULL
+            RETURNING {ACCOUNT_DELETION_COLUMNS}
+        """)
+        params = {
+            'user_id': user_id,
+            'running': AccountDeletionStatus.RUNNING,
+            'completed': AccountDeletionStatus.COMPLETED,
+            'now': datetime.now(UTC),
+        }
 
-        stmt2 = text("""
-            DELETE
-            FROM friends
-            WHERE (user_tg_id = :user_id AND friend_tg_id = :friend_id)
-                OR (user_tg_id = :friend_id AND friend_tg_id = :user_id)
+        try:
+            await self._session.execute(restart, params)
+            result = await self._session.execute(start, params)
+            row = result.first()
+        except Exception as e:
+            logger.error('Failed to start account deletion for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
+        if row is None:
+            logger.warning('User with tg_id={} not found in DB', user_id)
+            raise NotFoundInDbError(f'User with id={user_id} not found')
+        return account_deletion_from_row(row)
+
+    async def get_account_deletion(self, user_id: int) -> AccountDeletionDTO:
+        query = text(f'SELECT {ACCOUNT_DELETION_COLUMNS} FROM account_deletions d WHERE d.user_tg_id = :user_id')
+        params = {'user_id': user_id}
+
+        try:
+            result = await self._session.execute(query, params)
+            row = result.first()
+        except Exception as e:
+            logger.error('Failed to get account deletion for user with tg_id={}: {}', user_id, type(e).__name__)
+            raise
+        if row is None:
+            logger.warning('Account deletion of user with tg_id={} not found in DB', user_id)
+            raise NotFoundInDbError(f'Account deletion of user with id={user_id} not found')
+        return account_deletion_from_row(row)
+
+    async def delete_account_batch(self, user_id: int, step: AccountDeletionStep, limit: int) -> list[int]:
+        """Delete up to ``limit`` rows of one step of the user's account deletion and count them in its progress.
+
+        Returns an id per deleted row: the other user of a friend request or friendship, the owner of a reserved
+        gift, the id of a gift. Reservations of a deleted gift go with it through the foreign key, one per gift.
+        """
+        params = {'user_id': user_id, 'limit': limit, 'now': datetime.now(UTC)}
+
+        try:
+            result = await self._session.execute(_account_deletion_batch_query(step), params)
+            return list(result.scalars())
+        except Exception as e:
+            logger.error('Failed to delete {} of user with tg_id={}: {}', step, user_id, type(e).__name__)
+            raise
+
+    async def finish_account_deletion(self, user_id: int, status: AccountDeletionStatus) -> None:
+        """Record how the user's account deletion ended, deleting the user row itself once it has completed.
+
+        By then only rows written while the batches ran are left to cascade from ``users``.
+        """
+        delete_user = 'WITH deleted_user AS (DELETE FROM users WHERE tg_id = :user_id)'
+        stmt = text(f"""
+            {delete_user if status is AccountDeletionStatus.COMPLETED else ''}
+            UPDATE account_deletions
+            SET status = :status, updated_at = :now, finished_at = :now
+            WHERE user_tg_id = :user_id
         """)
-        params = {'user_id': user_id, 'friend_id': friend_id}
+        params = {'user_id': user_id, 'status': status, 'now': datetime.now(UTC)}
+        self._users.clear(user_id)
 
         try:
-            await self._session.execute(stmt1, params)
-            await self._session.execute(stmt2, params)
-            await self._session.commit()
+            await self._session.execute(stmt, params)
         except Exception as e:
-            logger.error('Failed to delete friend {} for user {}: {}', friend_id, user_id, type(e).__name__)
+            logger.error('Failed to finish account deletion for user with tg_id={}: {}', user_id, type(e).__name__)
             raise
+
+    async def resume_stopped_account_deletions(self) -> list[int]:
+        """Mark every stopped account deletion as running again and return the ids of their users.
+
+        Each row is claimed by one caller only, so concurrently starting workers do not resume a deletion twice.
+        """
+        stmt = text("""
+            UPDATE account_deletions
+            SET status = :running, updated_at = :now, finished_at = NULL
+            WHERE status = :stopped
+            RETURNING user_tg_id
+        """)
+        params = {
+            'running': AccountDeletionStatus.RUNNING,
+            'stopped': AccountDeletionStatus.STOPPED,
+            'now': datetime.now(UTC),
+        }
+
+        try:
+            result = await self._session.execute(stmt, params)
+            return list(result.scalars())
+        except Exception as e:
+            logger.error('Failed to resume stopped account deletions: {}', type(e).__name__)
+            raise
+
+    async def warm_up(self) -> None:
+        """Run the hot read statements once for an id that matches nothing, so the connection has them prepared."""
+        await self.get_many([0])
+        await self.get_friends(0)
+        await self.get_user_relations(0)
+        await self.get_pending_requests(0)
@@ -0,0 +1,35 @@
+import asyncio
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.gifts import GiftRepository
+from repositories.users import UserRepository
+
+
+async def warm_up_connections(session_maker: Callable[[], AsyncSession], connections: int) -> None:
+    """Open ``connections`` pooled connections and prepare the hot repository statements on each of them.
+
+    Every session holds on to its connection until all of them are open, so the pool really grows to
+    ``connections`` instead of handing the same connection around. If a connection cannot be opened, the sessions
+    waiting for it give theirs back and the error is raised once all of them are closed.
+    """
+    if connections < 1:
+        return
+    barrier = asyncio.Barrier(connections)
+
+    async def warm_up_one() -> None:
+        async with session_maker() as session:
+            try:
+                await session.connection()
+            except BaseException:
+                await barrier.abort()
+                raise
+            await barrier.wait()
+            await UserRepository(session).warm_up()
+            await GiftRepository(session).warm_up()
+
+    results = await asyncio.gather(*(warm_up_one() for _ in range(connections)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, asyncio.BrokenBarrierError):
+            raise result
@@ -1,16 +1,40 @@
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from dataclasses import replace
+from typing import NoReturn
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from domain import Gift
+from domain import GiftChanges
+from dto.gifts import DEFAULT_WISHLIST_QUERY
+from dto.gifts import ArchiveRecord
+from dto.gifts import GiftArchiveRecord
+from dto.gifts import GiftFeedPageDTO
 from dto.gifts import GiftWithOwnerDTO
+from dto.gifts import ReservationArchiveRecord
+from dto.gifts import WishlistPageDTO
+from dto.gifts import WishlistQueryDTO
+from dto.users import WishlistStatsDTO
 from exceptions.http import BadRequestError
 from exceptions.http import ForbiddenError
+from exceptions.http import PreconditionFailedError
 from repositories import GiftRepository
+from repositories import UnitOfWork
+from utils import Keyset
+from utils import SortValue
+from utils import StoreCache
+from utils import batch_records
+from utils import version_etag
 
 
 class GiftService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, wishlist_stats: StoreCache[WishlistStatsDTO] | None = None) -> None:
         self._repository = GiftRepository(session)
+        self._unit_of_work = UnitOfWork(session)
+        self._wishlist_stats = wishlist_stats
 
     async def add(
         self,
@@ -34,7 +58,9 @@ class GiftService:
             logger.warning('Gift validation failed: {}', str(e))
             raise BadRequestError(detail=str(e)) from e
 
-        gift_id = await self._repository.add(gift)
+        async with self._unit_of_work:
+            gift_id = await self._repository.add(gift)
+        await self._invalidate_wishlist_stats(current_user_id)
         logger.success('Gift created successfully: gift_id={}, user_id={}', gift_id, current_user_id)
         return gift_id
 
@@ -48,15 +74,96 @@ class GiftService:
         else:
             return gift
 
-    async def get_gifts_by_user_id(self, tg_id: int, current_user_id: int) -> list[Gift]:
+    async def get_gifts_by_user_id(
+        self,
+        tg_id: int,
+        current_user_id: int,
+        listing: WishlistQueryDTO = DEFAULT_WISHLIST_QUERY,
+        limit: int | None = None,
+        after: tuple[SortValue, int] | None = None,
+    ) -> WishlistPageDTO:
+        if listing.min_price is not None and listing.max_price is not None and listing.min_price > listing.max_price:
+            raise BadRequestError(detail='min_price cannot exceed max_price')
         try:
-            gifts = await self._repository.get_gifts_by_user_id(tg_id, current_user_id)
+            gifts = await self._repository.get_gifts_by_user_id(
+                tg_id,
+                current_user_id,
+                listing,
+                limit + 1 if limit is not None else None,
+                after,
+            )
+            # The query returns nothing to strangers; only an empty first page needs telling that apart from an
+            # empty wishlist, so allowed reads stay a single round trip.
+            if not gifts and after is None and not await self._repository.can_view_wishlist(tg_id, current_user_id):
+                logger.warning(
+                    'User tried to view wishlist without being friend or owner: user_id={}, viewer_id={}',
+                    tg_id,
+                    current_user_id,
+                )
+                raise ForbiddenError(detail='Not a friend or owner')
             logger.success('Gifts list retrieved successfully: user_id={}, count={}', tg_id, len(gifts))
         except Exception as e:
             logger.error('Failed to get gifts for user_id={}: {}', tg_id, type(e).__name__)
             raise
         else:
-            return gifts
+            if limit is None:
+                return WishlistPageDTO(gifts=gifts, has_more=False)
+            return WishlistPageDTO(gifts=gifts[:limit], has_more=len(gifts) > limit)
+
+    async def stream_gifts_by_user_id(self, tg_id: int, current_user_id: int) -> AsyncIterator[list[Gift]]:
+        count = 0
+        try:
+            async for gifts in self._repository.stream_gifts_by_user_id(
+                tg_id,
+                current_user_id,
+                settings.db.stream_batch_size,
+            ):
+                count += len(gifts)
+                yield gifts
+            logger.success('Gifts list streamed successfully: user_id={}, count={}', tg_id, count)
+        except Exception as e:
+            logger.error('Failed to stream gifts for user_id={}: {}', tg_id, type(e).__name__)
+            raise
+
+    async def update(
+        self,
+        gift_id: int,
+        current_user_id: int,
+        changes: GiftChanges,
+        version: int | None,
+    ) -> Gift:
+        if not changes:
+            raise BadRequestError(detail='No fields to update')
+        try:
+            Gift.validate_changes(changes)
+        except ValueError as e:
+            logger.warning('Gift validation failed: {}', str(e))
+            raise BadRequestError(detail=str(e)) from e
+
+        try:
+            async with self._unit_of_work:
+                gift = await self._repository.update(gift_id, current_user_id, changes, version)
+            if gift is None:
+                await self._raise_update_rejected(gift_id, current_user_id)
+        except Exception as e:
+            logger.error('Failed to update gift with id={}: {}', gift_id, type(e).__name__)
+            raise
+        logger.success('Gift updated successfully: gift_id={}, version={}', gift_id, gift.version)
+        return gift
+
+    async def _raise_update_rejected(self, gift_id: int, current_user_id: int) -> NoReturn:
+        """Explain why a conditional update matched no row; only runs on that path, so updates need no SELECT."""
+        gift = await self._repository.get(gift_id, current_user_id)
+        if not gift.can_update_gift(current_user_id):
+            logger.warning(
+                'User tried to update gift they do not own: gift_id={}, user_id={}', gift_id, current_user_id
+            )
+            raise ForbiddenError(detail='You may not update this gift')
+        logger.warning('Gift update conflict: gift_id={}, current_version={}', gift_id, gift.version)
+        raise PreconditionFailedError(
+            detail=f'Gift was modified concurrently, current version is {gift.version}',
+            headers={'ETag': version_etag(gift.version)},
+        )
 
     async def delete(self, gift_id: int, current_user_id: int) -> None:
         try:
@@ -66,7 +173,9 @@ class GiftService:
                     'User tried to delete gift they do not own: gift_id={}, user_id={}', gift_id, current_user_id
                 )
                 raise ForbiddenError(detail='You may not delete this gift')
-            await self._repository.delete(gift_id)
+            async with self._unit_of_work:
+                await self._repository.delete(gift_id)
+            await self._invalidate_wishlist_stats(gift.user_id)
             logger.success('Gift deleted successfully: gift_id={}', gift_id)
         except Exception as e:
             logger.error('Failed to delete gift with id={}: {}', gift_id, type(e).__name__)
@@ -74,7 +183,7 @@ class GiftService:
 
     async def add_reservation(self, gift_id: int, current_user_id: int) -> None:
         try:
-            await self._repository.get(gift_id, current_user_id)
+            gift = await self._repository.get(gift_id, current_user_id)
             if not await self._repository.is_friend_or_owner(gift_id, current_user_id):
                 logger.warning(
                     'User tried to reserve gift without being friend or owner: gift_id={}, user_id={}',
@@ -82,7 +191,9 @@ class GiftService:
                     current_user_id,
                 )
                 raise ForbiddenError(detail='Not a friend or owner')
-            await self._repository.add_reservation(gift_id, current_user_id)
+            async with self._unit_of_work:
+                await self._repository.add_reservation(gift_id, current_user_id)
+            await self._invalidate_wishlist_stats(gift.user_id)
             logger.success('Gift reservation added successfully: gift_id={}, user_id={}', gift_id, current_user_id)
         except Exception as e:
             logger.error('Failed to add reservation for gift_id={}: {}', gift_id, type(e).__name__)
@@ -105,7 +216,9 @@ class GiftService:
                     current_user_id,
                 )
                 raise ForbiddenError
-            await self._repository.delete_reservation(gift_id)
+            async with self._unit_of_work:
+                await self._repository.delete_reservation(gift_id)
+            await self._invalidate_wishlist_stats(gift.user_id)
             logger.success('Gift reservation deleted successfully: gift_id={}', gift_id)
         except Exception as e:
             logger.error('Failed to delete reservation for gift_id={}: {}', gift_id, type(e).__name__)
@@ -122,3 +235,118 @@ class GiftService:
             raise
         else:
             return gifts
+
+    async def get_friends_feed(
+        self,
+        current_user_id: int,
+        limit: int,
+        per_friend: int,
+        before: Keyset | None = None,
+    ) -> GiftFeedPageDTO:
+        try:
+            gifts = await self._repository.get_friends_feed(current_user_id, limit + 1, per_friend, before)
+            logger.success('Friends feed retrieved successfully: user_id={}, count={}', current_user_id, len(gifts))
+        except Exception as e:
+            logger.error('Failed to get friends feed for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+        else:
+            return GiftFeedPageDTO(gifts=gifts[:limit], has_more=len(gifts) > limit)
+
+    async def search(self, current_user_id: int, query: str, limit: int, offset: int) -> GiftFeedPageDTO:
+        query = query.strip()
+        if not query:
+            raise BadRequestError(detail='Search query is empty')
+        try:
+            gifts = await self._repository.search(current_user_id, query, limit + 1, offset)
+            logger.success('Gift search completed: user_id={}, count={}', current_user_id, len(gifts))
+        except Exception as e:
+            logger.error('Failed to search gifts for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+        else:
+            return GiftFeedPageDTO(gifts=gifts[:limit], has_more=len(gifts) > limit)
+
+    async def stream_my_reservations(self, current_user_id: int) -> AsyncIterator[list[GiftWithOwnerDTO]]:
+        count = 0
+        try:
+            async for gifts in self._repository.stream_my_reservations(current_user_id, settings.db.stream_batch_size):
+                count += len(gifts)
+                yield gifts
+            logger.success('User reservations streamed successfully: user_id={}, count={}', current_user_id, count)
+        except Exception as e:
+            logger.error('Failed to stream reservations for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+
+    async def export_wishlist(self, current_user_id: int) -> AsyncIterator[list[ArchiveRecord]]:
+        batch_size = settings.db.stream_batch_size
+        try:
+            async for gifts in self._repository.stream_gifts_by_user_id(current_user_id, current_user_id, batch_size):
+                yield [GiftArchiveRecord.from_domain(gift) for gift in gifts]
+            async for reservations in self._repository.stream_my_reservations(current_user_id, batch_size):
+                yield [ReservationArchiveRecord.from_dto(gift) for gift in reservations]
+            logger.success('Wishlist exported successfully: user_id={}', current_user_id)
+        except Exception as e:
+            logger.error('Failed to export wishlist for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+
+    async def import_wishlist(self, current_user_id: int, records: AsyncIterable[ArchiveRecord]) -> dict[str, int]:
+        """Import ``records`` as they arrive, ``write_batch_size`` at a time, in a single transaction.
+
+        An invalid record rolls back everything imported before it.
+        """
+        batch_size = settings.db.write_batch_size
+        number = 0
+        imported_gifts = 0
+        reserved_owner_ids: list[int] = []
+        try:
+            async with self._unit_of_work:
+                async for batch in batch_records(records, batch_size):
+                    gifts: list[Gift] = []
+                    reserved_gift_ids: list[int] = []
+                    for record in batch:
+                        number += 1
+                        match record:
+                            case GiftArchiveRecord():
+                                gifts.append(self._gift_from_record(current_user_id, record, number))
+                            case ReservationArchiveRecord():
+                                reserved_gift_ids.append(record.gift_id)
+                    if gifts:
+                        imported_gifts += await self._repository.add_many(gifts, batch_size)
+                    if reserved_gift_ids:
+                        reserved_owner_ids += await self._repository.add_reservations(
+                            reserved_gift_ids, current_user_id
+                        )
+            await self._invalidate_wishlist_stats(current_user_id, *reserved_owner_ids)
+        except Exception as e:
+            logger.error('Failed to import wishlist for user_id={}: {}', current_user_id, type(e).__name__)
+            raise
+
+        logger.success(
+            'Wishlist imported successfully: user_id={}, gifts={}, reservations={}',
+            current_user_id,
+            imported_gifts,
+            len(reserved_owner_ids),
+        )
+        return {'gifts': imported_gifts, 'reservations': len(reserved_owner_ids)}
+
+    async def _invalidate_wishlist_stats(self, *owner_ids: int) -> None:
+        """Drop the cached stats of wishlists a committed write has changed."""
+        if self._wishlist_stats is not None:
+            await self._wishlist_stats.delete(*dict.fromkeys(owner_ids))
+
+    @staticmethod
+    def _gift_from_record(current_user_id: int, record: GiftArchiveRecord, number: int) -> Gift:
+        try:
+            gift = Gift.create(
+                user_id=current_user_id,
+                name=record.name,
+                url=record.url,
+                wish_rate=record.wish_rate,
+                price=record.price,  # ty:ignore[invalid-argument-type]
+                note=record.note,
+            )
+        except ValueError as e:
+            logger.warning('Imported gift validation failed: record={}, error={}', number, str(e))
+            raise BadRequestError(detail=f'Record {number}: {e}') from e
+        if record.created_at is not None:
+            gift = replace(gift, created_at=record.created_at, updated_at=record.created_at)
+        return gift
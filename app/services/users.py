@@ -1,20 +1,49 @@
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from datetime import UTC
+from datetime import datetime
+from typing import Final
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.security import BaseJWTAuth
 from core.security import TelegramInitData
 from core.security import TokenOut
 from domain import User
+from domain.users import AccountDeletionStatus
+from domain.users import AccountDeletionStep
 from domain.users import FriendAction
+from dto.users import AccountDeletionDTO
 from dto.users import FriendRequestDTO
+from dto.users import FriendSuggestionDTO
+from dto.users import FriendWithStatsDTO
+from dto.users import MutualFriendsDTO
+from dto.users import UserPageDTO
+from dto.users import WishlistStatsDTO
 from exceptions.database import NotFoundInDbError
 from exceptions.http import BadRequestError
+from repositories import UnitOfWork
 from repositories import UserRepository
+from utils import StoreCache
+
+MAX_FRIEND_SUGGESTIONS: Final[int] = 50
+NO_GIFTS_YET = datetime.min.replace(tzinfo=UTC)
 
 
 class UserService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO] | None = None,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]] | None = None,
+    ) -> None:
         self._repository = UserRepository(session)
+        self._unit_of_work = UnitOfWork(session)
+        self._wishlist_stats = wishlist_stats
+        self._friend_suggestions = friend_suggestions
 
     async def telegram_login(self, init_data: TelegramInitData) -> TokenOut:
         tg_id = init_data['id']
@@ -22,7 +51,8 @@ class UserService:
             user = await self._repository.get(tg_id)
             fields_to_update = user.get_changed_fields(init_data)
             if fields_to_update:
-                await self._repository.update(tg_id, **fields_to_update)
+                async with self._unit_of_work:
+                    await self._repository.update(tg_id, **fields_to_update)
                 logger.info('User profile updated: tg_id={}', tg_id)
         except NotFoundInDbError:
             logger.info('New user registration: tg_id={}', tg_id)
@@ -61,7 +91,8 @@ class UserService:
             raise BadRequestError(detail=str(e)) from e
 
         try:
-            tg_id = await self._repository.add(user)
+            async with self._unit_of_work:
+                tg_id = await self._repository.add(user)
             logger.success('User created successfully: tg_id={}', tg_id)
             return await self._repository.get(tg_id)
         except Exception as e:
@@ -78,28 +109,34 @@ class UserService:
         else:
             return result
 
+    async def get_many(self, tg_ids: Sequence[int]) -> list[User]:
+        unique_ids = list(dict.fromkeys(tg_ids))
+        try:
+            users = await self._repository.load_many(unique_ids)
+            logger.success('Users retrieved successfully: requested={}, found={}', len(unique_ids), len(users))
+        except Exception as e:
+            logger.error('Failed to retrieve users, count={}: {}', len(unique_ids), type(e).__name__)
+            raise
+        else:
+            return users
+
     async def send_friend_request(self, sender_id: int, receiver_id: int) -> None:
         if sender_id == receiver_id:
             logger.warning('User tried to send friend request to themselves: tg_id={}', sender_id)
             raise BadRequestError(detail='Cannot send friend request to yourself')
         try:
-            user = await self._repository.get(sender_id)
-            friend = await self._repository.get(receiver_id)
-            relations = await self._repository.get_user_relations(sender_id)
-            user.load_relations(relations)
-
-            match user.resolve_friend_action(friend):
+            async with self._unit_of_work:
+                action = await self._repository.apply_friend_request(sender_id, receiver_id)
+            match action:
                 case FriendAction.ALREADY_FRIENDS:
                     logger.warning('Users already friends: sender={}, receiver={}', sender_id, receiver_id)
                     raise BadRequestError(detail='Already friends')
                 case FriendAction.ADD_FRIEND:
-                    await self._repository.accept_friend_request(sender_id, receiver_id)
+                    await self._invalidate_friend_suggestions(sender_id, receiver_id)
                     logger.success('Friends added successfully: user1={}, user2={}', sender_id, receiver_id)
                 case FriendAction.REQUEST_ALREADY_SENT:
                     logger.info('Request already sent previously: sender={}, receiver={}', sender_id, receiver_id)
-                    return
                 case FriendAction.SEND_REQUEST:
-                    await self._repository.send_friend_request(sender_id, receiver_id)
                     logger.success('Friend request sent successfully: sender={}, receiver={}', sender_id, receiver_id)
         except Exception as e:
             logger.error('Failed to send friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
@@ -117,7 +154,9 @@ class UserService:
 
     async def accept_friend_request(self, receiver_id: int, sender_id: int) -> None:
         try:
-            await self._repository.accept_friend_request(receiver_id, sender_id)
+            async with self._unit_of_work:
+                await self._repository.accept_friend_request(receiver_id, sender_id)
+            await self._invalidate_friend_suggestions(receiver_id, sender_id)
             logger.success('Friend request accepted successfully: sender={}, receiver={}', sender_id, receiver_id)
         except Exception as e:
             logger.error('Failed to accept friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
@@ -125,7 +164,8 @@ class UserService:
 
     async def reject_friend_request(self, receiver_id: int, sender_id: int) -> None:
         try:
-            await self._repository.reject_friend_request(receiver_id, sender_id)
+            async with self._unit_of_work:
+                await self._repository.reject_friend_request(receiver_id, sender_id)
             logger.success('Friend request rejected successfully: sender={}, receiver={}', sender_id, receiver_id)
         except Exception as e:
             logger.error('Failed to reject friend request from {} to {}: {}', sender_id, receiver_id, type(e).__name__)
@@ -133,7 +173,12 @@ class UserService:
 
     async def delete_friend(self, user_id: int, friend_id: int) -> None:
         try:
-            await self._repository.delete_friend(user_id, friend_id)
+            async with self._unit_of_work:
+                await self._repository.delete_friend(user_id, friend_id)
+            # The pair's reservations on each other's gifts went with the friendship.
+            if self._wishlist_stats is not None:
+                await self._wishlist_stats.delete(user_id, friend_id)
+            await self._invalidate_friend_suggestions(user_id, friend_id)
             logger.success('Friend deleted successfully: user={}, friend={}', user_id, friend_id)
         except Exception as e:
             logger.error('Failed to delete friend {} for user {}: {}', friend_id, user_id, type(e).__name__)
@@ -148,3 +193,185 @@ class UserService:
             raise
         else:
             return friends
+
+    async def get_friends_with_stats(self, user_id: int) -> list[FriendWithStatsDTO]:
+        try:
+            if self._wishlist_stats is None:
+                friends = await self._repository.get_friends_with_stats(user_id)
+            else:
+                friends = await self._get_friends_with_cached_stats(user_id, self._wishlist_stats)
+            logger.success('Friends with stats retrieved successfully: user_id={}, count={}', user_id, len(friends))
+        except Exception as e:
+            logger.error('Failed to get friends with stats for user_id={}: {}', user_id, type(e).__name__)
+            raise
+        else:
+            return friends
+
+    async def _get_friends_with_cached_stats(
+        self,
+        user_id: int,
+        cache: StoreCache[WishlistStatsDTO],
+    ) -> list[FriendWithStatsDTO]:
+        """Read the friend list, then aggregate only the wishlists missing from the cache, in one query.
+
+        Stats are cached per wishlist owner rather than per viewer, so a write to one wishlist invalidates a single
+        entry however many friend lists show it. The result is ordered like ``get_friends_with_stats`` of the
+        repository: most recent gift first, friends without gifts last, ties by id.
+        """
+        users = await self._repository.get_friends(user_id)
+        friend_ids = [user.tg_id for user in users]
+        stats = await cache.get_many(friend_ids)
+        missing = [friend_id for friend_id in friend_ids if friend_id not in stats]
+        if missing:
+            fresh = await self._repository.get_wishlist_stats(missing)
+            await cache.set_many(fresh)
+            stats.update(fresh)
+        friends = sorted((FriendWithStatsDTO(user, stats[user.tg_id]) for user in users), key=lambda f: f.user.tg_id)
+        friends.sort(key=lambda friend: friend.stats.latest_gift_at or NO_GIFTS_YET, reverse=True)
+        return friends
+
+    async def get_friend_suggestions(self, user_id: int, limit: int) -> list[FriendSuggestionDTO]:
+        """Return up to ``limit`` people the user may know, most mutual friends first.
+
+        The ranking of the top ``MAX_FRIEND_SUGGESTIONS`` is what gets cached, so every ``limit`` shares an entry;
+        profiles are loaded fresh.
+        """
+        try:
+            ranked = await self._rank_friend_suggestions(user_id)
+            users = await self._repository.load_many([suggestion.tg_id for suggestion in ranked[:limit]])
+            mutual_counts = {suggestion.tg_id: suggestion.mutual_count for suggestion in ranked}
+            suggestions = [FriendSuggestionDTO(user, mutual_counts[user.tg_id]) for user in users]
+            logger.success('Friend suggestions retrieved successfully: user_id={}, count={}', user_id, len(suggestions))
+        except Exception as e:
+            logger.error('Failed to get friend suggestions for user_id={}: {}', user_id, type(e).__name__)
+            raise
+        else:
+            return suggestions
+
+    async def _rank_friend_suggestions(self, user_id: int) -> list[MutualFriendsDTO]:
+        if self._friend_suggestions is not None:
+            cached = await self._friend_suggestions.get_many([user_id])
+            if user_id in cached:
+                return cached[user_id]
+        ranked = await self._repository.get_friend_suggestions(
+            user_id,
+            MAX_FRIEND_SUGGESTIONS,
+            settings.friend_suggestions.max_sources,
+            settings.friend_suggestions.max_per_source,
+        )
+        if self._friend_suggestions is not None:
+            await self._friend_suggestions.set_many({user_id: ranked})
+        return ranked
+
+    async def _invalidate_friend_suggestions(self, *user_ids: int) -> None:
+        """Drop the cached suggestions of users whose friend list a committed write has changed.
+
+        Friends of theirs see the new friendship in their own suggestions once their entries expire.
+        """
+        if self._friend_suggestions is not None:
+            await self._friend_suggestions.delete(*user_ids)
+
+    async def start_account_deletion(self, user_id: int) -> AccountDeletionDTO:
+        try:
+            async with self._unit_of_work:
+                deletion = await self._repository.start_account_deletion(user_id)
+            logger.success('Account deletion started: tg_id={}', user_id)
+        except Exception as e:
+            logger.error('Failed to start account deletion for tg_id={}: {}', user_id, type(e).__name__)
+            raise
+        else:
+            return deletion
+
+    async def get_account_deletion(self, user_id: int) -> AccountDeletionDTO:
+        try:
+            deletion = await self._repository.get_account_deletion(user_id)
+            logger.success('Account deletion retrieved successfully: tg_id={}', user_id)
+        except Exception as e:
+            logger.error('Failed to get account deletion for tg_id={}: {}', user_id, type(e).__name__)
+            raise
+        else:
+            return deletion
+
+    async def delete_account(self, user_id: int) -> None:
+        """Delete everything of a user whose account deletion was started, in batches, then the user.
+
+        Every batch of ``account_deletion.batch_size`` rows is a transaction of its own that also records the
+        progress, so row locks are held briefly and a deletion that was stopped resumes where it left off when it is
+        started again. Friend requests and friendships go first, so the user drops out of other people's lists and
+        feeds before their reservations and gifts are deleted. A cancelled deletion is recorded as stopped, to be
+        resumed on the next startup.
+        """
+        batch_size = settings.account_deletion.batch_size
+        try:
+            for step in AccountDeletionStep:
+                while True:
+                    async with self._unit_of_work:
+                        ids = await self._repository.delete_account_batch(user_id, step, batch_size)
+                    await self._invalidate_after_account_batch(step, ids)
+                    if len(ids) < batch_size:
+                        break
+            async with self._unit_of_work:
+                await self._repository.finish_account_deletion(user_id, AccountDeletionStatus.COMPLETED)
+            if self._wishlist_stats is not None:
+                await self._wishlist_stats.delete(user_id)
+            await self._invalidate_friend_suggestions(user_id)
+            logger.success('Account deleted successfully: tg_id={}', user_id)
+        except asyncio.CancelledError:
+            logger.warning('Account deletion of tg_id={} was stopped', user_id)
+            await self._end_account_deletion(user_id, AccountDeletionStatus.STOPPED)
+            raise
+        except Exception as e:
+            logger.error('Failed to delete account of tg_id={}: {}', user_id, type(e).__name__)
+            await self._end_account_deletion(user_id, AccountDeletionStatus.FAILED)
+            raise
+
+    async def resume_account_deletions(self) -> list[int]:
+        """Claim the account deletions a shutdown stopped; the caller runs :meth:`delete_account` for each user."""
+        try:
+            async with self._unit_of_work:
+                user_ids = await self._repository.resume_stopped_account_deletions()
+            logger.success('Stopped account deletions resumed: count={}', len(user_ids))
+        except Exception as e:
+            logger.error('Failed to resume stopped account deletions: {}', type(e).__name__)
+            raise
+        else:
+            return user_ids
+
+    async def _invalidate_after_account_batch(self, step: AccountDeletionStep, ids: list[int]) -> None:
+        match step:
+            case AccountDeletionStep.FRIENDS:
+                await self._invalidate_friend_suggestions(*ids)
+            case AccountDeletionStep.RESERVATIONS if self._wishlist_stats is not None:
+                await self._wishlist_stats.delete(*set(ids))
+
+    async def _end_account_deletion(self, user_id: int, status: AccountDeletionStatus) -> None:
+        """Record that the deletion ended without completing, in a transaction of its own."""
+        try:
+            async with self._unit_of_work:
+                await self._repository.finish_account_deletion(user_id, status)
+        except Exception as e:  # noqa: BLE001
+            logger.error('Failed to record {} account deletion for tg_id={}: {}', status, user_id, type(e).__name__)
+
+    async def search_friends(self, user_id: int, query: str, limit: int, offset: int) -> UserPageDTO:
+        query = query.strip()
+        if not query:
+            raise BadRequestError(detail='Search query is empty')
+        try:
+            friends = await self._repository.search_friends(user_id, query, limit + 1, offset)
+            logger.success('Friend search completed: user_id={}, count={}', user_id, len(friends))
+        except Exception as e:
+            logger.error('Failed to search friends for user_id={}: {}', user_id, type(e).__name__)
+            raise
+        else:
+            return UserPageDTO(users=friends[:limit], has_more=len(friends) > limit)
+
+    async def stream_friends(self, user_id: int) -> AsyncIterator[list[User]]:
+        count = 0
+        try:
+            async for friends in self._repository.stream_friends(user_id, settings.db.stream_batch_size):
+                count += len(friends)
+                yield friends
+            logger.success('Friends list streamed successfully: user_id={}, count={}', user_id, count)
+        except Exception as e:
+            logger.error('Failed to stream friends for user_id={}: {}', user_id, type(e).__name__)
+            raise
@@ -1 +1,20 @@
+from .archive import ArchiveFormat as ArchiveFormat
+from .archive import batch_records as batch_records
+from .archive import decode_archive as decode_archive
+from .archive import encode_archive as encode_archive
+from .background_jobs import BackgroundJobs as BackgroundJobs
+from .cursor import Keyset as Keyset
+from .cursor import SortValue as SortValue
+from .cursor import decode_cursor as decode_cursor
+from .cursor import encode_cursor as encode_cursor
+from .dataloader import DataLoader as DataLoader
+from .etag import parse_if_match as parse_if_match
+from .etag import version_etag as version_etag
+from .idempotency import IdempotentRequest as IdempotentRequest
 from .integrity_error_handler import handle_integrity_error_message as handle_integrity_error_message
+from .msgspec_response import MsgspecResponse as MsgspecResponse
+from .msgspec_response import stream_json_array as stream_json_array
+from .rate_limit import TokenBucketLimiter as TokenBucketLimiter
+from .single_flight import SingleFlight as SingleFlight
+from .stores import BoundedMemoryStore as BoundedMemoryStore
+from .stores import StoreCache as StoreCache
@@ -0,0 +1,124 @@
+"""Wishlist archive codecs.
+
+Two formats are supported, both a sequence of tagged ``ArchiveRecord`` objects:
+
+* ``ndjson`` — one JSON object per line;
+* ``msgpack`` — one MessagePack object per frame, each frame prefixed with its length as a 4-byte big-endian
+  unsigned integer, so that records can be produced and consumed incrementally.
+"""
+
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+import enum
+import struct
+from typing import Final
+
+from litestar.enums import MediaType
+import msgspec
+
+from dto.gifts import ArchiveRecord
+from exceptions.http import BadRequestError
+
+NDJSON_MEDIA_TYPE: Final[str] = 'application/x-ndjson'
+_FRAME_HEADER: Final = struct.Struct('>I')
+
+_json_encoder: Final = msgspec.json.Encoder()
+_json_decoder: Final = msgspec.json.Decoder(ArchiveRecord)
+_msgpack_encoder: Final = msgspec.msgpack.Encoder()
+_msgpack_decoder: Final = msgspec.msgpack.Decoder(ArchiveRecord)
+
+
+class ArchiveFormat(enum.StrEnum):
+    NDJSON = 'ndjson'
+    MSGPACK = 'msgpack'
+
+    @property
+    def media_type(self) -> str:
+        return NDJSON_MEDIA_TYPE if self is ArchiveFormat.NDJSON else MediaType.MESSAGEPACK.value
+
+    @staticmethod
+    def from_media_type(media_type: str) -> 'ArchiveFormat':
+        match media_type:
+            case 'application/x-ndjson' | 'application/jsonl':
+                return ArchiveFormat.NDJSON
+            case 'application/vnd.msgpack' | 'application/x-msgpack' | 'application/msgpack':
+                return ArchiveFormat.MSGPACK
+            case _:
+                raise BadRequestError(detail=f'Unsupported archive content type: {media_type or "<none>"}')
+
+
+def encode_records(records: Sequence[ArchiveRecord], archive_format: ArchiveFormat) -> bytes:
+    if archive_format is ArchiveFormat.NDJSON:
+        return _json_encoder.encode_lines(records)
+    frames = bytearray()
+    for record in records:
+        payload = _msgpack_encoder.encode(record)
+        frames += _FRAME_HEADER.pack(len(payload))
+        frames += payload
+    return bytes(frames)
+
+
+async def encode_archive(
+    batches: AsyncIterable[Sequence[ArchiveRecord]],
+    archive_format: ArchiveFormat,
+) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        if batch:
+            yield encode_records(batch, archive_format)
+
+
+async def decode_archive(chunks: AsyncIterable[bytes], archive_format: ArchiveFormat) -> AsyncIterator[ArchiveRecord]:
+    """Decode records as soon as they are complete, without buffering the whole body."""
+    decode = _decode_ndjson if archive_format is ArchiveFormat.NDJSON else _decode_msgpack_frames
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            buffer += chunk
+            records, consumed = decode(buffer)
+            del buffer[:consumed]
+            for record in records:
+                yield record
+        if archive_format is ArchiveFormat.NDJSON:
+            for record in _json_decoder.decode_lines(bytes(buffer)):
+                yield record
+        elif buffer:
+            raise BadRequestError(detail='Archive ends with an incomplete record')
+    except (msgspec.DecodeError, msgspec.ValidationError) as e:
+        raise BadRequestError(detail=f'Invalid archive record: {e}') from e
+
+
+async def batch_records(records: AsyncIterable[ArchiveRecord], size: int) -> AsyncIterator[list[ArchiveRecord]]:
+    """Group ``records`` into lists of ``size`` as they arrive; the last list may be shorter."""
+    batch: list[ArchiveRecord] = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _decode_ndjson(buffer: bytearray) -> tuple[list[ArchiveRecord], int]:
+    end = buffer.rfind(b'\n') + 1
+    if not end:
+        return [], 0
+    return _json_decoder.decode_lines(bytes(buffer[:end])), end
+
+
+def _decode_msgpack_frames(buffer: bytearray) -> tuple[list[ArchiveRecord], int]:
+    records: list[ArchiveRecord] = []
+    view = memoryview(buffer)
+    offset = 0
+    try:
+        while len(view) - offset >= _FRAME_HEADER.size:
+            (length,) = _FRAME_HEADER.unpack_from(view, offset)
+            start = offset + _FRAME_HEADER.size
+            if len(view) - start < length:
+                break
+            records.append(_msgpack_decoder.decode(view[start : start + length]))
+            offset = start + length
+    finally:
+        view.release()
+    return records, offset
@@ -0,0 +1,39 @@
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+
+
+class BackgroundJobs[K: Hashable]:
+    """Run jobs that outlive the request starting them, at most one per key at a time.
+
+    Each job runs as a task of its own that is referenced until it finishes, so it is neither cancelled with the
+    request nor garbage collected halfway. Jobs still running on shutdown are cancelled by :meth:`cancel_all`.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[K, asyncio.Task[None]] = {}
+
+    def start(self, key: K, job: Callable[[], Awaitable[None]]) -> bool:
+        """Start ``job`` unless one is already running for ``key``; return whether it was started."""
+        if key in self._jobs:
+            return False
+        task = asyncio.ensure_future(job())
+        self._jobs[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return True
+
+    def running(self, key: K) -> bool:
+        return key in self._jobs
+
+    async def cancel_all(self) -> None:
+        tasks = list(self._jobs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, key: K, task: asyncio.Task[None]) -> None:
+        if self._jobs.get(key) is task:
+            del self._jobs[key]
+        if not task.cancelled():
+            task.exception()
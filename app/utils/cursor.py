@@ -0,0 +1,38 @@
+import base64
+import binascii
+from datetime import datetime
+from decimal import Decimal
+from functools import cache
+from typing import Final
+from typing import overload
+
+import msgspec
+
+from exceptions.http import BadRequestError
+
+type SortValue = datetime | int | Decimal
+type Keyset = tuple[datetime, int]
+
+_encoder: Final = msgspec.json.Encoder()
+
+
+@cache
+def _decoder(value_type: type[SortValue]) -> msgspec.json.Decoder:
+    return msgspec.json.Decoder(tuple[value_type, int])  # ty:ignore[invalid-type-form]
+
+
+def encode_cursor(value: SortValue, obj_id: int) -> str:
+    """Encode a ``(sort value, id)`` keyset position as an opaque URL-safe cursor."""
+    return base64.urlsafe_b64encode(_encoder.encode((value, obj_id))).decode().rstrip('=')
+
+
+@overload
+def decode_cursor(cursor: str) -> Keyset: ...
+@overload
+def decode_cursor[T: SortValue](cursor: str, value_type: type[T]) -> tuple[T, int]: ...
+def decode_cursor(cursor: str, value_type: type[SortValue] = datetime) -> tuple[SortValue, int]:
+    """Decode a cursor made by :func:`encode_cursor` whose sort value is a ``value_type``."""
+    try:
+        return _decoder(value_type).decode(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, msgspec.DecodeError) as e:
+        raise BadRequestError(detail='Invalid cursor') from e
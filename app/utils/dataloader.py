@@ -0,0 +1,82 @@
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import Sequence
+
+
+class DataLoader[K: Hashable, V]:
+    """Coalesce concurrent ``load`` calls made within one event-loop tick into a single ``batch_load`` call.
+
+    Results are cached for the lifetime of the loader, so it is meant to be created per request.
+    Batches are dispatched one at a time, which keeps a single ``AsyncSession`` safe to use from ``batch_load``.
+    Keys missing from the mapping returned by ``batch_load`` resolve to ``None``.
+    """
+
+    def __init__(self, batch_load: Callable[[Sequence[K]], Awaitable[Mapping[K, V]]]) -> None:
+        self._batch_load = batch_load
+        self._cache: dict[K, asyncio.Future[V | None]] = {}
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._lock = asyncio.Lock()
+
+    async def load(self, key: K) -> V | None:
+        future = self._cache.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._cache[key] = future
+            if not self._pending:
+                asyncio.get_running_loop().call_soon(self._schedule_dispatch)
+            self._pending[key] = future
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._cache[key] = future
+
+    def clear(self, key: K) -> None:
+        self._cache.pop(key, None)
+
+    def clear_all(self) -> None:
+        self._cache.clear()
+
+    def _schedule_dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        task = asyncio.create_task(self._dispatch(pending))
+        task.add_done_callback(_consume_result)
+
+    async def _dispatch(self, pending: dict[K, asyncio.Future[V | None]]) -> None:
+        try:
+            async with self._lock:
+                values = await self._batch_load(list(pending))
+        except (Exception, asyncio.CancelledError) as e:
+            self._fail(pending, e)
+            raise
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def _fail(
+        self,
+        pending: dict[K, asyncio.Future[V | None]],
+        error: BaseException,
+    ) -> None:
+        for key, future in pending.items():
+            if self._cache.get(key) is future:
+                del self._cache[key]
+            if future.done():
+                continue
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+
+def _consume_result(task: asyncio.Task[None]) -> None:
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,27 @@
+import re
+from typing import Final
+
+from exceptions.http import PreconditionFailedError
+from exceptions.http import PreconditionRequiredError
+
+_ENTITY_TAG: Final = re.compile(r'"(\d+)"')
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(header: str | None) -> int | None:
+    """Return the version an ``If-Match`` header requires, or ``None`` for ``*`` (any current version).
+
+    Only strong tags produced by ``version_etag`` can match, anything else fails the precondition.
+    """
+    if header is None:
+        raise PreconditionRequiredError(detail='If-Match header with the ETag of the gift is required')
+    header = header.strip()
+    if header == '*':
+        return None
+    match = _ENTITY_TAG.fullmatch(header)
+    if match is None:
+        raise PreconditionFailedError(detail=f'If-Match does not match the current version: {header}')
+    return int(match[1])
@@ -0,0 +1,62 @@
+from collections.abc import Awaitable
+from collections.abc import Callable
+import hashlib
+from typing import Any
+
+from litestar.stores.base import Store
+import msgspec
+
+from exceptions.http import UnprocessableEntityError
+from utils.single_flight import SingleFlight
+
+type IdempotencyFlights = SingleFlight[str, tuple[str, Any]]
+
+
+class IdempotentRequest:
+    """Run a write at most once per ``Idempotency-Key`` and replay its result to retries.
+
+    Results are stored in a Litestar ``Store`` for ``ttl`` seconds together with a fingerprint of the request, and
+    reusing a key for a different request is rejected. Concurrent requests with one key within a process wait for the
+    first execution, and get its result only if they are the same request. Failed writes are not stored, so retrying
+    them runs the write again.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        flights: IdempotencyFlights,
+        key: str | None,
+        fingerprint: str,
+        ttl: int,
+    ) -> None:
+        self._store = store
+        self._flights = flights
+        self._key = key
+        self._fingerprint = fingerprint
+        self._ttl = ttl
+
+    @staticmethod
+    def fingerprint(*parts: str | bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode() if isinstance(part, str) else part)
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    async def run[T](self, call: Callable[[], Awaitable[T]], result_type: type[T]) -> T:
+        key = self._key
+        if key is None:
+            return await call()
+        fingerprint, result = await self._flights.do(key, lambda: self._run_once(key, call, result_type))
+        if fingerprint != self._fingerprint:
+            raise UnprocessableEntityError(detail='Idempotency-Key was already used for a different request')
+        return result
+
+    async def _run_once[T](self, key: str, call: Callable[[], Awaitable[T]], result_type: type[T]) -> tuple[str, T]:
+        """Return the fingerprint and result stored for ``key``, running ``call`` first if there are none."""
+        stored = await self._store.get(key)
+        if stored is not None:
+            return msgspec.json.decode(stored, type=tuple[str, result_type])  # ty:ignore[invalid-type-form]
+        result = await call()
+        await self._store.set(key, msgspec.json.encode((self._fingerprint, result)), expires_in=self._ttl)
+        return self._fingerprint, result
@@ -0,0 +1,44 @@
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Sequence
+from typing import Any
+from typing import Final
+
+from litestar import Response
+from litestar.enums import MediaType
+from litestar.serialization import default_serializer
+from litestar.types import Serializer
+import msgspec
+
+_json_encoder: Final = msgspec.json.Encoder()
+
+
+class MsgspecResponse[T](Response[T]):
+    """JSON response for ``msgspec.Struct`` content, encoded in one pass by a shared precompiled encoder.
+
+    Skips Litestar's per-response serializer lookup and type encoders, so the content must contain only
+    types msgspec encodes natively.
+    """
+
+    def __init__(self, content: T, status_code: int | None = None, headers: dict[str, str] | None = None) -> None:
+        super().__init__(content=content, status_code=status_code, media_type=MediaType.JSON, headers=headers)
+
+    def render(self, content: Any, media_type: str, enc_hook: Serializer = default_serializer) -> bytes:  # noqa: ARG002, ANN401
+        return _json_encoder.encode(content)
+
+
+async def stream_json_array[T](
+    batches: AsyncIterable[Sequence[T]],
+    convert: Callable[[T], msgspec.Struct],
+) -> AsyncIterator[bytes]:
+    """Encode batches of items as one JSON array, yielding a chunk per batch."""
+    yield b'['
+    separator = b''
+    async for batch in batches:
+        if not batch:
+            continue
+        chunk = _json_encoder.encode([convert(item) for item in batch])
+        yield separator + chunk[1:-1]
+        separator = b','
+    yield b']'
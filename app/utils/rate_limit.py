@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+import math
+import struct
+import time
+from typing import Final
+
+from litestar.stores.base import Store
+
+_BUCKET: Final = struct.Struct('>dd')
+
+
+@dataclass(slots=True)
+class _KeyLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class TokenBucketLimiter:
+    """Token bucket rate limiter whose buckets live in a Litestar :class:`~litestar.stores.base.Store`.
+
+    Each key gets ``capacity`` tokens that refill at ``refill_rate`` tokens per second. A ``MemoryStore`` keeps the
+    buckets per process; a shared store such as ``RedisStore`` makes the limit span workers and instances. The
+    read-modify-write of a key is serialized within a process only, so with a shared store two instances taking a
+    token at the same instant may both get it, which is acceptable for throttling. Different keys never wait for
+    each other, so the store round trips of concurrent users overlap.
+    """
+
+    def __init__(self, capacity: int, refill_rate: float, clock: Callable[[], float] = time.time) -> None:
+        self._capacity = capacity
+        self._refill_rate = refill_rate
+        self._clock = clock
+        self._locks: dict[str, _KeyLock] = {}
+        self._expires_in = math.ceil(capacity / refill_rate) + 1
+
+    async def acquire(self, store: Store, key: str) -> float:
+        """Take one token for ``key``. Return ``0`` when granted, otherwise the seconds until a token is available."""
+        key_lock = self._locks.get(key)
+        if key_lock is None:
+            key_lock = self._locks[key] = _KeyLock()
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                return await self._take(store, key)
+        finally:
+            key_lock.users -= 1
+            if not key_lock.users:
+                del self._locks[key]
+
+    async def _take(self, store: Store, key: str) -> float:
+        now = self._clock()
+        state = await store.get(key)
+        if state is None:
+            tokens = float(self._capacity)
+        else:
+            tokens, updated = _BUCKET.unpack(state)
+            tokens = min(self._capacity, tokens + (now - updated) * self._refill_rate)
+        if tokens < 1:
+            return (1 - tokens) / self._refill_rate
+        await store.set(key, _BUCKET.pack(tokens - 1, now), expires_in=self._expires_in)
+        return 0
@@ -0,0 +1,33 @@
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+
+
+class SingleFlight[K: Hashable, V]:
+    """Let concurrent callers with the same key share one in-flight call and its result.
+
+    The call runs as a task of its own, so a caller that is cancelled (e.g. its client went away) neither cancels
+    it for the others nor leaves it half done. Calls are not cached: once a call finishes, the next caller starts a
+    new one.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Task[V]] = {}
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: K) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,66 @@
+from collections.abc import Iterable
+from collections.abc import Mapping
+from datetime import timedelta
+
+from litestar.stores.base import StorageObject
+from litestar.stores.base import Store
+from litestar.stores.memory import MemoryStore
+import msgspec
+
+
+class BoundedMemoryStore(MemoryStore):
+    """``MemoryStore`` holding at most ``max_entries`` keys; setting a new key evicts the least recently set one.
+
+    Expired entries of a plain ``MemoryStore`` are only dropped when read again, so per-user keys would otherwise
+    grow without limit.
+    """
+
+    __slots__ = ('_max_entries',)
+
+    def __init__(self, max_entries: int) -> None:
+        super().__init__()
+        self._max_entries = max_entries
+
+    async def set(self, key: str, value: str | bytes, expires_in: int | timedelta | None = None) -> None:
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        async with self._lock:
+            self._store.pop(key, None)
+            self._store[key] = StorageObject.new(data=value, expires_in=expires_in)
+            while len(self._store) > self._max_entries:
+                del self._store[next(iter(self._store))]
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class StoreCache[T]:
+    """Values of one type cached in a Litestar ``Store`` by integer id, msgspec-encoded and expiring after ``ttl``.
+
+    Entries are only as shared as the store: a ``BoundedMemoryStore`` caches per process, so deleting an entry
+    does not reach other workers and ``ttl`` bounds how stale their copies get.
+    """
+
+    __slots__ = ('_decoder', '_store', '_ttl')
+
+    def __init__(self, store: Store, value_type: type[T], ttl: int) -> None:
+        self._store = store
+        self._decoder = msgspec.json.Decoder(value_type)
+        self._ttl = ttl
+
+    async def get_many(self, ids: Iterable[int]) -> dict[int, T]:
+        """Return the cached values of ``ids``; ids without a live entry are left out."""
+        cached = {}
+        for obj_id in ids:
+            data = await self._store.get(str(obj_id))
+            if data is not None:
+                cached[obj_id] = self._decoder.decode(data)
+        return cached
+
+    async def set_many(self, values: Mapping[int, T]) -> None:
+        for obj_id, value in values.items():
+            await self._store.set(str(obj_id), msgspec.json.encode(value), expires_in=self._ttl)
+
+    async def delete(self, *ids: int) -> None:
+        for obj_id in ids:
+            await self._store.delete(str(obj_id))
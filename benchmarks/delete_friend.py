@@ -0,0 +1,197 @@
+"""Friend removal benchmark: reservation cleanup of ``DELETE /users/me/friends/{id}`` for users with large wishlists.
+
+``--seed`` adds two friends who reserved ``--mutual`` of each other's gifts and ``--others`` mutual friends, every one
+of them with ``--gifts`` gifts (10k by default). Half of every wishlist is reserved, mostly by mutual friends, so nearly
+all reservations touching the pair's gifts must survive. Seeded users get ids from ``SEED_BASE_ID`` upwards; use a
+scratch database with the migrations applied.
+
+Each variant runs in a transaction that is rolled back, so every repetition removes the same friendship. The previous
+two statements (an ``IN`` subquery over both wishlists with an ``OR`` on the reserver) are timed with
+``idx_gift_reservations_reserved_by_tg_id`` dropped, as before the index existed, and with it; the current single
+statement with it. Statements are prepared and cached per connection as in the app, so after the fifth repetition
+PostgreSQL may switch to a generic plan that does not know the two ids. The benchmark fails unless the plan of the
+current statement scans that index; ``--explain`` prints the plan.
+
+    PYTHONPATH=app python -m benchmarks.delete_friend --seed [--gifts 10000] [--others 100] [--mutual 20]
+    PYTHONPATH=app python -m benchmarks.delete_friend [--repeat 50] [--explain]
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from repositories import UserRepository
+from repositories.users import _delete_friend_query
+
+SEED_BASE_ID = 8_000_000_000
+USER_ID = SEED_BASE_ID + 1
+FRIEND_ID = SEED_BASE_ID + 2
+DELETE_FRIEND_QUERY = _delete_friend_query()
+PREVIOUS_STATEMENTS = (
+    text("""
+        DELETE
+        FROM gift_reservations
+        WHERE gift_id IN (
+            SELECT g.id FROM gifts g
+            WHERE (g.user_id = :user_id OR g.user_id = :friend_id)
+        )
+        AND (reserved_by_tg_id = :user_id OR reserved_by_tg_id = :friend_id)
+    """),
+    text("""
+        DELETE
+        FROM friends
+        WHERE (user_tg_id = :user_id AND friend_tg_id = :friend_id)
+            OR (user_tg_id = :friend_id AND friend_tg_id = :user_id)
+    """),
+)
+
+
+async def seed(session: AsyncSession, args: argparse.Namespace) -> None:
+    params = {'base': SEED_BASE_ID, 'users': args.others + 2, 'gifts': args.gifts, 'mutual': args.mutual}
+    await session.execute(
+        text("""
+            INSERT INTO users (tg_id, first_name, created_at, updated_at)
+            SELECT CAST(:base AS bigint) + i, 'Seed ' || i, now(), now()
+            FROM generate_series(1, :users) AS i
+            ON CONFLICT DO NOTHING
+        """),
+        params,
+    )
+    # The pair are friends, and everyone else is a friend of both.
+    await session.execute(
+        text("""
+            INSERT INTO friends (user_tg_id, friend_tg_id, created_at)
+            SELECT CAST(:base AS bigint) + a, CAST(:base AS bigint) + b, now()
+            FROM generate_series(1, 2) AS a
+            CROSS JOIN generate_series(1, :users) AS b
+            CROSS JOIN LATERAL (VALUES (a, b), (b, a)) AS pair(x, y)
+            WHERE a <> b
+            ON CONFLICT DO NOTHING
+        """),
+        params,
+    )
+    await session.execute(
+        text("""
+            INSERT INTO gifts (user_id, name, created_at, updated_at)
+            SELECT CAST(:base AS bigint) + u, 'Gift ' || i, now(), now()
+            FROM generate_series(1, :users) AS u
+            CROSS JOIN generate_series(1, :gifts) AS i
+        """),
+        params,
+    )
+    # Every other gift is reserved: ``mutual`` gifts of each of the pair by the other one, every 1000th gift of the
+    # mutual friends by one of the pair, the rest by mutual friends.
+    await session.execute(
+        text("""
+            INSERT INTO gift_reservations (gift_id, reserved_by_tg_id, created_at)
+            SELECT g.id, CASE
+                WHEN g.user_id <= CAST(:base AS bigint) + 2 AND g.rank <= 2 * :mutual
+                    THEN 2 * CAST(:base AS bigint) + 3 - g.user_id
+                WHEN g.user_id > CAST(:base AS bigint) + 2 AND g.rank % 1000 = 0
+                    THEN CAST(:base AS bigint) + 1 + g.rank / 1000 % 2
+                ELSE CAST(:base AS bigint) + 3 + (g.user_id + g.rank / 2) % (:users - 2)
+            END, now()
+            FROM (
+                SELECT id, user_id, row_number() OVER (PARTITION BY user_id ORDER BY id) AS rank
+                FROM gifts
+                WHERE user_id BETWEEN CAST(:base AS bigint) + 1 AND CAST(:base AS bigint) + :users
+            ) g
+            WHERE g.rank % 2 = 0
+            ON CONFLICT DO NOTHING
+        """),
+        params,
+    )
+    await session.commit()
+
+
+async def time_rolled_back(
+    session: AsyncSession,
+    call: Callable[[], Awaitable[object]],
+    repeat: int,
+    setup: str | None = None,
+) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            await session.execute(text(setup))
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+        await session.rollback()
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', action='store_true')
+    parser.add_argument('--gifts', type=int, default=10_000)
+    parser.add_argument('--others', type=int, default=100)
+    parser.add_argument('--mutual', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--explain', action='store_true')
+    args = parser.parse_args()
+
+    params = {'user_id': USER_ID, 'friend_id': FRIEND_ID}
+    engine = create_async_engine(settings.db.async_url)
+    async with AsyncSession(engine) as session:
+        if args.seed:
+            await seed(session, args)
+            async with engine.execution_options(isolation_level='AUTOCOMMIT').connect() as connection:
+                await connection.execute(text('VACUUM ANALYZE users, friends, gifts, gift_reservations'))
+        users = UserRepository(session)
+
+        async def previous() -> None:
+            for stmt in PREVIOUS_STATEMENTS:
+                await session.execute(stmt, params)
+
+        async def current() -> None:
+            await users.delete_friend(USER_ID, FRIEND_ID)
+
+        counts = await session.execute(
+            text("""
+                SELECT
+                    count(*) FILTER (WHERE g.user_id = :user_id),
+                    count(*) FILTER (WHERE g.user_id = :user_id AND gr.gift_id IS NOT NULL),
+                    count(*) FILTER (WHERE g.user_id = :user_id AND gr.reserved_by_tg_id = :friend_id)
+                FROM gifts g
+                LEFT JOIN gift_reservations gr ON gr.gift_id = g.id
+                WHERE g.user_id IN (:user_id, :friend_id)
+            """),
+            params,
+        )
+        gifts, reserved, by_friend = counts.one()
+        print(f'\neach of the pair: {gifts} gifts, {reserved} reserved, {by_friend} of them by the other')
+        print(f'  {"variant":<42}{"median ms":>12}{"p95 ms":>10}')
+        drop_index = 'DROP INDEX idx_gift_reservations_reserved_by_tg_id'
+        variants = (
+            ('previous, without the reserved_by index', previous, drop_index),
+            ('previous, with the reserved_by index', previous, None),
+            ('current, with the reserved_by index', current, None),
+        )
+        await time_rolled_back(session, previous, 5)
+        for label, call, setup in variants:
+            timings = await time_rolled_back(session, call, args.repeat, setup)
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f'  {label:<42}{statistics.median(timings):>12.2f}{p95:>10.2f}')
+
+        plan = await session.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {DELETE_FRIEND_QUERY.text}'), params)
+        lines = [row[0] for row in plan]
+        await session.rollback()
+        if args.explain:
+            print('\n' + '\n'.join(lines))
+        if not any('idx_gift_reservations_reserved_by_tg_id' in line for line in lines):
+            sys.exit('The reservation deletes do not scan idx_gift_reservations_reserved_by_tg_id')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""Friend suggestions benchmark: cost of ranking friends of friends for ordinary users and for a hub with 5k friends.
+
+Compares the bounded self-join the endpoint runs (``APP__FRIEND_SUGGESTIONS__MAX_SOURCES`` /
+``MAX_PER_SOURCE``) with an exact count over every friend of every friend. Accuracy is the share of the bounded top
+10 whose exact mutual count reaches that of the exact 10th best, which stays meaningful when many candidates tie.
+
+``--seed-hub`` adds a hub user befriending ``--hub-friends`` seeded users. Run from the project root against a
+database seeded by ``benchmarks.search --seed`` (uses the ``APP__DB__*`` settings):
+
+    PYTHONPATH=app python -m benchmarks.friend_suggestions [--seed-hub] [--hub-friends 5000] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.search import SEED_BASE_ID
+from core.config import settings
+from repositories import UserRepository
+from services.users import MAX_FRIEND_SUGGESTIONS
+
+UNBOUNDED = 2**31 - 1
+
+
+async def seed_hub(session: AsyncSession, hub_id: int, friends: int, users: int) -> None:
+    await session.execute(
+        text("""
+            INSERT INTO users (tg_id, first_name, created_at, updated_at)
+            VALUES (:hub_id, 'Hub', now(), now())
+            ON CONFLICT DO NOTHING
+        """),
+        {'hub_id': hub_id},
+    )
+    await session.execute(
+        text("""
+            INSERT INTO friends (user_tg_id, friend_tg_id, created_at)
+            SELECT pair.a, pair.b, now() - random() * interval '365 days'
+            FROM generate_series(1, :friends) AS i
+            CROSS JOIN LATERAL (VALUES
+                (CAST(:hub_id AS bigint), CAST(:base AS bigint) + 1 + (i * 7) % :users),
+                (CAST(:base AS bigint) + 1 + (i * 7) % :users, CAST(:hub_id AS bigint))
+            ) AS pair(a, b)
+            ON CONFLICT DO NOTHING
+        """),
+        {'hub_id': hub_id, 'friends': friends, 'base': SEED_BASE_ID, 'users': users},
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE friends'))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed-hub', action='store_true')
+    parser.add_argument('--hub-friends', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=100_000, help='users seeded by benchmarks.search')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)  # noqa: S311
+    hub_id = SEED_BASE_ID + args.users + 1
+    engine = create_async_engine(settings.db.async_url)
+    async with AsyncSession(engine) as session:
+        if args.seed_hub:
+            await seed_hub(session, hub_id, args.hub_friends, args.users)
+        users = UserRepository(session)
+        hub_friends = len(await users.get_friends(hub_id))
+        if not hub_friends:
+            sys.exit('No hub user found, run with --seed-hub first')
+        config = settings.friend_suggestions
+
+        async def suggest(user_id: int, *, bounded: bool) -> list[int]:
+            limits = (config.max_sources, config.max_per_source) if bounded else (UNBOUNDED, UNBOUNDED)
+            ranked = await users.get_friend_suggestions(user_id, MAX_FRIEND_SUGGESTIONS, *limits)
+            return [suggestion.tg_id for suggestion in ranked]
+
+        async def accuracy(user_id: int, top: list[int]) -> float:
+            ranked = await users.get_friend_suggestions(user_id, UNBOUNDED, UNBOUNDED, UNBOUNDED)
+            if not ranked:
+                return 1.0
+            exact = {suggestion.tg_id: suggestion.mutual_count for suggestion in ranked}
+            threshold = ranked[min(len(ranked), 10) - 1].mutual_count
+            return sum(exact.get(tg_id, 0) >= threshold for tg_id in top[:10]) / min(len(ranked), 10)
+
+        print(f'\nlimits: {config.max_sources} sources x {config.max_per_source} per source')
+        print(f'  {"case":<36}{"median ms":>12}{"p95 ms":>10}{"top-10 accuracy":>17}')
+        cases = {
+            'ordinary users, bounded': (False, True),
+            'ordinary users, exact': (False, False),
+            f'hub with {hub_friends} friends, bounded': (True, True),
+            f'hub with {hub_friends} friends, exact': (True, False),
+        }
+        for label, (hub, bounded) in cases.items():
+            requests = args.requests if not hub else max(args.requests // 10, 5)
+            timings = []
+            accuracies = []
+            for _ in range(requests):
+                user_id = hub_id if hub else SEED_BASE_ID + rng.randint(1, args.users)
+                started = time.perf_counter()
+                ranked = await suggest(user_id, bounded=bounded)
+                timings.append((time.perf_counter() - started) * 1000)
+                if bounded:
+                    accuracies.append(await accuracy(user_id, ranked))
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            share = f'{statistics.mean(accuracies):.0%}' if accuracies else '-'
+            print(f'  {label:<36}{statistics.median(timings):>12.2f}{p95:>10.2f}{share:>17}')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""List endpoint encoding benchmark: Litestar's default dataclass serialization vs. ``MsgspecResponse`` structs.
+
+Run from the project root:
+
+    PYTHONPATH=app python -m benchmarks.list_encoding [--items 1000] [--requests 300]
+"""
+
+import argparse
+import asyncio
+from datetime import UTC
+from datetime import datetime
+import time
+
+from litestar import Litestar
+from litestar import Response
+from litestar import get
+
+from domain import Gift
+from domain import User
+from dto.gifts import GiftResponse
+from dto.users import UserResponse
+from utils import MsgspecResponse
+
+
+def build_app(items: int) -> Litestar:
+    now = datetime.now(UTC)
+    gifts = [
+        Gift(
+            i,
+            1,
+            f'gift {i}',
+            'https://example.com',
+            5,
+            10,
+            'note',
+            now,
+            now,
+            version=1,
+            is_reserved=False,
+            reserved_by=None,
+        )
+        for i in range(items)
+    ]
+    users = [User(i, f'user_{i}', 'John', 'Doe', 'https://example.com/avatar.png', now, now) for i in range(items)]
+
+    @get('/legacy/gifts', sync_to_thread=False)
+    def legacy_gifts() -> list[Gift]:
+        return gifts
+
+    @get('/msgspec/gifts', sync_to_thread=False)
+    def msgspec_gifts() -> Response[list[GiftResponse]]:
+        return MsgspecResponse([GiftResponse.from_domain(gift) for gift in gifts])
+
+    @get('/legacy/users', sync_to_thread=False)
+    def legacy_users() -> list[User]:
+        return users
+
+    @get('/msgspec/users', sync_to_thread=False)
+    def msgspec_users() -> Response[list[UserResponse]]:
+        return MsgspecResponse([UserResponse.from_domain(user) for user in users])
+
+    return Litestar(route_handlers=[legacy_gifts, msgspec_gifts, legacy_users, msgspec_users], debug=False)
+
+
+async def call(app: Litestar, path: str) -> int:
+    """Drive the ASGI app directly so that the numbers are not dominated by an HTTP client."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [],
+        'client': ('127.0.0.1', 1234),
+        'server': ('127.0.0.1', 80),
+    }
+    body_size = 0
+
+    async def receive() -> dict:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict) -> None:
+        nonlocal body_size
+        if message['type'] == 'http.response.body':
+            body_size += len(message.get('body', b''))
+
+    await app(scope, receive, send)  # ty:ignore[invalid-argument-type]
+    return body_size
+
+
+async def throughput(app: Litestar, path: str, requests: int) -> tuple[float, int]:
+    await call(app, path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        body_size = await call(app, path)
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, body_size
+
+
+async def run(items: int, requests: int) -> None:
+    app = build_app(items)
+    for resource in ('gifts', 'users'):
+        legacy_rps, legacy_size = await throughput(app, f'/legacy/{resource}', requests)
+        msgspec_rps, msgspec_size = await throughput(app, f'/msgspec/{resource}', requests)
+        print(f'\n{resource} ({items} items per response)')
+        print(f'  {"variant":<24}{"req/s":>10}{"body bytes":>14}')
+        print(f'  {"litestar dataclasses":<24}{legacy_rps:>10.0f}{legacy_size:>14}')
+        print(f'  {"msgspec structs":<24}{msgspec_rps:>10.0f}{msgspec_size:>14}')
+        print(f'  speedup: {msgspec_rps / legacy_rps:.2f}x')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.items, args.requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Connection pool profile benchmark: per-request latency of ``direct`` vs. ``transaction_pooler`` engines.
+
+Every simulated request opens a session, runs the profile lookup issued by ``GET /users/{tg_id}`` and closes
+the session, the way a request-scoped ``db_session`` does. Point ``--host``/``--port`` at PgBouncer to measure
+the pooler profiles behind it.
+
+Run from the project root (uses the ``APP__DB__*`` settings):
+
+    PYTHONPATH=app python -m benchmarks.pool_profiles [--requests 2000] [--concurrency 20] [--port 6432]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from advanced_alchemy.extensions.litestar import SQLAlchemyAsyncConfig
+from sqlalchemy import text
+
+from core.config import settings
+from core.config.database import HealthCheck
+from core.config.database import PoolProfile
+from core.database.sqlalchemy_config import build_engine_config
+from core.database.sqlalchemy_config import session_config
+
+QUERY = text('SELECT u.tg_id, u.tg_username, u.first_name FROM users u WHERE u.tg_id = :tg_id')
+PROFILES = {
+    'direct (pre-ping)': {'profile': PoolProfile.DIRECT},
+    'direct (optimistic)': {'profile': PoolProfile.DIRECT, 'health_check': HealthCheck.OPTIMISTIC},
+    'pooler (NullPool)': {'profile': PoolProfile.TRANSACTION_POOLER, 'pooler_pool_size': 0},
+    'pooler (pool of 2)': {'profile': PoolProfile.TRANSACTION_POOLER, 'pooler_pool_size': 2},
+}
+
+
+async def run_profile(config: SQLAlchemyAsyncConfig, requests: int, concurrency: int) -> tuple[list[float], float]:
+    timings: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with config.get_session() as session:
+                await session.execute(QUERY, {'tg_id': i})
+            timings.append((time.perf_counter() - started) * 1000)
+
+    await handle(0)
+    timings.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(handle(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await config.get_engine().dispose()
+    return timings, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--host', default=settings.db.host)
+    parser.add_argument('--port', type=int, default=settings.db.port)
+    args = parser.parse_args()
+
+    url = settings.db.async_url.set(host=args.host, port=args.port).render_as_string(hide_password=False)
+    print(f'\n{args.requests} requests, concurrency {args.concurrency}')
+    print(f'  {"profile":<24}{"median ms":>12}{"p95 ms":>12}{"req/s":>10}')
+    for label, overrides in PROFILES.items():
+        engine_settings = settings.db.engine.model_copy(update=overrides)
+        config = SQLAlchemyAsyncConfig(
+            connection_string=url,
+            engine_config=build_engine_config(engine_settings),
+            session_config=session_config,
+        )
+        timings, elapsed = await run_profile(config, args.requests, args.concurrency)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f'  {label:<24}{statistics.median(timings):>12.2f}{p95:>12.2f}{args.requests / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""Row mapping benchmark: ``RowMapping`` + keyword dataclasses vs. positional mappers + slotted dataclasses.
+
+Run from the project root:
+
+    PYTHONPATH=app python -m benchmarks.row_mapping [--rows 10000] [--repeat 20]
+"""
+
+import argparse
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.engine.result import IteratorResult
+from sqlalchemy.engine.result import SimpleResultMetaData
+
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from repositories.mappers import gift_from_row
+from repositories.mappers import gift_with_owner_from_row
+
+GIFT_KEYS = (
+    'id',
+    'user_id',
+    'name',
+    'url',
+    'wish_rate',
+    'created_at',
+    'updated_at',
+    'price',
+    'note',
+    'is_reserved',
+    'reserved_by',
+)
+OWNER_KEYS = ('owner_first_name', 'owner_last_name', 'owner_avatar_url')
+POSITIONAL_GIFT_KEYS = (
+    'id',
+    'user_id',
+    'name',
+    'url',
+    'wish_rate',
+    'price',
+    'note',
+    'created_at',
+    'updated_at',
+    'version',
+    'is_reserved',
+    'reserved_by',
+)
+
+
+@dataclass(frozen=True)
+class LegacyGift:
+    id: int | None
+    user_id: int
+    name: str
+    url: str | None
+    wish_rate: int | None
+    price: int | None
+    note: str | None
+    created_at: datetime
+    updated_at: datetime
+    is_reserved: bool
+    reserved_by: int | None
+
+
+@dataclass(frozen=True)
+class LegacyGiftOwner:
+    first_name: str | None
+    last_name: str | None
+    avatar_url: str | None
+
+
+@dataclass(frozen=True)
+class LegacyGiftWithOwner(LegacyGift):
+    owner: LegacyGiftOwner
+
+
+def make_rows(count: int, *, positional: bool, with_owner: bool) -> list[tuple]:
+    now = datetime.now(UTC)
+    rows = []
+    for i in range(count):
+        if positional:
+            row = (i, 1, f'gift {i}', 'https://example.com', 5, Decimal('10.00'), 'note', now, now, 1, True, 2)
+        else:
+            row = (i, 1, f'gift {i}', 'https://example.com', 5, now, now, Decimal('10.00'), 'note', True, 2)
+        if with_owner:
+            row = (*row, 'John', 'Doe', 'https://example.com/avatar.png')
+        rows.append(row)
+    return rows
+
+
+def as_result(keys: tuple[str, ...], rows: list[tuple]) -> IteratorResult:
+    return IteratorResult(SimpleResultMetaData(keys), iter(rows))
+
+
+def legacy_gifts(rows: list[tuple]) -> list[LegacyGift]:
+    return [LegacyGift(**row) for row in as_result(GIFT_KEYS, rows).mappings()]
+
+
+def positional_gifts(rows: list[tuple]) -> list:
+    return [gift_from_row(row) for row in as_result(POSITIONAL_GIFT_KEYS, rows)]
+
+
+def legacy_gifts_with_owner(rows: list[tuple]) -> list[LegacyGiftWithOwner]:
+    gifts = []
+    for row in as_result(GIFT_KEYS + OWNER_KEYS, rows).mappings().all():
+        owner = LegacyGiftOwner(
+            first_name=row['owner_first_name'],
+            last_name=row['owner_last_name'],
+            avatar_url=row['owner_avatar_url'],
+        )
+        gifts.append(
+            LegacyGiftWithOwner(
+                id=row['id'],
+                user_id=row['user_id'],
+                name=row['name'],
+                url=row['url'],
+                wish_rate=row['wish_rate'],
+                price=row['price'],
+                note=row['note'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+                is_reserved=row['is_reserved'],
+                reserved_by=row['reserved_by'],
+                owner=owner,
+            )
+        )
+    return gifts
+
+
+def positional_gifts_with_owner(rows: list[tuple]) -> list:
+    return [gift_with_owner_from_row(row) for row in as_result(POSITIONAL_GIFT_KEYS + OWNER_KEYS, rows)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [
+        ('get_gifts_by_user_id', legacy_gifts, positional_gifts, False),
+        ('get_my_reservations', legacy_gifts_with_owner, positional_gifts_with_owner, True),
+    ]
+    for name, legacy, positional, with_owner in cases:
+        legacy_rows = make_rows(args.rows, positional=False, with_owner=with_owner)
+        positional_rows = make_rows(args.rows, positional=True, with_owner=with_owner)
+        report(
+            f'{name} ({args.rows} rows)',
+            measure('RowMapping + kwargs', lambda f=legacy, r=legacy_rows: f(r), args.repeat),
+            measure('positional + slots', lambda f=positional, r=positional_rows: f(r), args.repeat),
+        )
+
+
+if __name__ == '__main__':
+    main()
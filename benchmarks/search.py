@@ -0,0 +1,160 @@
+"""Search benchmark: latency of the friend-limited gift and friend searches on a large seeded dataset.
+
+``--seed`` fills the database with synthetic users, friendships and gifts (10M gifts by default) generated
+server-side, then runs ``ANALYZE``. Seeded users get ids from ``SEED_BASE_ID`` upwards, so run it against a
+scratch database with the migrations applied, never against real data. Queries are issued through the
+repositories, for random seeded users and vocabulary words, complete and as 3-letter prefixes.
+Each gift search reads every gift of the user's friends, so cold pages dominate the numbers: size
+``shared_buffers`` the way production does before comparing runs.
+
+Run from the project root (uses the ``APP__DB__*`` settings):
+
+    PYTHONPATH=app python -m benchmarks.search --seed [--gifts 10000000] [--users 100000] [--friends 50]
+    PYTHONPATH=app python -m benchmarks.search [--queries 200] [--explain]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from repositories import GiftRepository
+from repositories import UserRepository
+from repositories.gifts import _gift_search_query
+from repositories.users import _friends_search_query
+
+SEED_BASE_ID = 9_000_000_000
+SEED_BATCH = 1_000_000
+SEARCH_LIMIT = 20
+SYLLABLES = ('ka', 'lo', 'mi', 'ren', 'to', 'sa', 'vel', 'nu', 'dor', 'pi', 'stra', 'gel', 'bo', 'tin', 'ax', 'ri')
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+async def seed(session: AsyncSession, args: argparse.Namespace, vocabulary: list[str]) -> None:
+    params = {'base': SEED_BASE_ID, 'users': args.users, 'words': vocabulary}
+    word = '(CAST(:words AS text[]))[1 + floor(random() * cardinality(CAST(:words AS text[])))::int]'
+    await session.execute(
+        text(f"""
+            INSERT INTO users (tg_id, tg_username, first_name, last_name, created_at, updated_at)
+            SELECT
+                CAST(:base AS bigint) + i,
+                left({word} || i, 30),
+                initcap(left({word}, 30)),
+                initcap(left({word}, 30)),
+                now(),
+                now()
+            FROM generate_series(1, :users) AS i
+            ON CONFLICT DO NOTHING
+        """),
+        params,
+    )
+    await session.execute(
+        text("""
+            INSERT INTO friends (user_tg_id, friend_tg_id, created_at)
+            SELECT CAST(:base AS bigint) + a, CAST(:base AS bigint) + b, now()
+            FROM generate_series(0, :users - 1) AS i
+            CROSS JOIN generate_series(1, :half_friends) AS k
+            CROSS JOIN LATERAL (VALUES
+                (1 + i, 1 + (i + k * 7919) % :users),
+                (1 + (i + k * 7919) % :users, 1 + i)
+            ) AS pair(a, b)
+            WHERE a <> b
+            ON CONFLICT DO NOTHING
+        """),
+        {**params, 'half_friends': max(args.friends // 2, 1)},
+    )
+    for start in range(0, args.gifts, SEED_BATCH):
+        await session.execute(
+            text(f"""
+                INSERT INTO gifts (user_id, name, note, wish_rate, created_at, updated_at)
+                SELECT
+                    CAST(:base AS bigint) + 1 + i % :users,
+                    left({word} || ' ' || {word} || CASE WHEN i % 3 = 0 THEN ' ' || {word} ELSE '' END, 100),
+                    CASE WHEN i % 2 = 0 THEN {word} || ' ' || {word} || ' ' || {word} END,
+                    1 + i % 10,
+                    now() - i * interval '1 second',
+                    now()
+                FROM generate_series(:start, :stop - 1) AS i
+            """),
+            {**params, 'start': start, 'stop': min(start + SEED_BATCH, args.gifts)},
+        )
+        await session.commit()
+        print(f'  seeded {min(start + SEED_BATCH, args.gifts):,} gifts')
+    await session.commit()
+    await session.execute(text('ANALYZE users, friends, gifts'))
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    return sorted(timings)[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+async def run(session: AsyncSession, args: argparse.Namespace, vocabulary: list[str], rng: random.Random) -> None:
+    gifts = GiftRepository(session)
+    users = UserRepository(session)
+    cases = {
+        'gifts, word': lambda user_id, word: gifts.search(user_id, word, SEARCH_LIMIT, 0),
+        'gifts, 3-letter prefix': lambda user_id, word: gifts.search(user_id, word[:3], SEARCH_LIMIT, 0),
+        'friends, word': lambda user_id, word: users.search_friends(user_id, word, SEARCH_LIMIT, 0),
+        'friends, 3-letter prefix': lambda user_id, word: users.search_friends(user_id, word[:3], SEARCH_LIMIT, 0),
+    }
+    print(f'\n{args.queries} queries per case, limit {SEARCH_LIMIT}')
+    print(f'  {"case":<28}{"median ms":>12}{"p95 ms":>10}{"p99 ms":>10}{"avg hits":>10}')
+    for label, search in cases.items():
+        timings = []
+        hits = 0
+        for _ in range(args.queries):
+            user_id = SEED_BASE_ID + rng.randint(1, args.users)
+            started = time.perf_counter()
+            hits += len(await search(user_id, rng.choice(vocabulary)))
+            timings.append((time.perf_counter() - started) * 1000)
+        print(
+            f'  {label:<28}{statistics.median(timings):>12.2f}{percentile(timings, 0.95):>10.2f}'
+            f'{percentile(timings, 0.99):>10.2f}{hits / args.queries:>10.1f}'
+        )
+
+    if args.explain:
+        user_id = SEED_BASE_ID + rng.randint(1, args.users)
+        for query, user_param in (
+            (_gift_search_query(), {'current_user_id': user_id}),
+            (_friends_search_query(), {'tg_id': user_id}),
+        ):
+            explain = text(f'EXPLAIN (ANALYZE, BUFFERS) {query.text}')
+            params = {**user_param, 'query': rng.choice(vocabulary), 'limit': SEARCH_LIMIT, 'offset': 0}
+            plan = await session.execute(explain, params)
+            print('\n' + '\n'.join(row[0] for row in plan))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', action='store_true')
+    parser.add_argument('--gifts', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--friends', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--explain', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(42)  # noqa: S311
+    vocabulary = make_vocabulary(2000, rng)
+    engine = create_async_engine(settings.db.async_url)
+    async with AsyncSession(engine) as session:
+        if args.seed:
+            await seed(session, args, vocabulary)
+        await run(session, args, vocabulary, rng)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
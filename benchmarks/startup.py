@@ -0,0 +1,124 @@
+"""Cold start benchmark: ``-X importtime`` profile and time to first request of the application.
+
+Every run is a fresh interpreter that imports ``application``, runs the ASGI lifespan startup and serves
+``GET /health/live``, which is what an autoscaled instance does before taking traffic. The database warm-up is
+disabled so that the numbers only reflect imports and app construction.
+
+Run from the project root (uses the ``APP__*`` settings):
+
+    PYTHONPATH=app python -m benchmarks.startup [--runs 5] [--top 15]
+"""
+
+import argparse
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+APP_DIR = Path(__file__).resolve().parent.parent / 'app'
+VARIANTS = {
+    'default': {},
+    'OpenAPI disabled': {'APP__APP__OPENAPI_ENABLED': 'false'},
+}
+FIRST_REQUEST = """
+import asyncio
+import json
+import time
+
+started = time.perf_counter()
+from application import app
+imported = time.perf_counter()
+
+
+async def call(scope, *messages):
+    inbox = list(messages)
+    sent = []
+
+    async def receive():
+        if inbox:
+            return inbox.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    return asyncio.create_task(app(scope, receive, send)), sent
+
+
+async def main():
+    lifespan, sent = await call({'type': 'lifespan', 'asgi': {'version': '3.0'}}, {'type': 'lifespan.startup'})
+    while not sent:
+        await asyncio.sleep(0)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/health/live', 'raw_path': b'/health/live', 'root_path': '', 'query_string': b'', 'headers': [],
+        'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 80),
+    }
+    request, response = await call(scope, {'type': 'http.request', 'body': b'', 'more_body': False})
+    await request
+    assert response[0]['status'] == 200, response
+    served = time.perf_counter()
+    lifespan.cancel()
+    print(json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (served - started) * 1000}))
+
+
+asyncio.run(main())
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def run_once(env: dict[str, str]) -> tuple[dict[str, float], list[ImportTime]]:
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', FIRST_REQUEST],
+        cwd=APP_DIR,
+        env={**os.environ, 'APP__DB__WARM_UP': 'false', **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+
+def parse_importtime(report: str) -> list[ImportTime]:
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix('import time:').split('|')
+        imports.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    print(f'\nTime to first request ({args.runs} runs, median)')
+    print(f'  {"variant":<24}{"import ms":>12}{"first request ms":>20}')
+    profile: list[ImportTime] = []
+    for label, env in VARIANTS.items():
+        runs = [run_once(env) for _ in range(args.runs)]
+        profile = profile or runs[-1][1]
+        import_ms = statistics.median(timings['import_ms'] for timings, _ in runs)
+        first_request_ms = statistics.median(timings['first_request_ms'] for timings, _ in runs)
+        print(f'  {label:<24}{import_ms:>12.1f}{first_request_ms:>20.1f}')
+
+    print(f'\nSlowest imports by self time (top {args.top}, default variant)')
+    print(f'  {"module":<60}{"self ms":>10}{"cumulative ms":>16}')
+    for item in sorted(profile, key=lambda item: item.self_us, reverse=True)[: args.top]:
+        print(f'  {item.module:<60}{item.self_us / 1000:>10.1f}{item.cumulative_us / 1000:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
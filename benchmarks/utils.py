@@ -0,0 +1,52 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    label: str
+    median_ms: float
+    best_ms: float
+    retained_kib: float
+    peak_kib: float
+
+
+def measure(label: str, func: Callable[[], Any], repeat: int) -> Measurement:
+    func()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return Measurement(
+        label=label,
+        median_ms=statistics.median(timings),
+        best_ms=min(timings),
+        retained_kib=retained / 1024,
+        peak_kib=peak / 1024,
+    )
+
+
+def report(title: str, baseline: Measurement, *candidates: Measurement) -> None:
+    print(f'\n{title}')
+    print(f'  {"variant":<28}{"median ms":>12}{"best ms":>12}{"retained KiB":>15}{"peak KiB":>12}{"speedup":>10}')
+    for item in (baseline, *candidates):
+        speedup = baseline.median_ms / item.median_ms if item.median_ms else float('inf')
+        print(
+            f'  {item.label:<28}{item.median_ms:>12.2f}{item.best_ms:>12.2f}'
+            f'{item.retained_kib:>15.0f}{item.peak_kib:>12.0f}{speedup:>9.2f}x'
+        )
@@ -0,0 +1,110 @@
+"""Wishlist access benchmark: cost of enforcing friend-or-owner access inside the wishlist query.
+
+Compares ``GET /gifts/user/{tg_id}`` reads done as one query carrying the access condition against a separate
+access check followed by the wishlist query, and prints the plan of the friends probe, which must stay an
+index-only scan of ``friends_pkey`` evaluated once per query. Heap fetches of that scan drop to 0 once the
+table has been vacuumed.
+
+Run from the project root against a database seeded by ``benchmarks.search --seed`` (uses the ``APP__DB__*``
+settings):
+
+    PYTHONPATH=app python -m benchmarks.wishlist_access [--requests 500]
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterator
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from dto.gifts import DEFAULT_WISHLIST_QUERY
+from repositories import GiftRepository
+from repositories.gifts import _gift_select_query
+from repositories.gifts import _wishlist_query
+
+UNCHECKED_QUERY = _gift_select_query('g.user_id = :user_id', 'ORDER BY g.created_at DESC, g.id DESC')
+WISHLIST_QUERY = _wishlist_query(DEFAULT_WISHLIST_QUERY, with_cursor=False, with_limit=False)
+
+
+def plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+async def friend_pairs(session: AsyncSession, count: int) -> list[tuple[int, int]]:
+    result = await session.execute(
+        text('SELECT user_tg_id, friend_tg_id FROM friends TABLESAMPLE SYSTEM (1) LIMIT :count'), {'count': count}
+    )
+    return [(owner, viewer) for owner, viewer in result]
+
+
+async def time_requests(call: Callable[[int, int], Awaitable[None]], pairs: list[tuple[int, int]]) -> list[float]:
+    timings = []
+    for owner, viewer in pairs:
+        started = time.perf_counter()
+        await call(owner, viewer)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.db.async_url)
+    async with AsyncSession(engine) as session:
+        pairs = await friend_pairs(session, args.requests)
+        if not pairs:
+            sys.exit('No friendships found, seed the database with benchmarks.search --seed first')
+        random.Random(42).shuffle(pairs)  # noqa: S311
+        gifts = GiftRepository(session)
+
+        async def single_query(owner: int, viewer: int) -> None:
+            await session.execute(WISHLIST_QUERY, {'user_id': owner, 'current_user_id': viewer})
+
+        async def check_then_read(owner: int, viewer: int) -> None:
+            if await gifts.can_view_wishlist(owner, viewer):
+                await session.execute(UNCHECKED_QUERY, {'user_id': owner, 'current_user_id': viewer})
+
+        await time_requests(single_query, pairs[:20])
+        print(f'\n{len(pairs)} wishlist reads by friends of the owner')
+        print(f'  {"variant":<28}{"median ms":>12}{"p95 ms":>10}')
+        for label, call in (('access in wishlist query', single_query), ('check, then read', check_then_read)):
+            timings = await time_requests(call, pairs)
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f'  {label:<28}{statistics.median(timings):>12.2f}{p95:>10.2f}')
+
+        owner, viewer = pairs[0]
+        explain = text(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {WISHLIST_QUERY.text}')
+        plan = (await session.execute(explain, {'user_id': owner, 'current_user_id': viewer})).scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        probes = [node for node in plan_nodes(plan[0]['Plan']) if node.get('Relation Name') == 'friends']
+        print('\nfriends probes in the wishlist plan')
+        for node in probes:
+            print(
+                f'  {node["Node Type"]} using {node.get("Index Name")}: loops={node["Actual Loops"]}, '
+                f'heap fetches={node.get("Heap Fetches")}'
+            )
+        if not probes or any(
+            (node['Node Type'], node.get('Index Name'), node['Actual Loops']) != ('Index Only Scan', 'friends_pkey', 1)
+            for node in probes
+        ):
+            sys.exit('The friends probe is not a single index-only scan of friends_pkey')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
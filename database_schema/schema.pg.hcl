@@ -2,6 +2,10 @@ schema "public" {
   comment = "standard public schema"
 }
 
+extension "pg_trgm" {
+  schema = schema.public
+}
+
 table "users" {
   schema = schema.public
   column "tg_id" {
@@ -41,6 +45,13 @@ table "users" {
     columns = [column.tg_username]
     unique = false
   }
+  index "idx_users_search_trgm" {
+    type = GIN
+    on {
+      expr = "(((((COALESCE(tg_username, ''::character varying))::text || ' '::text) || (COALESCE(first_name, ''::character varying))::text) || ' '::text) || (COALESCE(last_name, ''::character varying))::text)"
+      ops  = "gin_trgm_ops"
+    }
+  }
 }
 
 table "gifts" {
@@ -83,6 +94,11 @@ table "gifts" {
     type = timestamptz
     default = sql("now()")
   }
+  column "version" {
+    null = false
+    type = integer
+    default = 1
+  }
   primary_key {
     columns = [column.id]
   }
@@ -93,8 +109,46 @@ table "gifts" {
     on_update = NO_ACTION
   }
 
-  index "idx_gifts_user_id" {
-    columns = [column.user_id]
+  index "idx_gifts_user_id_created_at_id" {
+    on {
+      column = column.user_id
+    }
+    on {
+      column = column.created_at
+      desc   = true
+    }
+    on {
+      column = column.id
+      desc   = true
+    }
+  }
+  index "idx_gifts_user_id_price_id" {
+    on {
+      column = column.user_id
+    }
+    on {
+      expr = "COALESCE(price, (0)::numeric)"
+    }
+    on {
+      column = column.id
+    }
+  }
+  index "idx_gifts_user_id_wish_rate_id" {
+    on {
+      column = column.user_id
+    }
+    on {
+      expr = "COALESCE((wish_rate)::integer, 0)"
+    }
+    on {
+      column = column.id
+    }
+  }
+  index "idx_gifts_search" {
+    type = GIN
+    on {
+      expr = "to_tsvector('simple'::regconfig, (((name)::text || ' '::text) || COALESCE(note, ''::text)))"
+    }
   }
 }
 
@@ -211,6 +265,9 @@ table "gift_reservations" {
   unique "uk_gift_reservations_gift_id" {
     columns = [column.gift_id]
   }
+  index "idx_gift_reservations_reserved_by_tg_id" {
+    columns = [column.reserved_by_tg_id]
+  }
   foreign_key "fk_gift_reservations_gift" {
     columns     = [column.gift_id]
     ref_columns = [table.gifts.column.id]
@@ -222,3 +279,53 @@ table "gift_reservations" {
     on_delete   = CASCADE
   }
 }
+
+table "account_deletions" {
+  schema = schema.public
+
+  column "user_tg_id" {
+    null = false
+    type = bigint
+  }
+  column "status" {
+    null = false
+    type = varchar(20)
+  }
+  column "friend_requests_deleted" {
+    null    = false
+    type    = integer
+    default = 0
+  }
+  column "friends_deleted" {
+    null    = false
+    type    = integer
+    default = 0
+  }
+  column "reservations_deleted" {
+    null    = false
+    type    = integer
+    default = 0
+  }
+  column "gifts_deleted" {
+    null    = false
+    type    = integer
+    default = 0
+  }
+  column "created_at" {
+    null    = false
+    type    = timestamptz
+    default = sql("now()")
+  }
+  column "updated_at" {
+    null    = false
+    type    = timestamptz
+    default = sql("now()")
+  }
+  column "finished_at" {
+    null = true
+    type = timestamptz
+  }
+  primary_key {
+    columns = [column.user_tg_id]
+  }
+}
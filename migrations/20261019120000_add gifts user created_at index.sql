@@ -0,0 +1,4 @@
+-- Drop index "idx_gifts_user_id" from table: "gifts"
+DROP INDEX "idx_gifts_user_id";
+-- Create index "idx_gifts_user_id_created_at_id" to table: "gifts"
+CREATE INDEX "idx_gifts_user_id_created_at_id" ON "gifts" ("user_id", "created_at" DESC, "id" DESC);
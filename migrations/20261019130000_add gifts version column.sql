@@ -0,0 +1,2 @@
+-- Modify "gifts" table
+ALTER TABLE "gifts" ADD COLUMN "version" integer NOT NULL DEFAULT 1;
@@ -0,0 +1,6 @@
+-- Create extension "pg_trgm"
+CREATE EXTENSION IF NOT EXISTS "pg_trgm" WITH SCHEMA "public";
+-- Create index "idx_gifts_search" to table: "gifts"
+CREATE INDEX "idx_gifts_search" ON "gifts" USING gin (to_tsvector('simple', name || ' ' || COALESCE(note, '')));
+-- Create index "idx_users_search_trgm" to table: "users"
+CREATE INDEX "idx_users_search_trgm" ON "users" USING gin ((COALESCE(tg_username, '') || ' ' || COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')) gin_trgm_ops);
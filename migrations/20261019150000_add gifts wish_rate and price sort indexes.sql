@@ -0,0 +1,4 @@
+-- Create index "idx_gifts_user_id_price_id" to table: "gifts"
+CREATE INDEX "idx_gifts_user_id_price_id" ON "gifts" ("user_id", (COALESCE(price, (0)::numeric)), "id");
+-- Create index "idx_gifts_user_id_wish_rate_id" to table: "gifts"
+CREATE INDEX "idx_gifts_user_id_wish_rate_id" ON "gifts" ("user_id", (COALESCE((wish_rate)::integer, 0)), "id");
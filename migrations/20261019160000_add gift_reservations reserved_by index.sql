@@ -0,0 +1,2 @@
+-- Create index "idx_gift_reservations_reserved_by_tg_id" to table: "gift_reservations"
+CREATE INDEX "idx_gift_reservations_reserved_by_tg_id" ON "gift_reservations" ("reserved_by_tg_id");
@@ -0,0 +1,13 @@
+-- Create "account_deletions" table
+CREATE TABLE "account_deletions" (
+  "user_tg_id" bigint NOT NULL,
+  "status" character varying(20) NOT NULL,
+  "friend_requests_deleted" integer NOT NULL DEFAULT 0,
+  "friends_deleted" integer NOT NULL DEFAULT 0,
+  "reservations_deleted" integer NOT NULL DEFAULT 0,
+  "gifts_deleted" integer NOT NULL DEFAULT 0,
+  "created_at" timestamptz NOT NULL DEFAULT now(),
+  "updated_at" timestamptz NOT NULL DEFAULT now(),
+  "finished_at" timestamptz NULL,
+  PRIMARY KEY ("user_tg_id")
+);
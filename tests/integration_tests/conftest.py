@@ -3,6 +3,7 @@ from datetime import UTC
 from datetime import datetime
 from typing import TypedDict
 
+import pytest
 import pytest_asyncio
 from sqlalchemy import NullPool
 from sqlalchemy import text
@@ -12,10 +13,14 @@ from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from core.config import settings
+from dto.users import MutualFriendsDTO
+from dto.users import WishlistStatsDTO
 from repositories import GiftRepository
 from repositories import UserRepository
 from services import GiftService
 from services import UserService
+from utils import BoundedMemoryStore
+from utils import StoreCache
 
 async_engine: AsyncEngine = create_async_engine(
     url=settings.db.test_async_url,
@@ -39,6 +44,7 @@ async def db_session() -> AsyncGenerator[AsyncSession]:
             bind=connection,
             expire_on_commit=False,
             autoflush=False,
+            join_transaction_mode='create_savepoint',
         )
         try:
             yield session
@@ -62,6 +68,16 @@ async def gift_service(db_session: AsyncSession) -> GiftService:
     return GiftService(db_session)
 
 
+@pytest.fixture
+def wishlist_stats() -> StoreCache[WishlistStatsDTO]:
+    return StoreCache(BoundedMemoryStore(max_entries=100), WishlistStatsDTO, ttl=60)
+
+
+@pytest.fixture
+def friend_suggestions() -> StoreCache[list[MutualFriendsDTO]]:
+    return StoreCache(BoundedMemoryStore(max_entries=100), list[MutualFriendsDTO], ttl=60)
+
+
 @pytest_asyncio.fixture
 async def gift_repository(db_session: AsyncSession) -> GiftRepository:
     return GiftRepository(db_session)
@@ -381,3 +397,33 @@ async def test_bob_gift_with_reservation_by_alice(
     await db_session.execute(stmt, params)
 
     return test_bob_gift_car
+
+
+@pytest_asyncio.fixture
+async def test_friends_graph(
+    db_session: AsyncSession,
+    test_user_bob: UserDict,
+    test_user_john: UserDict,
+    test_user_alice: UserDict,
+) -> dict[str, int]:
+    """Bob is friends with John and Carol, who both know Alice; only John knows Dave."""
+    ids = {
+        'bob': test_user_bob['tg_id'],
+        'john': test_user_john['tg_id'],
+        'alice': test_user_alice['tg_id'],
+        'carol': 123459,
+        'dave': 123460,
+    }
+    await db_session.execute(
+        text("""
+            INSERT INTO users (tg_id, tg_username, first_name, created_at, updated_at)
+            VALUES (:carol, 'carol', 'Carol', now(), now()), (:dave, 'dave', 'Dave', now(), now())
+        """),
+        ids,
+    )
+    pairs = [('bob', 'john'), ('bob', 'carol'), ('john', 'alice'), ('carol', 'alice'), ('john', 'dave')]
+    await db_session.execute(
+        text('INSERT INTO friends (user_tg_id, friend_tg_id) VALUES (:user_id, :friend_id)'),
+        [{'user_id': ids[user], 'friend_id': ids[friend]} for a, b in pairs for user, friend in ((a, b), (b, a))],
+    )
+    return ids
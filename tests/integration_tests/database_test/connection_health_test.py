@@ -0,0 +1,102 @@
+from collections.abc import AsyncGenerator
+
+from hamcrest import assert_that
+from hamcrest import equal_to
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from core.database import IdleConnectionValidator
+from core.database import ReconnectingAsyncSession
+from tests.integration_tests.conftest import async_engine
+
+BACKEND_PID = text('SELECT pg_backend_pid()')
+
+
+@pytest_asyncio.fixture
+async def pooled_engine() -> AsyncGenerator[AsyncEngine]:
+    engine = create_async_engine(settings.db.test_async_url, pool_size=2, max_overflow=0, pool_pre_ping=False)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def pooled_backend_pid(engine: AsyncEngine) -> int:
+    async with engine.connect() as connection:
+        return (await connection.execute(BACKEND_PID)).scalar_one()
+
+
+async def kill_backend(pid: int) -> None:
+    async with async_engine.connect() as connection:
+        await connection.execute(text('SELECT pg_terminate_backend(:pid, 1000)'), {'pid': pid})
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestConnectionHealth:
+    async def test_connection_health_dead_connection_fails_without_retry(self, pooled_engine: AsyncEngine) -> None:
+        await kill_backend(await pooled_backend_pid(pooled_engine))
+
+        async with async_sessionmaker(pooled_engine, class_=AsyncSession)() as session:
+            with pytest.raises(DBAPIError) as error:
+                await session.execute(BACKEND_PID)
+
+        assert error.value.connection_invalidated
+
+    async def test_connection_health_first_statement_is_retried_on_new_connection(
+        self,
+        pooled_engine: AsyncEngine,
+    ) -> None:
+        pid = await pooled_backend_pid(pooled_engine)
+        await kill_backend(pid)
+
+        async with async_sessionmaker(pooled_engine, class_=ReconnectingAsyncSession)() as session:
+            new_pid = (await session.execute(BACKEND_PID)).scalar_one()
+
+        assert new_pid != pid
+
+    async def test_connection_health_stream_is_retried_on_new_connection(self, pooled_engine: AsyncEngine) -> None:
+        pid = await pooled_backend_pid(pooled_engine)
+        await kill_backend(pid)
+
+        async with async_sessionmaker(pooled_engine, class_=ReconnectingAsyncSession)() as session:
+            new_pid = (await (await session.stream(BACKEND_PID)).all())[0][0]
+
+        assert new_pid != pid
+
+    async def test_connection_health_statement_inside_transaction_is_not_retried(
+        self,
+        pooled_engine: AsyncEngine,
+    ) -> None:
+        async with async_sessionmaker(pooled_engine, class_=ReconnectingAsyncSession)() as session:
+            pid = (await session.execute(BACKEND_PID)).scalar_one()
+            await kill_backend(pid)
+
+            with pytest.raises(DBAPIError):
+                await session.execute(BACKEND_PID)
+
+    async def test_connection_health_validator_discards_dead_idle_connections(
+        self,
+        pooled_engine: AsyncEngine,
+    ) -> None:
+        pid = await pooled_backend_pid(pooled_engine)
+        await kill_backend(pid)
+
+        dead = await IdleConnectionValidator(pooled_engine, interval=60).validate()
+
+        assert_that(dead, equal_to(1))
+        async with async_sessionmaker(pooled_engine, class_=AsyncSession)() as session:
+            assert (await session.execute(BACKEND_PID)).scalar_one() != pid
+
+    async def test_connection_health_validator_keeps_live_connections(self, pooled_engine: AsyncEngine) -> None:
+        pid = await pooled_backend_pid(pooled_engine)
+
+        assert_that(await IdleConnectionValidator(pooled_engine, interval=60).validate(), equal_to(0))
+        assert_that(await pooled_backend_pid(pooled_engine), equal_to(pid))
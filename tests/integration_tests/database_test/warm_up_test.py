@@ -0,0 +1,79 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+from hamcrest import assert_that
+from hamcrest import equal_to
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from repositories import warm_up_connections
+from tests.integration_tests.conftest import async_engine
+
+POOL_SIZE = 3
+HOT_STATEMENTS = 9
+PREPARED_STATEMENTS = text('SELECT count(*) FROM pg_prepared_statements')
+
+
+@pytest_asyncio.fixture
+async def pooled_engine() -> AsyncGenerator[AsyncEngine]:
+    engine = create_async_engine(
+        settings.db.test_async_url,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        connect_args={'server_settings': {'application_name': 'warm_up_test'}},
+    )
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def warm_up_test_backends() -> list[int]:
+    query = text("SELECT a.pid FROM pg_stat_activity a WHERE a.application_name = 'warm_up_test'")
+    async with async_engine.connect() as connection:
+        return list((await connection.execute(query)).scalars())
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestWarmUp:
+    async def test_warm_up_opens_pool_size_connections(self, pooled_engine: AsyncEngine) -> None:
+        await warm_up_connections(async_sessionmaker(pooled_engine), POOL_SIZE)
+
+        assert_that(pooled_engine.pool.checkedin(), equal_to(POOL_SIZE))  # ty:ignore[unresolved-attribute]
+        assert_that(len(await warm_up_test_backends()), equal_to(POOL_SIZE))
+
+    async def test_warm_up_prepares_hot_statements_on_every_connection(self, pooled_engine: AsyncEngine) -> None:
+        await warm_up_connections(async_sessionmaker(pooled_engine), POOL_SIZE)
+
+        for _ in range(POOL_SIZE):
+            async with pooled_engine.connect() as connection:
+                prepared = (await connection.execute(PREPARED_STATEMENTS)).scalar_one()
+                assert prepared > HOT_STATEMENTS
+
+    async def test_warm_up_without_connections_is_noop(self, pooled_engine: AsyncEngine) -> None:
+        await warm_up_connections(async_sessionmaker(pooled_engine), 0)
+
+        assert_that(pooled_engine.pool.checkedin(), equal_to(0))  # ty:ignore[unresolved-attribute]
+
+    async def test_warm_up_failed_connection_releases_the_others(self, pooled_engine: AsyncEngine) -> None:
+        unreachable_engine = create_async_engine(settings.db.test_async_url.set(port=1))
+        sessions = [async_sessionmaker(pooled_engine)] * (POOL_SIZE - 1) + [async_sessionmaker(unreachable_engine)]
+
+        def session_maker() -> AsyncSession:
+            return sessions.pop()()
+
+        try:
+            async with asyncio.timeout(10):
+                with pytest.raises(ConnectionRefusedError):
+                    await warm_up_connections(session_maker, POOL_SIZE)
+        finally:
+            await unreachable_engine.dispose()
+
+        assert_that(pooled_engine.pool.checkedin(), equal_to(POOL_SIZE - 1))  # ty:ignore[unresolved-attribute]
@@ -1,5 +1,12 @@
+from dataclasses import replace
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
 from hamcrest import assert_that
 from hamcrest import contains_exactly
+from hamcrest import contains_inanyorder
 from hamcrest import empty
 from hamcrest import equal_to
 from hamcrest import has_entries
@@ -13,11 +20,17 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain import Gift
+from dto.gifts import GiftSortField
+from dto.gifts import SortOrder
+from dto.gifts import WishlistQueryDTO
 from exceptions.database import NotFoundInDbError
 from repositories import GiftRepository
 from tests.integration_tests.conftest import GiftDict
 from tests.integration_tests.conftest import UserDict
 
+if TYPE_CHECKING:
+    from utils import SortValue
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
@@ -317,6 +330,76 @@ class TestGiftRepository:
     ) -> None:
         await gift_repository.delete_reservation(test_bob_gift_plane['id'])
 
+    async def test_repo_update_gift_matching_version(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        gift = await gift_repository.update(
+            test_bob_gift_plane['id'],
+            test_bob_gift_plane['user_id'],
+            {'name': 'Jet', 'note': None},
+            version=1,
+        )
+
+        assert_that(
+            gift,
+            has_properties(
+                id=test_bob_gift_plane['id'],
+                name='Jet',
+                note=none(),
+                url=test_bob_gift_plane['url'],
+                version=2,
+                is_reserved=False,
+            ),
+        )
+
+    async def test_repo_update_gift_stale_version_returns_none(
+        self,
+        db_session: AsyncSession,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        await gift_repository.update(test_bob_gift_plane['id'], test_bob_gift_plane['user_id'], {'name': 'Jet'}, 1)
+
+        result = await gift_repository.update(
+            test_bob_gift_plane['id'],
+            test_bob_gift_plane['user_id'],
+            {'name': 'Rocket'},
+            version=1,
+        )
+
+        assert_that(result, none())
+        query = await db_session.execute(
+            text('SELECT name, version FROM gifts WHERE id = :gift_id'),
+            {'gift_id': test_bob_gift_plane['id']},
+        )
+        assert_that(tuple(query.one()), equal_to(('Jet', 2)))
+
+    async def test_repo_update_gift_any_version(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        gift = await gift_repository.update(
+            test_bob_gift_plane['id'],
+            test_bob_gift_plane['user_id'],
+            {'wish_rate': 3},
+            version=None,
+        )
+
+        assert_that(gift, has_properties(wish_rate=3, version=2))
+
+    async def test_repo_update_gift_of_other_user_returns_none(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+        test_user_john: UserDict,
+    ) -> None:
+        result = await gift_repository.update(test_bob_gift_plane['id'], test_user_john['tg_id'], {'name': 'Jet'}, 1)
+
+        assert_that(result, none())
+
     async def test_repo_get_gifts_by_user_id_success(
         self,
         gift_repository: GiftRepository,
@@ -492,3 +575,363 @@ class TestGiftRepository:
                 ),
             ),
         )
+
+    async def test_repo_stream_gifts_by_user_id_yields_batches(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+        test_bob_gift_car: GiftDict,
+    ) -> None:
+        batches = [
+            batch
+            async for batch in gift_repository.stream_gifts_by_user_id(
+                test_bob_gift_plane['user_id'],
+                test_bob_gift_plane['user_id'],
+                batch_size=1,
+            )
+        ]
+
+        gift_ids: list[int] = [gift.id for batch in batches for gift in batch if gift.id is not None]
+        assert_that(batches, has_length(2))
+        assert_that(
+            gift_ids,
+            contains_inanyorder(test_bob_gift_plane['id'], test_bob_gift_car['id']),
+        )
+
+    async def test_repo_stream_gifts_by_user_id_empty(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        batches = [
+            batch
+            async for batch in gift_repository.stream_gifts_by_user_id(
+                test_user_bob['tg_id'],
+                test_user_bob['tg_id'],
+                batch_size=10,
+            )
+        ]
+
+        assert_that(batches, empty())
+
+    async def test_repo_stream_my_reservations_success(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_with_reservation_by_john: GiftDict,
+        test_user_john: UserDict,
+        test_user_bob: UserDict,
+    ) -> None:
+        batches = [
+            batch async for batch in gift_repository.stream_my_reservations(test_user_john['tg_id'], batch_size=10)
+        ]
+
+        assert_that(
+            batches,
+            contains_exactly(
+                contains_exactly(
+                    has_properties(
+                        id=equal_to(test_bob_gift_with_reservation_by_john['id']),
+                        reserved_by=equal_to(test_user_john['tg_id']),
+                        owner=has_properties(first_name=equal_to(test_user_bob['first_name'])),
+                    ),
+                ),
+            ),
+        )
+
+    async def test_repo_add_many_gifts_success(
+        self,
+        db_session: AsyncSession,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        gift_data: dict,
+    ) -> None:
+        gifts = [
+            Gift.create(
+                user_id=test_user_bob['tg_id'],
+                name=f'Gift {i}',
+                url=gift_data['url'],
+                wish_rate=gift_data['wish_rate'],
+                price=gift_data['price'],
+                note=gift_data['note'],
+            )
+            for i in range(5)
+        ]
+
+        added = await gift_repository.add_many(gifts, batch_size=2)
+
+        query = await db_session.execute(
+            text('SELECT name FROM gifts WHERE user_id = :user_id'),
+            {'user_id': test_user_bob['tg_id']},
+        )
+        assert_that(added, equal_to(5))
+        assert_that(query.scalars().all(), contains_inanyorder(*(gift.name for gift in gifts)))
+
+    async def test_repo_add_many_gifts_user_not_found(
+        self,
+        gift_repository: GiftRepository,
+        gift_data: dict,
+    ) -> None:
+        gifts = [Gift.create(**gift_data, user_id=123456)]
+
+        with pytest.raises(NotFoundInDbError, match='User with id=123456 not found'):
+            await gift_repository.add_many(gifts, batch_size=10)
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_add_reservations_only_friends_gifts(
+        self,
+        db_session: AsyncSession,
+        gift_repository: GiftRepository,
+        test_user_john: UserDict,
+        test_bob_gift_plane: GiftDict,
+        test_bob_gift_with_reservation_by_alice: GiftDict,
+    ) -> None:
+        added = await gift_repository.add_reservations(
+            [test_bob_gift_plane['id'], test_bob_gift_with_reservation_by_alice['id'], 999999],
+            test_user_john['tg_id'],
+        )
+
+        query = await db_session.execute(
+            text('SELECT gift_id FROM gift_reservations WHERE reserved_by_tg_id = :user_id'),
+            {'user_id': test_user_john['tg_id']},
+        )
+        assert_that(added, equal_to([test_bob_gift_plane['user_id']]))
+        assert_that(query.scalars().all(), contains_exactly(test_bob_gift_plane['id']))
+
+    async def test_repo_add_reservations_not_friend(
+        self,
+        gift_repository: GiftRepository,
+        test_user_john: UserDict,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        added = await gift_repository.add_reservations([test_bob_gift_plane['id']], test_user_john['tg_id'])
+
+        assert_that(added, equal_to([]))
+
+    @pytest.mark.usefixtures('test_user_with_friend', 'test_bob_gift_plane')
+    async def test_repo_get_friends_feed_only_friends_gifts(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        feed = await gift_repository.get_friends_feed(test_user_bob['tg_id'], limit=10, per_friend=5)
+
+        assert_that(
+            feed,
+            contains_exactly(
+                has_properties(
+                    id=equal_to(test_john_gift_yacht['id']),
+                    is_reserved=is_(False),
+                    owner=has_properties(first_name=equal_to(test_user_john['first_name'])),
+                ),
+            ),
+        )
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_get_friends_feed_per_friend_limit_and_keyset(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        gift_data: dict,
+    ) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        gifts = [
+            replace(Gift.create(**gift_data, user_id=test_user_john['tg_id']), created_at=base + timedelta(days=i))
+            for i in range(3)
+        ]
+        await gift_repository.add_many(gifts, batch_size=10)
+
+        first_page = await gift_repository.get_friends_feed(test_user_bob['tg_id'], limit=10, per_friend=2)
+        last = first_page[-1]
+        assert last.id is not None
+        second_page = await gift_repository.get_friends_feed(
+            test_user_bob['tg_id'],
+            limit=10,
+            per_friend=2,
+            before=(last.created_at, last.id),
+        )
+
+        assert_that(
+            [gift.created_at for gift in first_page],
+            contains_exactly(base + timedelta(days=2), base + timedelta(days=1)),
+        )
+        assert_that([gift.created_at for gift in second_page], contains_exactly(base))
+
+    @pytest.mark.usefixtures('test_john_gift_yacht')
+    async def test_repo_get_friends_feed_no_friends(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        feed = await gift_repository.get_friends_feed(test_user_bob['tg_id'], limit=10, per_friend=5)
+
+        assert_that(feed, empty())
+
+    @pytest.mark.usefixtures('test_user_with_friend', 'test_bob_gift_plane')
+    @pytest.mark.parametrize('query', ['Yacht', 'yac', 'big', 'YACHT big', 'yacht & !big:*'])
+    async def test_repo_search_matches_friends_gift_name_and_note(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        test_john_gift_yacht: GiftDict,
+        query: str,
+    ) -> None:
+        gifts = await gift_repository.search(test_user_bob['tg_id'], query, limit=10, offset=0)
+
+        assert_that(
+            gifts,
+            contains_exactly(
+                has_properties(
+                    id=equal_to(test_john_gift_yacht['id']),
+                    owner=has_properties(first_name=equal_to(test_user_john['first_name'])),
+                ),
+            ),
+        )
+
+    @pytest.mark.usefixtures('test_user_with_friend', 'test_bob_gift_plane', 'test_john_gift_yacht')
+    @pytest.mark.parametrize('query', ['plane', 'acht', 'yacht small', '&!'])
+    async def test_repo_search_no_match(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        query: str,
+    ) -> None:
+        gifts = await gift_repository.search(test_user_bob['tg_id'], query, limit=10, offset=0)
+
+        assert_that(gifts, empty())
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_search_ranks_and_paginates(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        gift_data: dict,
+    ) -> None:
+        gifts = [
+            Gift.create(
+                user_id=test_user_john['tg_id'],
+                name=name,
+                url=gift_data['url'],
+                wish_rate=gift_data['wish_rate'],
+                price=gift_data['price'],
+                note=None,
+            )
+            for name in ('Lego set', 'Lego Lego castle', 'Book')
+        ]
+        await gift_repository.add_many(gifts, batch_size=10)
+
+        first_page = await gift_repository.search(test_user_bob['tg_id'], 'lego', limit=1, offset=0)
+        second_page = await gift_repository.search(test_user_bob['tg_id'], 'lego', limit=1, offset=1)
+
+        assert_that([gift.name for gift in first_page + second_page], contains_exactly('Lego Lego castle', 'Lego set'))
+
+    async def _add_wishlist(self, gift_repository: GiftRepository, user_id: int, gift_data: dict) -> None:
+        gifts = [
+            Gift.create(
+                user_id=user_id,
+                name=name,
+                url=gift_data['url'],
+                wish_rate=wish_rate,
+                price=price,
+                note=gift_data['note'],
+            )
+            for name, wish_rate, price in (('Kite', 3, 500), ('Bike', 9, 20_000), ('Book', None, None), ('Lamp', 9, 80))
+        ]
+        await gift_repository.add_many(gifts, batch_size=10)
+
+    @pytest.mark.parametrize(
+        ('listing', 'names'),
+        [
+            (WishlistQueryDTO(GiftSortField.WISH_RATE), ['Lamp', 'Bike', 'Kite', 'Book']),
+            (WishlistQueryDTO(GiftSortField.PRICE, SortOrder.ASC), ['Book', 'Lamp', 'Kite', 'Bike']),
+            (WishlistQueryDTO(GiftSortField.PRICE, min_price=80, max_price=500), ['Kite', 'Lamp']),
+            (WishlistQueryDTO(GiftSortField.PRICE, min_wish_rate=5), ['Bike', 'Lamp']),
+        ],
+        ids=['wish_rate_desc', 'price_asc', 'price_range', 'min_wish_rate'],
+    )
+    async def test_repo_get_gifts_by_user_id_sorted_and_filtered(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        gift_data: dict,
+        listing: WishlistQueryDTO,
+        names: list[str],
+    ) -> None:
+        await self._add_wishlist(gift_repository, test_user_bob['tg_id'], gift_data)
+
+        result = await gift_repository.get_gifts_by_user_id(test_user_bob['tg_id'], test_user_bob['tg_id'], listing)
+
+        assert_that([gift.name for gift in result], contains_exactly(*names))
+
+    @pytest.mark.usefixtures('test_bob_gift_car')
+    @pytest.mark.parametrize(('reserved', 'name'), [(True, 'Plane'), (False, 'Car')])
+    async def test_repo_get_gifts_by_user_id_filtered_by_reservation(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_with_reservation_by_john: GiftDict,
+        reserved: bool,  # noqa: FBT001
+        name: str,
+    ) -> None:
+        user_id = test_bob_gift_with_reservation_by_john['user_id']
+
+        result = await gift_repository.get_gifts_by_user_id(user_id, user_id, WishlistQueryDTO(reserved=reserved))
+
+        assert_that([gift.name for gift in result], contains_exactly(name))
+
+    @pytest.mark.parametrize(
+        'listing',
+        [
+            WishlistQueryDTO(),
+            WishlistQueryDTO(GiftSortField.WISH_RATE, SortOrder.ASC),
+            WishlistQueryDTO(GiftSortField.PRICE),
+        ],
+        ids=['created_at', 'wish_rate', 'price'],
+    )
+    async def test_repo_get_gifts_by_user_id_keyset_pages(
+        self,
+        gift_repository: GiftRepository,
+        test_user_bob: UserDict,
+        gift_data: dict,
+        listing: WishlistQueryDTO,
+    ) -> None:
+        user_id = test_user_bob['tg_id']
+        await self._add_wishlist(gift_repository, user_id, gift_data)
+        everything = await gift_repository.get_gifts_by_user_id(user_id, user_id, listing)
+
+        pages: list[Gift] = []
+        after: tuple[SortValue, int] | None = None
+        while page := await gift_repository.get_gifts_by_user_id(user_id, user_id, listing, limit=3, after=after):
+            pages.extend(page)
+            last = page[-1]
+            assert last.id is not None
+            after = (listing.sort.key(last), last.id)
+
+        assert_that([gift.id for gift in pages], contains_exactly(*[gift.id for gift in everything]))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    @pytest.mark.parametrize(('viewer', 'visible'), [('bob', True), ('john', True), ('alice', False)])
+    async def test_repo_get_gifts_by_user_id_only_for_friends_or_owner(
+        self,
+        gift_repository: GiftRepository,
+        test_bob_gift_plane: GiftDict,
+        test_user_john: UserDict,
+        test_user_alice: UserDict,
+        viewer: str,
+        visible: bool,  # noqa: FBT001
+    ) -> None:
+        owner_id = test_bob_gift_plane['user_id']
+        viewer_id = {'bob': owner_id, 'john': test_user_john['tg_id'], 'alice': test_user_alice['tg_id']}[viewer]
+
+        result = await gift_repository.get_gifts_by_user_id(owner_id, viewer_id)
+        streamed = [
+            gift async for batch in gift_repository.stream_gifts_by_user_id(owner_id, viewer_id, 10) for gift in batch
+        ]
+
+        expected = [test_bob_gift_plane['id']] if visible else []
+        assert_that([gift.id for gift in result], equal_to(expected))
+        assert_that([gift.id for gift in streamed], equal_to(expected))
+        assert_that(await gift_repository.can_view_wishlist(owner_id, viewer_id), is_(visible))
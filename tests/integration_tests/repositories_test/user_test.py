@@ -14,10 +14,17 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain import User
+from domain.users import AccountDeletionStatus
+from domain.users import AccountDeletionStep
+from domain.users import FriendAction
 from dto.users import FriendRequestDTO
+from dto.users import FriendWithStatsDTO
+from dto.users import MutualFriendsDTO
+from dto.users import WishlistStatsDTO
 from exceptions.database import AlreadyExistsInDbError
 from exceptions.database import NotFoundInDbError
 from repositories import UserRepository
+from tests.integration_tests.conftest import GiftDict
 from tests.integration_tests.conftest import UserDict
 
 
@@ -45,6 +52,19 @@ class TestUserRepository:
             ),
         )
 
+    async def test_repo_get_many_users(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        users = await user_repository.get_many([test_user_bob['tg_id'], test_user_john['tg_id'], 999999])
+
+        assert_that(
+            [user.tg_id for user in users],
+            contains_inanyorder(test_user_bob['tg_id'], test_user_john['tg_id']),
+        )
+
     async def test_repo_get_user_not_found(
         self,
         user_repository: UserRepository,
@@ -334,6 +354,90 @@ class TestUserRepository:
             ),
         )
 
+    async def test_repo_apply_friend_request_sends_request(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        action = await user_repository.apply_friend_request(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        query = await db_session.execute(
+            text(
+                'SELECT status FROM friend_requests WHERE sender_tg_id = :sender_id AND receiver_tg_id = :receiver_id'
+            ),
+            {'sender_id': test_user_bob['tg_id'], 'receiver_id': test_user_john['tg_id']},
+        )
+        assert_that(action, equal_to(FriendAction.SEND_REQUEST))
+        assert_that(query.scalar_one(), equal_to('pending'))
+
+    @pytest.mark.usefixtures('test_user_with_incoming_request')
+    async def test_repo_apply_friend_request_accepts_reciprocal_request(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        action = await user_repository.apply_friend_request(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        requests = await db_session.execute(
+            text('SELECT sender_tg_id, status FROM friend_requests'),
+        )
+        friends = await db_session.execute(
+            text('SELECT user_tg_id, friend_tg_id FROM friends'),
+        )
+        assert_that(action, equal_to(FriendAction.ADD_FRIEND))
+        assert_that([tuple(row) for row in requests.all()], contains_exactly((test_user_john['tg_id'], 'accepted')))
+        assert_that(
+            [tuple(row) for row in friends.all()],
+            contains_inanyorder(
+                (test_user_bob['tg_id'], test_user_john['tg_id']),
+                (test_user_john['tg_id'], test_user_bob['tg_id']),
+            ),
+        )
+
+    @pytest.mark.usefixtures('test_user_with_outgoing_request')
+    async def test_repo_apply_friend_request_request_already_sent(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        before = (await db_session.execute(text('SELECT * FROM friend_requests'))).all()
+
+        action = await user_repository.apply_friend_request(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        after = (await db_session.execute(text('SELECT * FROM friend_requests'))).all()
+        assert_that(action, equal_to(FriendAction.REQUEST_ALREADY_SENT))
+        assert_that(after, equal_to(before))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_apply_friend_request_already_friends(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        before = (await db_session.execute(text('SELECT * FROM friend_requests'))).all()
+
+        action = await user_repository.apply_friend_request(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        after = (await db_session.execute(text('SELECT * FROM friend_requests'))).all()
+        assert_that(action, equal_to(FriendAction.ALREADY_FRIENDS))
+        assert_that(after, equal_to(before))
+
+    async def test_repo_apply_friend_request_receiver_not_found(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        with pytest.raises(NotFoundInDbError, match='User with id=999999 not found'):
+            await user_repository.apply_friend_request(test_user_bob['tg_id'], 999999)
+
     @pytest.mark.usefixtures('test_user_with_incoming_request')
     async def test_repo_get_pending_requests_success(
         self,
@@ -505,6 +609,29 @@ class TestUserRepository:
 
         assert rows == []
 
+    @pytest.mark.usefixtures('test_bob_gift_with_reservation_by_john')
+    async def test_repo_delete_friend_keeps_other_reservations(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        test_bob_gift_with_reservation_by_alice: GiftDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        await db_session.execute(
+            text('INSERT INTO gift_reservations (gift_id, reserved_by_tg_id) VALUES (:gift_id, :user_id)'),
+            {'gift_id': test_john_gift_yacht['id'], 'user_id': test_user_john['tg_id']},
+        )
+
+        await user_repository.delete_friend(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        query = await db_session.execute(text('SELECT gift_id FROM gift_reservations'))
+        assert_that(
+            query.scalars().all(),
+            contains_inanyorder(test_bob_gift_with_reservation_by_alice['id'], test_john_gift_yacht['id']),
+        )
+
     async def test_repo_delete_friend_empty_dont_raise(
         self,
         user_repository: UserRepository,
@@ -538,3 +665,326 @@ class TestUserRepository:
         rows = query.mappings().all()
 
         assert rows == []
+
+    async def test_repo_stream_friends_success(
+        self,
+        user_repository: UserRepository,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+    ) -> None:
+        batches = [batch async for batch in user_repository.stream_friends(test_user_with_friend, batch_size=10)]
+
+        assert batches == [[User(**test_user_john)]]
+
+    async def test_repo_stream_friends_no_friends(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        batches = [batch async for batch in user_repository.stream_friends(test_user_bob['tg_id'], batch_size=10)]
+
+        assert batches == []
+
+    @pytest.mark.usefixtures('test_user_alice')
+    @pytest.mark.parametrize('query', ['first_name_2', 'last_name_2', 'tg_username_2', 'name_2'])
+    async def test_repo_search_friends_success(
+        self,
+        user_repository: UserRepository,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+        query: str,
+    ) -> None:
+        result = await user_repository.search_friends(test_user_with_friend, query, limit=10, offset=0)
+
+        assert result == [User(**test_user_john)]
+
+    async def test_repo_search_friends_skips_non_friends(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_with_friend: int,
+        test_user_alice: UserDict,
+    ) -> None:
+        await db_session.execute(
+            text("UPDATE users SET first_name = 'Zelda' WHERE tg_id = :tg_id"), {'tg_id': test_user_alice['tg_id']}
+        )
+
+        result = await user_repository.search_friends(test_user_with_friend, 'Zelda', limit=10, offset=0)
+
+        assert result == []
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_get_friends_with_stats_counts_gifts(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        test_bob_gift_plane: GiftDict,
+        test_bob_gift_with_reservation_by_alice: GiftDict,
+    ) -> None:
+        result = await user_repository.get_friends_with_stats(test_user_john['tg_id'])
+
+        latest_gift_at = max(test_bob_gift_plane['created_at'], test_bob_gift_with_reservation_by_alice['created_at'])
+        assert result == [FriendWithStatsDTO(User(**test_user_bob), WishlistStatsDTO(2, 1, latest_gift_at))]
+
+    async def test_repo_get_friends_with_stats_latest_first_without_gifts_last(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+        test_user_alice: UserDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        await db_session.execute(
+            text('INSERT INTO friends (user_tg_id, friend_tg_id) VALUES (:user_id, :friend_id)'),
+            {'user_id': test_user_with_friend, 'friend_id': test_user_alice['tg_id']},
+        )
+
+        result = await user_repository.get_friends_with_stats(test_user_with_friend)
+
+        assert result == [
+            FriendWithStatsDTO(User(**test_user_john), WishlistStatsDTO(1, 1, test_john_gift_yacht['created_at'])),
+            FriendWithStatsDTO(User(**test_user_alice), WishlistStatsDTO(0, 0, None)),
+        ]
+
+    @pytest.mark.usefixtures('test_user_john')
+    async def test_repo_get_friends_with_stats_no_friends(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        result = await user_repository.get_friends_with_stats(test_user_bob['tg_id'])
+
+        assert result == []
+
+    async def test_repo_get_wishlist_stats(
+        self,
+        user_repository: UserRepository,
+        test_user_alice: UserDict,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        result = await user_repository.get_wishlist_stats([test_bob_gift_plane['user_id'], test_user_alice['tg_id']])
+
+        assert result == {
+            test_bob_gift_plane['user_id']: WishlistStatsDTO(1, 1, test_bob_gift_plane['created_at']),
+            test_user_alice['tg_id']: WishlistStatsDTO(0, 0, None),
+        }
+
+    async def test_repo_get_friend_suggestions_ranks_by_mutual_friends(
+        self,
+        user_repository: UserRepository,
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+
+        result = await user_repository.get_friend_suggestions(ids['bob'], 10, max_sources=10, max_per_source=10)
+
+        assert result == [MutualFriendsDTO(ids['alice'], 2), MutualFriendsDTO(ids['dave'], 1)]
+
+    async def test_repo_get_friend_suggestions_skips_self_and_friends(
+        self,
+        user_repository: UserRepository,
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+
+        result = await user_repository.get_friend_suggestions(ids['carol'], 10, max_sources=10, max_per_source=10)
+
+        assert result == [MutualFriendsDTO(ids['john'], 2)]
+
+    async def test_repo_get_friend_suggestions_respects_limits(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+        await db_session.execute(
+            text("""
+                UPDATE friends SET created_at = now() - interval '1 day'
+                WHERE user_tg_id = :user_id AND friend_tg_id = :friend_id
+            """),
+            {'user_id': ids['bob'], 'friend_id': ids['john']},
+        )
+
+        limited = await user_repository.get_friend_suggestions(ids['bob'], 1, max_sources=10, max_per_source=10)
+        latest_source = await user_repository.get_friend_suggestions(ids['bob'], 10, max_sources=1, max_per_source=10)
+
+        assert limited == [MutualFriendsDTO(ids['alice'], 2)]
+        assert latest_source == [MutualFriendsDTO(ids['alice'], 1)]
+
+    async def test_repo_get_friend_suggestions_no_friends(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        result = await user_repository.get_friend_suggestions(test_user_bob['tg_id'], 10, 10, 10)
+
+        assert result == []
+
+    async def test_repo_start_account_deletion_success(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        result = await user_repository.start_account_deletion(test_user_bob['tg_id'])
+
+        assert_that(
+            result,
+            has_properties(
+                user_tg_id=test_user_bob['tg_id'],
+                status=AccountDeletionStatus.RUNNING,
+                friend_requests_deleted=0,
+                friends_deleted=0,
+                reservations_deleted=0,
+                gifts_deleted=0,
+                finished_at=none(),
+            ),
+        )
+        assert await user_repository.get_account_deletion(test_user_bob['tg_id']) == result
+
+    async def test_repo_start_account_deletion_not_found(self, user_repository: UserRepository) -> None:
+        with pytest.raises(NotFoundInDbError):
+            await user_repository.start_account_deletion(999999)
+
+    @pytest.mark.usefixtures('test_bob_gift_plane', 'test_bob_gift_car')
+    async def test_repo_start_account_deletion_keeps_progress_of_stopped_deletion(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        user_id = test_user_bob['tg_id']
+        await user_repository.start_account_deletion(user_id)
+        await user_repository.delete_account_batch(user_id, AccountDeletionStep.GIFTS, 1)
+        await user_repository.finish_account_deletion(user_id, AccountDeletionStatus.FAILED)
+
+        result = await user_repository.start_account_deletion(user_id)
+
+        assert_that(result, has_properties(status=AccountDeletionStatus.RUNNING, gifts_deleted=1, finished_at=none()))
+
+    async def test_repo_resume_stopped_account_deletions_claims_only_stopped(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_bob['tg_id'])
+        await user_repository.start_account_deletion(test_user_john['tg_id'])
+        await user_repository.finish_account_deletion(test_user_bob['tg_id'], AccountDeletionStatus.STOPPED)
+        await user_repository.finish_account_deletion(test_user_john['tg_id'], AccountDeletionStatus.FAILED)
+
+        result = await user_repository.resume_stopped_account_deletions()
+
+        assert result == [test_user_bob['tg_id']]
+        assert await user_repository.resume_stopped_account_deletions() == []
+        deletion = await user_repository.get_account_deletion(test_user_bob['tg_id'])
+        assert_that(deletion, has_properties(status=AccountDeletionStatus.RUNNING, finished_at=none()))
+
+    async def test_repo_get_account_deletion_not_found(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        with pytest.raises(NotFoundInDbError):
+            await user_repository.get_account_deletion(test_user_bob['tg_id'])
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_delete_account_batch_friends(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_bob['tg_id'])
+
+        result = await user_repository.delete_account_batch(test_user_bob['tg_id'], AccountDeletionStep.FRIENDS, 10)
+
+        assert result == [test_user_john['tg_id']]
+        query = await db_session.execute(text('SELECT count(*) FROM friends'))
+        assert query.scalar_one() == 0
+        deletion = await user_repository.get_account_deletion(test_user_bob['tg_id'])
+        assert deletion.friends_deleted == 1
+
+    @pytest.mark.usefixtures('test_user_with_incoming_request')
+    async def test_repo_delete_account_batch_friend_requests(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_bob['tg_id'])
+
+        result = await user_repository.delete_account_batch(
+            test_user_bob['tg_id'],
+            AccountDeletionStep.FRIEND_REQUESTS,
+            10,
+        )
+
+        assert result == [test_user_john['tg_id']]
+        query = await db_session.execute(text('SELECT count(*) FROM friend_requests'))
+        assert query.scalar_one() == 0
+
+    async def test_repo_delete_account_batch_reservations_returns_gift_owners(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        test_bob_gift_with_reservation_by_john: GiftDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_john['tg_id'])
+
+        result = await user_repository.delete_account_batch(
+            test_user_john['tg_id'],
+            AccountDeletionStep.RESERVATIONS,
+            10,
+        )
+
+        assert result == [test_user_bob['tg_id']]
+        query = await db_session.execute(text('SELECT gift_id FROM gift_reservations'))
+        assert query.scalars().all() == []
+        query = await db_session.execute(
+            text('SELECT count(*) FROM gifts WHERE id = :gift_id'),
+            {'gift_id': test_bob_gift_with_reservation_by_john['id']},
+        )
+        assert query.scalar_one() == 1
+
+    @pytest.mark.usefixtures('test_bob_gift_plane', 'test_bob_gift_car')
+    async def test_repo_delete_account_batch_respects_limit(
+        self,
+        db_session: AsyncSession,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_bob['tg_id'])
+
+        first = await user_repository.delete_account_batch(test_user_bob['tg_id'], AccountDeletionStep.GIFTS, 1)
+        query = await db_session.execute(text('SELECT count(*) FROM gifts'))
+        remaining = query.scalar_one()
+        second = await user_repository.delete_account_batch(test_user_bob['tg_id'], AccountDeletionStep.GIFTS, 10)
+
+        assert len(first) == 1
+        assert remaining == 1
+        assert len(second) == 1
+        deletion = await user_repository.get_account_deletion(test_user_bob['tg_id'])
+        assert deletion.gifts_deleted == 2  # noqa: PLR2004
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_repo_finish_account_deletion_completed_deletes_user(
+        self,
+        user_repository: UserRepository,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        await user_repository.start_account_deletion(test_user_bob['tg_id'])
+
+        await user_repository.finish_account_deletion(test_user_bob['tg_id'], AccountDeletionStatus.COMPLETED)
+
+        with pytest.raises(NotFoundInDbError):
+            await user_repository.get(test_user_bob['tg_id'])
+        assert await user_repository.get_friends(test_user_john['tg_id']) == []
+        deletion = await user_repository.get_account_deletion(test_user_bob['tg_id'])
+        assert_that(deletion, has_properties(status=AccountDeletionStatus.COMPLETED, finished_at=instance_of(datetime)))
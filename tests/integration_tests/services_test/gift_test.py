@@ -1,7 +1,10 @@
+from collections.abc import AsyncIterator
+
 from hamcrest import assert_that
 from hamcrest import contains_exactly
 from hamcrest import empty
 from hamcrest import equal_to
+from hamcrest import has_entries
 from hamcrest import has_length
 from hamcrest import has_properties
 from hamcrest import is_
@@ -11,12 +14,28 @@ import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
+from domain import GiftChanges
+from dto.gifts import ArchiveRecord
+from dto.gifts import GiftArchiveRecord
+from dto.gifts import GiftSortField
+from dto.gifts import ReservationArchiveRecord
+from dto.gifts import SortOrder
+from dto.gifts import WishlistQueryDTO
+from dto.users import WishlistStatsDTO
 from exceptions.database import NotFoundInDbError
 from exceptions.http import BadRequestError
 from exceptions.http import ForbiddenError
+from exceptions.http import PreconditionFailedError
 from services import GiftService
 from tests.integration_tests.conftest import GiftDict
 from tests.integration_tests.conftest import UserDict
+from utils import StoreCache
+
+
+async def make_stream(*records: ArchiveRecord) -> AsyncIterator[ArchiveRecord]:
+    for record in records:
+        yield record
 
 
 @pytest.mark.integration
@@ -109,6 +128,67 @@ class TestGiftService:
         with pytest.raises(ForbiddenError):
             await gift_service.delete(test_bob_gift_plane['id'], 666666)
 
+    async def test_service_update_gift_success(
+        self,
+        gift_service: GiftService,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        gift = await gift_service.update(
+            test_bob_gift_plane['id'],
+            test_bob_gift_plane['user_id'],
+            {'price': 5},
+            version=1,
+        )
+
+        assert_that(gift, has_properties(price=5, name=test_bob_gift_plane['name'], version=2))
+
+    async def test_service_update_gift_conflict_raises_precondition_failed(
+        self,
+        gift_service: GiftService,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        await gift_service.update(test_bob_gift_plane['id'], test_bob_gift_plane['user_id'], {'name': 'Jet'}, 1)
+
+        with pytest.raises(PreconditionFailedError, match='current version is 2') as exc_info:
+            await gift_service.update(test_bob_gift_plane['id'], test_bob_gift_plane['user_id'], {'name': 'Car'}, 1)
+        headers = exc_info.value.headers
+        assert headers is not None
+        assert_that(headers, has_entries(ETag='"2"'))
+
+    async def test_service_update_gift_not_owner(
+        self,
+        gift_service: GiftService,
+        test_bob_gift_plane: GiftDict,
+    ) -> None:
+        with pytest.raises(ForbiddenError):
+            await gift_service.update(test_bob_gift_plane['id'], 666666, {'name': 'Jet'}, 1)
+
+    async def test_service_update_gift_not_exists_raise(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+    ) -> None:
+        with pytest.raises(NotFoundInDbError, match='Gift with id=123456 not found'):
+            await gift_service.update(123456, test_user_bob['tg_id'], {'name': 'Jet'}, 1)
+
+    @pytest.mark.parametrize(
+        ('changes', 'error_message'),
+        [
+            pytest.param({}, 'No fields to update', id='empty'),
+            pytest.param({'name': ' '}, 'Gift name cannot be empty', id='name'),
+            pytest.param({'wish_rate': 11}, 'Wish rate must be between', id='wish_rate'),
+        ],
+    )
+    async def test_service_update_gift_validation_error_raises_bad_request(
+        self,
+        gift_service: GiftService,
+        test_bob_gift_plane: GiftDict,
+        changes: GiftChanges,
+        error_message: str,
+    ) -> None:
+        with pytest.raises(BadRequestError, match=error_message):
+            await gift_service.update(test_bob_gift_plane['id'], test_bob_gift_plane['user_id'], changes, 1)
+
     @pytest.mark.usefixtures('test_user_with_friend')
     async def test_service_add_reservation_success(
         self,
@@ -294,7 +374,7 @@ class TestGiftService:
         )
 
         assert_that(
-            result,
+            result.gifts,
             contains_exactly(
                 has_properties(
                     id=equal_to(test_bob_gift_plane['id']),
@@ -320,7 +400,7 @@ class TestGiftService:
             test_user_bob['tg_id'],
         )
 
-        assert_that(result, empty())
+        assert_that(result.gifts, empty())
 
     async def test_service_get_gifts_by_user_id_with_reservation_owner_cannot_see_who(
         self,
@@ -334,7 +414,7 @@ class TestGiftService:
         )
 
         assert_that(
-            result,
+            result.gifts,
             contains_exactly(
                 has_properties(
                     id=equal_to(test_bob_gift_with_reservation_by_john['id']),
@@ -356,7 +436,7 @@ class TestGiftService:
         )
 
         assert_that(
-            result,
+            result.gifts,
             contains_exactly(
                 has_properties(
                     id=equal_to(test_bob_gift_with_reservation_by_john['id']),
@@ -458,3 +538,196 @@ class TestGiftService:
                 ),
             ),
         )
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_service_export_import_wishlist_round_trip(
+        self,
+        db_session: AsyncSession,
+        gift_service: GiftService,
+        test_user_john: UserDict,
+        test_bob_gift_plane: GiftDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        await gift_service.add_reservation(test_bob_gift_plane['id'], test_user_john['tg_id'])
+        records = [record async for batch in gift_service.export_wishlist(test_user_john['tg_id']) for record in batch]
+        await db_session.execute(
+            text('DELETE FROM gifts WHERE user_id = :user_id'), {'user_id': test_user_john['tg_id']}
+        )
+        await gift_service.delete_reservation(test_bob_gift_plane['id'], test_user_john['tg_id'])
+
+        result = await gift_service.import_wishlist(test_user_john['tg_id'], make_stream(*records))
+
+        john_gifts = await gift_service.get_gifts_by_user_id(test_user_john['tg_id'], test_user_john['tg_id'])
+        assert_that(result, has_entries(gifts=1, reservations=1))
+        assert_that(
+            john_gifts.gifts,
+            contains_exactly(
+                has_properties(
+                    name=equal_to(test_john_gift_yacht['name']),
+                    created_at=equal_to(test_john_gift_yacht['created_at']),
+                ),
+            ),
+        )
+        assert_that(await gift_service.get_my_reservations(test_user_john['tg_id']), has_length(1))
+
+    async def test_service_import_wishlist_invalid_record_writes_nothing(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        db_session: AsyncSession,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+    ) -> None:
+        monkeypatch.setattr(settings.db, 'write_batch_size', 1)
+        records = [GiftArchiveRecord('Book'), GiftArchiveRecord('Plane', wish_rate=11), ReservationArchiveRecord(1)]
+
+        with pytest.raises(BadRequestError, match='Record 2: Wish rate'):
+            await gift_service.import_wishlist(test_user_bob['tg_id'], make_stream(*records))
+
+        query = await db_session.execute(
+            text('SELECT COUNT(*) FROM gifts WHERE user_id = :user_id'),
+            {'user_id': test_user_bob['tg_id']},
+        )
+        assert_that(query.scalar_one(), equal_to(0))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_service_get_friends_feed_has_more(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        gift_data: dict,
+    ) -> None:
+        for _ in range(3):
+            await gift_service.add(**gift_data, current_user_id=test_user_john['tg_id'])
+
+        first_page = await gift_service.get_friends_feed(test_user_bob['tg_id'], limit=2, per_friend=5)
+        last = first_page.gifts[-1]
+        assert last.id is not None
+        second_page = await gift_service.get_friends_feed(
+            test_user_bob['tg_id'], limit=2, per_friend=5, before=(last.created_at, last.id)
+        )
+
+        assert_that(first_page, has_properties(gifts=has_length(2), has_more=is_(True)))
+        assert_that(second_page, has_properties(gifts=has_length(1), has_more=is_(False)))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_service_search_has_more(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+        gift_data: dict,
+    ) -> None:
+        for _ in range(3):
+            await gift_service.add(**gift_data, current_user_id=test_user_john['tg_id'])
+
+        first_page = await gift_service.search(test_user_bob['tg_id'], ' plane ', limit=2, offset=0)
+        second_page = await gift_service.search(test_user_bob['tg_id'], 'plane', limit=2, offset=2)
+
+        assert_that(first_page, has_properties(gifts=has_length(2), has_more=is_(True)))
+        assert_that(second_page, has_properties(gifts=has_length(1), has_more=is_(False)))
+
+    async def test_service_search_empty_query(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+    ) -> None:
+        with pytest.raises(BadRequestError, match='Search query is empty'):
+            await gift_service.search(test_user_bob['tg_id'], '   ', limit=10, offset=0)
+
+    async def test_service_get_gifts_by_user_id_has_more(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+        gift_data: dict,
+    ) -> None:
+        user_id = test_user_bob['tg_id']
+        for price in (30, 10, 20):
+            await gift_service.add(
+                current_user_id=user_id,
+                name=gift_data['name'],
+                url=gift_data['url'],
+                wish_rate=gift_data['wish_rate'],
+                price=price,
+                note=gift_data['note'],
+            )
+        listing = WishlistQueryDTO(GiftSortField.PRICE, SortOrder.ASC)
+
+        first_page = await gift_service.get_gifts_by_user_id(user_id, user_id, listing, limit=2)
+        last = first_page.gifts[-1]
+        assert last.id is not None
+        second_page = await gift_service.get_gifts_by_user_id(
+            user_id, user_id, listing, limit=2, after=(listing.sort.key(last), last.id)
+        )
+
+        assert_that(
+            first_page,
+            has_properties(
+                gifts=contains_exactly(has_properties(price=10), has_properties(price=20)),
+                has_more=is_(True),
+            ),
+        )
+        assert_that(second_page, has_properties(gifts=contains_exactly(has_properties(price=30)), has_more=is_(False)))
+
+    async def test_service_get_gifts_by_user_id_inverted_price_range(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+    ) -> None:
+        user_id = test_user_bob['tg_id']
+
+        with pytest.raises(BadRequestError, match='min_price cannot exceed max_price'):
+            await gift_service.get_gifts_by_user_id(user_id, user_id, WishlistQueryDTO(min_price=10, max_price=5))
+
+    @pytest.mark.usefixtures('test_bob_gift_plane')
+    async def test_service_get_gifts_by_user_id_not_friend(
+        self,
+        gift_service: GiftService,
+        test_user_bob: UserDict,
+        test_user_alice: UserDict,
+    ) -> None:
+        with pytest.raises(ForbiddenError, match='Not a friend or owner'):
+            await gift_service.get_gifts_by_user_id(test_user_bob['tg_id'], test_user_alice['tg_id'])
+
+    async def test_service_get_gifts_by_user_id_friend_with_empty_wishlist(
+        self,
+        gift_service: GiftService,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+    ) -> None:
+        result = await gift_service.get_gifts_by_user_id(test_user_john['tg_id'], test_user_with_friend)
+
+        assert_that(result, has_properties(gifts=empty(), has_more=is_(False)))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_service_add_reservation_invalidates_owner_wishlist_stats(
+        self,
+        db_session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        test_bob_gift_plane: GiftDict,
+        test_user_john: UserDict,
+    ) -> None:
+        owner_id = test_bob_gift_plane['user_id']
+        await wishlist_stats.set_many({owner_id: WishlistStatsDTO(1, 1, test_bob_gift_plane['created_at'])})
+        service = GiftService(db_session, wishlist_stats)
+
+        await service.add_reservation(test_bob_gift_plane['id'], test_user_john['tg_id'])
+
+        assert_that(await wishlist_stats.get_many([owner_id]), equal_to({}))
+
+    @pytest.mark.usefixtures('test_user_with_friend')
+    async def test_service_import_wishlist_invalidates_reserved_owners_wishlist_stats(
+        self,
+        db_session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        test_bob_gift_plane: GiftDict,
+        test_user_john: UserDict,
+    ) -> None:
+        owner_id = test_bob_gift_plane['user_id']
+        stats = WishlistStatsDTO(1, 1, test_bob_gift_plane['created_at'])
+        await wishlist_stats.set_many({owner_id: stats, test_user_john['tg_id']: WishlistStatsDTO(0, 0, None)})
+        records = [ReservationArchiveRecord(gift_id=test_bob_gift_plane['id'])]
+
+        await GiftService(db_session, wishlist_stats).import_wishlist(test_user_john['tg_id'], make_stream(*records))
+
+        assert_that(await wishlist_stats.get_many([owner_id, test_user_john['tg_id']]), equal_to({}))
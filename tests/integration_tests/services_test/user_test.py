@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 
 from hamcrest import all_of
@@ -7,20 +8,32 @@ from hamcrest import equal_to
 from hamcrest import has_entries
 from hamcrest import has_properties
 from hamcrest import instance_of
+from hamcrest import is_
 from hamcrest import none
 import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.security import TelegramInitData
 from core.security import TokenOut
 from domain import User
+from domain.users import AccountDeletionStatus
+from domain.users import AccountDeletionStep
 from dto.users import FriendRequestDTO
+from dto.users import FriendSuggestionDTO
+from dto.users import FriendWithStatsDTO
+from dto.users import MutualFriendsDTO
+from dto.users import WishlistStatsDTO
 from exceptions.database import AlreadyExistsInDbError
 from exceptions.database import NotFoundInDbError
 from exceptions.http import BadRequestError
+from repositories import UserRepository
+from services import GiftService
 from services import UserService
+from tests.integration_tests.conftest import GiftDict
 from tests.integration_tests.conftest import UserDict
+from utils import StoreCache
 
 
 @pytest.mark.integration
@@ -47,6 +60,21 @@ class TestUserService:
             ),
         )
 
+    async def test_service_get_many_users_keeps_requested_order(
+        self,
+        user_service: UserService,
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        users = await user_service.get_many(
+            [test_user_john['tg_id'], 999999, test_user_bob['tg_id'], test_user_john['tg_id']],
+        )
+
+        assert_that(
+            [user.tg_id for user in users],
+            contains_exactly(test_user_john['tg_id'], test_user_bob['tg_id']),
+        )
+
     async def test_service_get_user_not_found(
         self,
         user_service: UserService,
@@ -532,3 +560,277 @@ class TestUserService:
         result = await user_service.get_friends(test_user_bob['tg_id'])
 
         assert result == []
+
+    async def test_service_search_friends_success(
+        self,
+        user_service: UserService,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+    ) -> None:
+        result = await user_service.search_friends(test_user_with_friend, ' first_name_2 ', limit=10, offset=0)
+
+        assert_that(result, has_properties(users=equal_to([User(**test_user_john)]), has_more=is_(False)))
+
+    async def test_service_search_friends_empty_query(
+        self,
+        user_service: UserService,
+        test_user_bob: UserDict,
+    ) -> None:
+        with pytest.raises(BadRequestError, match='Search query is empty'):
+            await user_service.search_friends(test_user_bob['tg_id'], '   ', limit=10, offset=0)
+
+    async def test_service_get_friends_with_stats_success(
+        self,
+        user_service: UserService,
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        result = await user_service.get_friends_with_stats(test_user_with_friend)
+
+        assert result == [
+            FriendWithStatsDTO(User(**test_user_john), WishlistStatsDTO(1, 1, test_john_gift_yacht['created_at']))
+        ]
+
+    async def test_service_get_friends_with_stats_cached_until_gift_write(
+        self,
+        db_session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        test_user_with_friend: int,
+        test_user_john: UserDict,
+        test_john_gift_yacht: GiftDict,
+        gift_data: dict,
+    ) -> None:
+        user_service = UserService(db_session, wishlist_stats)
+        await user_service.get_friends_with_stats(test_user_with_friend)
+        await db_session.execute(text('DELETE FROM gifts WHERE id = :gift_id'), {'gift_id': test_john_gift_yacht['id']})
+
+        cached = await user_service.get_friends_with_stats(test_user_with_friend)
+        await GiftService(db_session, wishlist_stats).add(current_user_id=test_user_john['tg_id'], **gift_data)
+        fresh = await user_service.get_friends_with_stats(test_user_with_friend)
+
+        assert_that(cached, contains_exactly(has_properties(stats=has_properties(gift_count=1))))
+        assert_that(fresh, contains_exactly(has_properties(stats=has_properties(gift_count=1, unreserved_count=1))))
+        assert fresh[0].stats.latest_gift_at != test_john_gift_yacht['created_at']
+
+    async def test_service_get_friends_with_stats_cached_matches_uncached_order(
+        self,
+        db_session: AsyncSession,
+        user_service: UserService,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        test_user_with_friend: int,
+        test_user_alice: UserDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        await db_session.execute(
+            text('INSERT INTO friends (user_tg_id, friend_tg_id) VALUES (:user_id, :friend_id)'),
+            {'user_id': test_user_with_friend, 'friend_id': test_user_alice['tg_id']},
+        )
+
+        cached = await UserService(db_session, wishlist_stats).get_friends_with_stats(test_user_with_friend)
+
+        assert cached == await user_service.get_friends_with_stats(test_user_with_friend)
+        assert_that(
+            [friend.user.tg_id for friend in cached],
+            equal_to([test_john_gift_yacht['user_id'], test_user_alice['tg_id']]),
+        )
+
+    @pytest.mark.usefixtures('test_john_gift_with_reservation_by_bob')
+    async def test_service_delete_friend_invalidates_wishlist_stats(
+        self,
+        db_session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        user_service = UserService(db_session, wishlist_stats)
+        await user_service.get_friends_with_stats(test_user_bob['tg_id'])
+        await user_service.get_friends_with_stats(test_user_john['tg_id'])
+
+        await user_service.delete_friend(test_user_bob['tg_id'], test_user_john['tg_id'])
+
+        assert_that(await wishlist_stats.get_many([test_user_bob['tg_id'], test_user_john['tg_id']]), equal_to({}))
+
+    async def test_service_get_friend_suggestions_success(
+        self,
+        user_service: UserService,
+        test_friends_graph: dict[str, int],
+        test_user_alice: UserDict,
+    ) -> None:
+        result = await user_service.get_friend_suggestions(test_friends_graph['bob'], limit=1)
+
+        assert result == [FriendSuggestionDTO(User(**test_user_alice), 2)]
+
+    async def test_service_get_friend_suggestions_cached_until_friendship_changes(
+        self,
+        db_session: AsyncSession,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]],
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+        user_service = UserService(db_session, friend_suggestions=friend_suggestions)
+        await user_service.get_friend_suggestions(ids['bob'], limit=10)
+        await db_session.execute(
+            text('DELETE FROM friends WHERE user_tg_id = :user_id AND friend_tg_id = :friend_id'),
+            {'user_id': ids['john'], 'friend_id': ids['dave']},
+        )
+
+        cached = await user_service.get_friend_suggestions(ids['bob'], limit=10)
+        await user_service.send_friend_request(ids['alice'], ids['bob'])
+        await user_service.accept_friend_request(ids['bob'], ids['alice'])
+        fresh = await user_service.get_friend_suggestions(ids['bob'], limit=10)
+
+        assert_that([suggestion.user.tg_id for suggestion in cached], equal_to([ids['alice'], ids['dave']]))
+        assert fresh == []
+
+    async def test_service_delete_friend_invalidates_friend_suggestions(
+        self,
+        db_session: AsyncSession,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]],
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+        user_service = UserService(db_session, friend_suggestions=friend_suggestions)
+        await user_service.get_friend_suggestions(ids['bob'], limit=10)
+        await user_service.get_friend_suggestions(ids['john'], limit=10)
+
+        await user_service.delete_friend(ids['bob'], ids['john'])
+
+        assert_that(await friend_suggestions.get_many([ids['bob'], ids['john']]), equal_to({}))
+
+    async def test_service_send_friend_request_reciprocal_invalidates_friend_suggestions(
+        self,
+        db_session: AsyncSession,
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]],
+        test_friends_graph: dict[str, int],
+    ) -> None:
+        ids = test_friends_graph
+        user_service = UserService(db_session, friend_suggestions=friend_suggestions)
+        await user_service.send_friend_request(ids['alice'], ids['bob'])
+        await user_service.get_friend_suggestions(ids['bob'], limit=10)
+        await user_service.get_friend_suggestions(ids['alice'], limit=10)
+
+        await user_service.send_friend_request(ids['bob'], ids['alice'])
+
+        assert_that(await friend_suggestions.get_many([ids['bob'], ids['alice']]), equal_to({}))
+
+    @pytest.mark.usefixtures(
+        'test_bob_gift_plane',
+        'test_bob_gift_with_reservation_by_alice',
+        'test_john_gift_with_reservation_by_bob',
+    )
+    async def test_service_delete_account_deletes_everything_in_batches(
+        self,
+        db_session: AsyncSession,
+        user_service: UserService,
+        monkeypatch: pytest.MonkeyPatch,
+        test_user_bob: UserDict,
+        test_user_alice: UserDict,
+        test_john_gift_yacht: GiftDict,
+    ) -> None:
+        monkeypatch.setattr(settings.account_deletion, 'batch_size', 1)
+        await user_service.send_friend_request(test_user_bob['tg_id'], test_user_alice['tg_id'])
+        await user_service.start_account_deletion(test_user_bob['tg_id'])
+
+        await user_service.delete_account(test_user_bob['tg_id'])
+
+        deletion = await user_service.get_account_deletion(test_user_bob['tg_id'])
+        assert_that(
+            deletion,
+            has_properties(
+                status=AccountDeletionStatus.COMPLETED,
+                friend_requests_deleted=1,
+                friends_deleted=1,
+                reservations_deleted=1,
+                gifts_deleted=2,
+                finished_at=instance_of(datetime),
+            ),
+        )
+        with pytest.raises(NotFoundInDbError):
+            await user_service.get(test_user_bob['tg_id'])
+        gifts = await db_session.execute(text('SELECT id FROM gifts'))
+        reservations = await db_session.execute(text('SELECT count(*) FROM gift_reservations'))
+        assert_that(gifts.scalars().all(), equal_to([test_john_gift_yacht['id']]))
+        assert reservations.scalar_one() == 0
+
+    @pytest.mark.usefixtures('test_john_gift_with_reservation_by_bob')
+    async def test_service_delete_account_invalidates_caches(
+        self,
+        db_session: AsyncSession,
+        wishlist_stats: StoreCache[WishlistStatsDTO],
+        friend_suggestions: StoreCache[list[MutualFriendsDTO]],
+        test_user_bob: UserDict,
+        test_user_john: UserDict,
+    ) -> None:
+        user_service = UserService(db_session, wishlist_stats, friend_suggestions)
+        ids = [test_user_bob['tg_id'], test_user_john['tg_id']]
+        for user_id in ids:
+            await user_service.get_friends_with_stats(user_id)
+            await user_service.get_friend_suggestions(user_id, limit=10)
+        await user_service.start_account_deletion(test_user_bob['tg_id'])
+
+        await user_service.delete_account(test_user_bob['tg_id'])
+
+        assert_that(await wishlist_stats.get_many(ids), equal_to({}))
+        assert_that(await friend_suggestions.get_many(ids), equal_to({}))
+
+    async def test_service_delete_account_records_failure(
+        self,
+        user_service: UserService,
+        monkeypatch: pytest.MonkeyPatch,
+        test_user_bob: UserDict,
+    ) -> None:
+        async def fail(*_: object) -> list[int]:
+            raise RuntimeError('boom')
+
+        await user_service.start_account_deletion(test_user_bob['tg_id'])
+        monkeypatch.setattr(UserRepository, 'delete_account_batch', fail)
+
+        with pytest.raises(RuntimeError):
+            await user_service.delete_account(test_user_bob['tg_id'])
+
+        deletion = await user_service.get_account_deletion(test_user_bob['tg_id'])
+        assert deletion.status == AccountDeletionStatus.FAILED
+        assert await user_service.get(test_user_bob['tg_id']) == User(**test_user_bob)
+
+    @pytest.mark.usefixtures('test_bob_gift_plane', 'test_bob_gift_car')
+    async def test_service_delete_account_cancelled_is_stopped_and_resumed(
+        self,
+        user_service: UserService,
+        monkeypatch: pytest.MonkeyPatch,
+        test_user_bob: UserDict,
+    ) -> None:
+        user_id = test_user_bob['tg_id']
+        delete_account_batch = UserRepository.delete_account_batch
+        stalled = asyncio.Event()
+
+        async def stall_after_first_batch(
+            repository: UserRepository, deleted_user_id: int, step: AccountDeletionStep, limit: int
+        ) -> list[int]:
+            deletion = await repository.get_account_deletion(deleted_user_id)
+            if deletion.gifts_deleted:
+                stalled.set()
+                await asyncio.Event().wait()
+            return await delete_account_batch(repository, deleted_user_id, step, limit)
+
+        monkeypatch.setattr(settings.account_deletion, 'batch_size', 1)
+        await user_service.start_account_deletion(user_id)
+        monkeypatch.setattr(UserRepository, 'delete_account_batch', stall_after_first_batch)
+        job = asyncio.create_task(user_service.delete_account(user_id))
+        await stalled.wait()
+        job.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await job
+
+        deletion = await user_service.get_account_deletion(user_id)
+        assert_that(deletion, has_properties(status=AccountDeletionStatus.STOPPED, gifts_deleted=1))
+        assert await user_service.resume_account_deletions() == [user_id]
+        monkeypatch.setattr(UserRepository, 'delete_account_batch', delete_account_batch)
+        await user_service.delete_account(user_id)
+        deletion = await user_service.get_account_deletion(user_id)
+        assert_that(deletion, has_properties(status=AccountDeletionStatus.COMPLETED, gifts_deleted=2))
+
+    async def test_service_start_account_deletion_not_found(self, user_service: UserService) -> None:
+        with pytest.raises(NotFoundInDbError):
+            await user_service.start_account_deletion(999999)
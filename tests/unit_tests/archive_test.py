@@ -0,0 +1,111 @@
+from collections.abc import AsyncIterator
+from datetime import UTC
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from dto.gifts import ArchiveRecord
+from dto.gifts import GiftArchiveRecord
+from dto.gifts import ReservationArchiveRecord
+from exceptions.http import BadRequestError
+from utils import ArchiveFormat
+from utils import batch_records
+from utils import decode_archive
+from utils import encode_archive
+
+NOW = datetime.now(UTC)
+RECORDS: list[ArchiveRecord] = [
+    GiftArchiveRecord('Plane', 'https://www.google.com/', 10, Decimal('1000000.00'), 'white', NOW),
+    GiftArchiveRecord('Book'),
+    ReservationArchiveRecord(gift_id=42, owner_id=123457, name='Bike'),
+]
+
+
+async def make_chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def make_records(*records: ArchiveRecord) -> AsyncIterator[ArchiveRecord]:
+    for record in records:
+        yield record
+
+
+async def make_batches(*batches: list[ArchiveRecord]) -> AsyncIterator[list[ArchiveRecord]]:
+    for batch in batches:
+        yield batch
+
+
+async def encode(archive_format: ArchiveFormat) -> bytes:
+    return b''.join([
+        chunk async for chunk in encode_archive(make_batches(RECORDS[:2], [], RECORDS[2:]), archive_format)
+    ])
+
+
+async def decode(archive_format: ArchiveFormat, *chunks: bytes) -> list[ArchiveRecord]:
+    return [record async for record in decode_archive(make_chunks(*chunks), archive_format)]
+
+
+@pytest.mark.unit
+class TestArchive:
+    @pytest.mark.parametrize('archive_format', list(ArchiveFormat))
+    async def test_archive_round_trip(self, archive_format: ArchiveFormat) -> None:
+        body = await encode(archive_format)
+
+        assert await decode(archive_format, body) == RECORDS
+
+    @pytest.mark.parametrize('archive_format', list(ArchiveFormat))
+    @pytest.mark.parametrize('chunk_size', [1, 3, 17])
+    async def test_archive_decodes_arbitrary_chunks(self, archive_format: ArchiveFormat, chunk_size: int) -> None:
+        body = await encode(archive_format)
+        chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+        assert await decode(archive_format, *chunks) == RECORDS
+
+    async def test_archive_batch_records(self) -> None:
+        batches = [batch async for batch in batch_records(make_records(*RECORDS), 2)]
+
+        assert batches == [RECORDS[:2], RECORDS[2:]]
+
+    async def test_archive_ndjson_ignores_blank_lines(self) -> None:
+        body = b'{"type":"gift","name":"Book"}\n\n{"type":"reservation","gift_id":1}\n\n'
+
+        assert await decode(ArchiveFormat.NDJSON, body) == [GiftArchiveRecord('Book'), ReservationArchiveRecord(1)]
+
+    async def test_archive_msgpack_incomplete_frame(self) -> None:
+        body = await encode(ArchiveFormat.MSGPACK)
+
+        with pytest.raises(BadRequestError, match='incomplete record'):
+            await decode(ArchiveFormat.MSGPACK, body[:-1])
+
+    @pytest.mark.parametrize(
+        'body',
+        [
+            b'{"type":"gift"}\n',
+            b'{"type":"unknown","name":"Book"}\n',
+            b'{"type":"gift","name":"Book","wish_rate":"high"}\n',
+            b'not json\n',
+        ],
+        ids=['missing_name', 'unknown_type', 'wrong_type', 'malformed'],
+    )
+    async def test_archive_invalid_record(self, body: bytes) -> None:
+        with pytest.raises(BadRequestError, match='Invalid archive record'):
+            await decode(ArchiveFormat.NDJSON, body)
+
+    @pytest.mark.parametrize(
+        ('media_type', 'expected'),
+        [
+            ('application/x-ndjson', ArchiveFormat.NDJSON),
+            ('application/jsonl', ArchiveFormat.NDJSON),
+            ('application/vnd.msgpack', ArchiveFormat.MSGPACK),
+            ('application/x-msgpack', ArchiveFormat.MSGPACK),
+        ],
+    )
+    def test_archive_format_from_media_type(self, media_type: str, expected: ArchiveFormat) -> None:
+        assert ArchiveFormat.from_media_type(media_type) is expected
+
+    @pytest.mark.parametrize('media_type', ['application/json', ''])
+    def test_archive_format_from_unsupported_media_type(self, media_type: str) -> None:
+        with pytest.raises(BadRequestError, match='Unsupported archive content type'):
+            ArchiveFormat.from_media_type(media_type)
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from utils import BackgroundJobs
+
+
+class Job:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError('boom')
+
+
+async def settle() -> None:
+    """Let started jobs run to completion and their done callbacks fire."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestBackgroundJobs:
+    async def test_background_jobs_run_one_job_per_key(self) -> None:
+        jobs: BackgroundJobs[int] = BackgroundJobs()
+        job = Job()
+
+        assert jobs.start(1, job)
+        assert not jobs.start(1, job)
+        assert jobs.start(2, job)
+        await asyncio.sleep(0)
+        job.release.set()
+        await settle()
+
+        assert job.calls == 2  # noqa: PLR2004
+        assert not jobs.running(1)
+        assert not jobs.running(2)
+
+    async def test_background_jobs_start_again_after_failure(self) -> None:
+        jobs: BackgroundJobs[int] = BackgroundJobs()
+        job = Job()
+        job.fail = True
+        job.release.set()
+
+        jobs.start(1, job)
+        await settle()
+
+        assert not jobs.running(1)
+        assert jobs.start(1, job)
+
+    async def test_background_jobs_cancel_all(self) -> None:
+        jobs: BackgroundJobs[int] = BackgroundJobs()
+        job = Job()
+        jobs.start(1, job)
+        await asyncio.sleep(0)
+
+        await jobs.cancel_all()
+
+        assert not jobs.running(1)
+        assert job.calls == 1
@@ -0,0 +1,67 @@
+from datetime import UTC
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from domain import Gift
+from dto.gifts import GiftSortField
+from exceptions.http import BadRequestError
+from utils import SortValue
+from utils import decode_cursor
+from utils import encode_cursor
+
+
+@pytest.mark.unit
+class TestCursor:
+    def test_cursor_round_trip(self) -> None:
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=UTC)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    @pytest.mark.parametrize(
+        ('value', 'value_type'),
+        [(7, int), (Decimal('1999.90'), Decimal), (datetime(2026, 3, 1, tzinfo=UTC), datetime)],
+        ids=['int', 'decimal', 'datetime'],
+    )
+    def test_cursor_round_trip_sort_value(self, value: SortValue, value_type: type[SortValue]) -> None:
+        cursor = encode_cursor(value, 42)
+
+        assert decode_cursor(cursor, value_type) == (value, 42)
+
+    def test_cursor_of_other_sort_is_invalid(self) -> None:
+        cursor = encode_cursor(datetime.now(UTC), 1)
+
+        with pytest.raises(BadRequestError, match='Invalid cursor'):
+            decode_cursor(cursor, int)
+
+    def test_cursor_is_url_safe(self) -> None:
+        cursor = encode_cursor(datetime.now(UTC), 2**62)
+
+        assert cursor.isascii()
+        assert not set(cursor) & set('+/=&?')
+
+    @pytest.mark.parametrize(
+        'cursor',
+        ['!!!', 'bm90IGpzb24', encode_cursor(datetime.now(UTC), 1)[:-4]],
+        ids=['not_base64', 'not_json', 'truncated'],
+    )
+    def test_cursor_invalid(self, cursor: str) -> None:
+        with pytest.raises(BadRequestError, match='Invalid cursor'):
+            decode_cursor(cursor)
+
+
+@pytest.mark.unit
+class TestGiftSortField:
+    @pytest.mark.parametrize(
+        ('field', 'key'),
+        [(GiftSortField.WISH_RATE, 0), (GiftSortField.PRICE, Decimal(0))],
+        ids=['wish_rate', 'price'],
+    )
+    def test_gift_sort_field_key_of_missing_value_is_zero(self, field: GiftSortField, key: int | Decimal) -> None:
+        gift = Gift.create(user_id=1, name='Book', url=None, wish_rate=None, price=None, note=None)
+
+        assert field.key(gift) == key
+        assert isinstance(field.key(gift), field.value_type)
@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Sequence
+
+import pytest
+
+from utils import DataLoader
+
+
+class FakeSource:
+    def __init__(self, values: dict[int, str]) -> None:
+        self.values = values
+        self.calls: list[list[int]] = []
+        self.fail = False
+
+    async def batch_load(self, keys: Sequence[int]) -> dict[int, str]:
+        self.calls.append(list(keys))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError('boom')
+        return {key: self.values[key] for key in keys if key in self.values}
+
+
+@pytest.mark.unit
+class TestDataLoader:
+    async def test_dataloader_coalesces_concurrent_loads(self) -> None:
+        source = FakeSource({1: 'one', 2: 'two', 3: 'three'})
+        loader = DataLoader(source.batch_load)
+
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(4))
+
+        assert results == ['one', 'two', 'one', None]
+        assert source.calls == [[1, 2, 4]]
+
+    async def test_dataloader_load_many_preserves_order(self) -> None:
+        source = FakeSource({1: 'one', 2: 'two', 3: 'three'})
+        loader = DataLoader(source.batch_load)
+
+        assert await loader.load_many([3, 1, 2]) == ['three', 'one', 'two']
+        assert source.calls == [[3, 1, 2]]
+
+    async def test_dataloader_caches_results(self) -> None:
+        source = FakeSource({1: 'one', 2: 'two'})
+        loader = DataLoader(source.batch_load)
+
+        await loader.load(1)
+        await loader.load_many([1, 2])
+
+        assert source.calls == [[1], [2]]
+
+    async def test_dataloader_serializes_batches(self) -> None:
+        active = 0
+        max_active = 0
+
+        async def batch_load(keys: Sequence[int]) -> dict[int, int]:
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        first = asyncio.create_task(loader.load(1))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(loader.load(2))
+
+        assert await asyncio.gather(first, second) == [1, 2]
+        assert max_active == 1
+
+    async def test_dataloader_failure_propagates_and_is_not_cached(self) -> None:
+        source = FakeSource({1: 'one'})
+        loader = DataLoader(source.batch_load)
+        source.fail = True
+
+        with pytest.raises(RuntimeError, match='boom'):
+            await asyncio.gather(loader.load(1), loader.load(2))
+
+        source.fail = False
+        assert await loader.load(1) == 'one'
+        assert source.calls == [[1, 2], [1]]
+
+    async def test_dataloader_prime_and_clear(self) -> None:
+        source = FakeSource({1: 'one'})
+        loader = DataLoader(source.batch_load)
+
+        loader.prime(1, 'primed')
+        assert await loader.load(1) == 'primed'
+
+        loader.clear(1)
+        assert await loader.load(1) == 'one'
+        assert source.calls == [[1]]
@@ -5,6 +5,7 @@ from datetime import datetime
 import pytest
 
 from domain import Gift
+from domain import GiftChanges
 
 
 @pytest.mark.unit
@@ -61,6 +62,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': datetime.now(UTC),
             'updated_at': datetime.now(UTC),
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         gift2 = Gift(**{
             **gift_data,
@@ -70,6 +72,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': datetime.now(UTC),
             'updated_at': datetime.now(UTC),
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         assert gift1 == gift2
 
@@ -82,6 +85,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         gift2 = Gift(**{
             **gift_data,
@@ -90,6 +94,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         assert gift1 != gift2
 
@@ -102,6 +107,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         assert gift != 'not a gift'
 
@@ -114,6 +120,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         gift2 = Gift(**{
             **gift_data,
@@ -123,6 +130,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         assert hash(gift1) == hash(gift2)
 
@@ -135,6 +143,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         gift2 = Gift(**{
             **gift_data,
@@ -143,6 +152,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         gift3 = Gift(**{
             **gift_data,
@@ -151,6 +161,7 @@ class TestUserDomain:
             'reserved_by': None,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
         assert len({gift1, gift2, gift3}) == 2  # noqa: PLR2004
 
@@ -192,6 +203,7 @@ class TestUserDomain:
             'reserved_by': reserved_by,
             'created_at': now,
             'updated_at': now,
+            'version': 1,
         })  # ty:ignore[invalid-argument-type]
 
         assert gift.can_delete_reservation(who_try) is result
@@ -312,3 +324,31 @@ class TestUserDomain:
     def test_gift_domain_create_allows_valid_price(self, gift_data: dict, price: int | None) -> None:
         gift = Gift.create(**{**gift_data, 'price': price})  # ty:ignore[invalid-argument-type]
         assert gift.price == price
+
+    def test_gift_domain_create_sets_initial_version(self, gift_data: dict) -> None:
+        gift = Gift.create(**gift_data)
+        assert gift.version == 1
+
+    @pytest.mark.parametrize(
+        ('changes', 'error_message'),
+        [
+            pytest.param({'name': ''}, 'Gift name cannot be empty', id='empty_name'),
+            pytest.param({'url': 'ftp://example.com'}, 'URL must be a valid HTTP/HTTPS URL', id='invalid_url'),
+            pytest.param({'wish_rate': 0}, 'Wish rate must be between 1 and 10, got: 0', id='wish_rate_too_low'),
+            pytest.param({'price': -1}, 'Price must be non-negative, got: -1', id='negative_price'),
+        ],
+    )
+    def test_gift_domain_validate_changes_rejects_invalid(self, changes: GiftChanges, error_message: str) -> None:
+        with pytest.raises(ValueError, match=error_message):
+            Gift.validate_changes(changes)
+
+    @pytest.mark.parametrize(
+        'changes',
+        [
+            pytest.param({}, id='no_changes'),
+            pytest.param({'url': None, 'wish_rate': None, 'price': None, 'note': None}, id='clear_optional_fields'),
+            pytest.param({'name': 'Jet', 'wish_rate': 10, 'price': 0}, id='valid_values'),
+        ],
+    )
+    def test_gift_domain_validate_changes_accepts_valid(self, changes: GiftChanges) -> None:
+        Gift.validate_changes(changes)
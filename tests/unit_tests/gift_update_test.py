@@ -0,0 +1,44 @@
+from hamcrest import assert_that
+from hamcrest import equal_to
+import msgspec
+import pytest
+
+from dto.gifts import GiftUpdateDTO
+from exceptions.http import PreconditionFailedError
+from exceptions.http import PreconditionRequiredError
+from utils import parse_if_match
+from utils import version_etag
+
+
+@pytest.mark.unit
+class TestGiftUpdate:
+    def test_gift_update_dto_changes_only_include_sent_fields(self) -> None:
+        data = msgspec.json.decode(b'{"name": "Jet", "url": null}', type=GiftUpdateDTO)
+
+        assert_that(data.changes(), equal_to({'name': 'Jet', 'url': None}))
+
+    @pytest.mark.parametrize(
+        'body',
+        [
+            pytest.param(b'{"name": null}', id='null_name'),
+            pytest.param(b'{"version": 2}', id='unknown_field'),
+        ],
+    )
+    def test_gift_update_dto_rejects_invalid_body(self, body: bytes) -> None:
+        with pytest.raises(msgspec.ValidationError):
+            msgspec.json.decode(body, type=GiftUpdateDTO)
+
+    def test_gift_update_etag_round_trip(self) -> None:
+        assert_that(parse_if_match(version_etag(7)), equal_to(7))
+
+    def test_gift_update_if_match_any(self) -> None:
+        assert_that(parse_if_match(' * '), equal_to(None))
+
+    def test_gift_update_if_match_required(self) -> None:
+        with pytest.raises(PreconditionRequiredError):
+            parse_if_match(None)
+
+    @pytest.mark.parametrize('header', ['7', 'W/"7"', '"seven"', '"1", "2"'])
+    def test_gift_update_if_match_unknown_tag_fails(self, header: str) -> None:
+        with pytest.raises(PreconditionFailedError):
+            parse_if_match(header)
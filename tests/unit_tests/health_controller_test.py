@@ -0,0 +1,40 @@
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from litestar.datastructures import State
+from litestar.status_codes import HTTP_200_OK
+from litestar.status_codes import HTTP_503_SERVICE_UNAVAILABLE
+from litestar.testing import create_test_client
+import pytest
+
+from controllers import HealthController
+
+
+@pytest.mark.unit
+class TestHealthController:
+    def test_health_controller_live(self) -> None:
+        with create_test_client(route_handlers=[HealthController]) as client:
+            response = client.get('/health/live')
+
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_health_controller_not_ready_before_warm_up(self) -> None:
+        with create_test_client(route_handlers=[HealthController], state=State({'ready': False})) as client:
+            response = client.get('/health/ready')
+
+        assert_that(response.status_code, equal_to(HTTP_503_SERVICE_UNAVAILABLE))
+        assert_that(response.json(), has_entries(status='warming up'))
+
+    def test_health_controller_ready_after_warm_up(self) -> None:
+        async def warm_up(app: object) -> None:
+            app.state.ready = True  # ty:ignore[unresolved-attribute]
+
+        with create_test_client(
+            route_handlers=[HealthController],
+            state=State({'ready': False}),
+            on_startup=[warm_up],
+        ) as client:
+            response = client.get('/health/ready')
+
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+        assert_that(response.json(), has_entries(status='ready'))
@@ -0,0 +1,212 @@
+import asyncio
+
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from litestar import Litestar
+from litestar import post
+from litestar.di import Provide
+from litestar.status_codes import HTTP_201_CREATED
+from litestar.status_codes import HTTP_400_BAD_REQUEST
+from litestar.status_codes import HTTP_422_UNPROCESSABLE_ENTITY
+from litestar.testing import TestClient
+from litestar.testing import create_test_client
+import pytest
+
+from dependencies import provide_idempotency
+from dependencies.provide_idempotency import IDEMPOTENCY_STORE
+from exceptions.handlers import get_exception_handlers
+from exceptions.http import UnprocessableEntityError
+from utils import BoundedMemoryStore
+from utils import IdempotentRequest
+from utils import SingleFlight
+
+TTL = 60
+
+
+class Write:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail = False
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError('boom')
+        return self.calls
+
+
+def make_request(store: BoundedMemoryStore, key: str | None = 'key', fingerprint: str = 'a') -> IdempotentRequest:
+    return IdempotentRequest(store, SingleFlight(), key, fingerprint, TTL)
+
+
+@pytest.mark.unit
+class TestBoundedMemoryStore:
+    async def test_bounded_memory_store_evicts_oldest_key(self) -> None:
+        store = BoundedMemoryStore(max_entries=2)
+
+        await store.set('a', b'1')
+        await store.set('b', b'2')
+        await store.set('a', b'3')
+        await store.set('c', b'4')
+
+        assert_that(len(store), equal_to(2))
+        assert_that(await store.get('b'), equal_to(None))
+        assert_that(await store.get('a'), equal_to(b'3'))
+        assert_that(await store.get('c'), equal_to(b'4'))
+
+
+@pytest.mark.unit
+class TestIdempotentRequest:
+    async def test_idempotent_request_replays_stored_result(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        write = Write()
+
+        first = await make_request(store).run(write, int)
+        second = await make_request(store).run(write, int)
+
+        assert_that(first, equal_to(1))
+        assert_that(second, equal_to(1))
+        assert_that(write.calls, equal_to(1))
+
+    async def test_idempotent_request_without_key_always_runs(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        write = Write()
+
+        await make_request(store, key=None).run(write, int)
+        await make_request(store, key=None).run(write, int)
+
+        assert_that(write.calls, equal_to(2))
+        assert_that(len(store), equal_to(0))
+
+    async def test_idempotent_request_rejects_key_reused_for_other_request(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        write = Write()
+        await make_request(store).run(write, int)
+
+        other = make_request(store, fingerprint='b')
+
+        with pytest.raises(UnprocessableEntityError):
+            await other.run(write, int)
+        assert_that(write.calls, equal_to(1))
+
+    async def test_idempotent_request_concurrent_duplicates_wait_for_first(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        flights = SingleFlight()
+        write = Write()
+        write.release.clear()
+
+        callers = [
+            asyncio.create_task(IdempotentRequest(store, flights, 'key', 'a', TTL).run(write, int)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        write.release.set()
+
+        assert_that(await asyncio.gather(*callers), equal_to([1, 1, 1]))
+        assert_that(write.calls, equal_to(1))
+
+    async def test_idempotent_request_concurrent_other_request_is_rejected(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        flights = SingleFlight()
+        write = Write()
+        write.release.clear()
+
+        first = asyncio.create_task(IdempotentRequest(store, flights, 'key', 'a', TTL).run(write, int))
+        other = asyncio.create_task(IdempotentRequest(store, flights, 'key', 'b', TTL).run(write, int))
+        await asyncio.sleep(0)
+        write.release.set()
+
+        assert_that(await first, equal_to(1))
+        with pytest.raises(UnprocessableEntityError):
+            await other
+        assert_that(write.calls, equal_to(1))
+
+    async def test_idempotent_request_does_not_store_failures(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        write = Write()
+        write.fail = True
+
+        with pytest.raises(RuntimeError):
+            await make_request(store).run(write, int)
+        write.fail = False
+
+        assert_that(await make_request(store).run(write, int), equal_to(2))
+
+    async def test_idempotent_request_replays_none(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        calls = []
+
+        async def write() -> None:
+            calls.append(1)
+
+        await make_request(store).run(write, type(None))
+        await make_request(store).run(write, type(None))
+
+        assert_that(calls, equal_to([1]))
+
+    def test_idempotent_request_fingerprint_separates_parts(self) -> None:
+        assert_that(IdempotentRequest.fingerprint('ab', 'c'), equal_to(IdempotentRequest.fingerprint('ab', 'c')))
+        assert IdempotentRequest.fingerprint('ab', 'c') != IdempotentRequest.fingerprint('a', 'bc')
+
+
+created: list[dict] = []
+
+
+@post('/items', dependencies={'current_user_id': Provide(lambda: 1, sync_to_thread=False)})
+async def create_item(data: dict, idempotency: IdempotentRequest) -> dict[str, int]:
+    async def write() -> int:
+        created.append(data)
+        return len(created)
+
+    return {'id': await idempotency.run(write, int)}
+
+
+@pytest.mark.unit
+class TestIdempotencyDependency:
+    @pytest.fixture(autouse=True)
+    def clear_created(self) -> None:
+        created.clear()
+
+    def make_client(self) -> TestClient[Litestar]:
+        return create_test_client(
+            route_handlers=[create_item],
+            dependencies={'idempotency': Provide(provide_idempotency)},
+            stores={IDEMPOTENCY_STORE: BoundedMemoryStore(max_entries=10)},
+            exception_handlers=get_exception_handlers(),
+        )
+
+    def test_idempotency_dependency_replays_retry(self) -> None:
+        with self.make_client() as client:
+            first = client.post('/items', json={'name': 'Plane'}, headers={'Idempotency-Key': 'k1'})
+            retry = client.post('/items', json={'name': 'Plane'}, headers={'Idempotency-Key': 'k1'})
+            other = client.post('/items', json={'name': 'Plane'}, headers={'Idempotency-Key': 'k2'})
+
+        assert_that(first.status_code, equal_to(HTTP_201_CREATED))
+        assert_that(retry.json(), equal_to(first.json()))
+        assert_that(other.json(), has_entries(id=2))
+        assert_that(len(created), equal_to(2))
+
+    def test_idempotency_dependency_without_header_runs_every_time(self) -> None:
+        with self.make_client() as client:
+            client.post('/items', json={'name': 'Plane'})
+            client.post('/items', json={'name': 'Plane'})
+
+        assert_that(len(created), equal_to(2))
+
+    def test_idempotency_dependency_rejects_key_reused_with_other_body(self) -> None:
+        with self.make_client() as client:
+            client.post('/items', json={'name': 'Plane'}, headers={'Idempotency-Key': 'k1'})
+            response = client.post('/items', json={'name': 'Car'}, headers={'Idempotency-Key': 'k1'})
+
+        assert_that(response.status_code, equal_to(HTTP_422_UNPROCESSABLE_ENTITY))
+        assert_that(len(created), equal_to(1))
+
+    def test_idempotency_dependency_rejects_too_long_key(self) -> None:
+        with self.make_client() as client:
+            response = client.post('/items', json={'name': 'Plane'}, headers={'Idempotency-Key': 'k' * 256})
+
+        assert_that(response.status_code, equal_to(HTTP_400_BAD_REQUEST))
+        assert_that(created, equal_to([]))
@@ -0,0 +1,38 @@
+import asyncio
+
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_length
+from litestar import Litestar
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.database import IdleConnectionValidator
+from core.database import idle_connection_validation
+
+# Nothing listens here; the tests must not open a connection.
+UNREACHABLE_URL = 'postgresql+asyncpg://postgres@127.0.0.1:1/wishlist'
+
+
+async def validator_tasks(*engines: AsyncEngine) -> set[asyncio.Task]:
+    lifespan = idle_connection_validation(*(lambda engine=engine: engine for engine in engines), interval=60)
+    before = asyncio.all_tasks()
+    async with lifespan(Litestar()):
+        return asyncio.all_tasks() - before
+
+
+@pytest.mark.unit
+class TestIdleConnectionValidation:
+    async def test_idle_connection_validation_null_pool_has_nothing_to_validate(self) -> None:
+        engine = create_async_engine(UNREACHABLE_URL, poolclass=NullPool)
+
+        assert_that(await IdleConnectionValidator(engine, interval=60).validate(), equal_to(0))
+
+    async def test_idle_connection_validation_skips_null_pool_engines(self) -> None:
+        null_pool_engine = create_async_engine(UNREACHABLE_URL, poolclass=NullPool)
+        queue_pool_engine = create_async_engine(UNREACHABLE_URL)
+
+        assert_that(await validator_tasks(null_pool_engine), has_length(0))
+        assert_that(await validator_tasks(null_pool_engine, queue_pool_engine), has_length(1))
@@ -0,0 +1,47 @@
+from hamcrest import assert_that
+from hamcrest import has_entries
+from hamcrest import has_key
+from hamcrest import is_not
+import pytest
+from sqlalchemy.pool import NullPool
+
+from core.config.database import EngineConfig as EngineSettings
+from core.config.database import HealthCheck
+from core.config.database import PoolProfile
+from core.database.sqlalchemy_config import build_engine_config
+
+
+@pytest.mark.unit
+class TestPoolProfile:
+    def test_pool_profile_direct_keeps_pool_settings(self) -> None:
+        config = build_engine_config(EngineSettings())
+
+        assert config.pool_size == 10  # noqa: PLR2004
+        assert config.pool_pre_ping is True
+        assert_that(config.connect_args['server_settings'], has_entries(jit='off'))
+        assert_that(config.connect_args, is_not(has_key('statement_cache_size')))
+
+    def test_pool_profile_direct_optimistic_health_check_skips_pre_ping(self) -> None:
+        config = build_engine_config(EngineSettings(health_check=HealthCheck.OPTIMISTIC))
+
+        assert config.pool_pre_ping is False
+
+    def test_pool_profile_transaction_pooler_uses_null_pool(self) -> None:
+        config = build_engine_config(EngineSettings(profile=PoolProfile.TRANSACTION_POOLER))
+
+        assert config.poolclass is NullPool
+        assert_that(config.connect_args, has_entries(statement_cache_size=0, prepared_statement_cache_size=0))
+        assert_that(config.connect_args['server_settings'], is_not(has_key('jit')))
+
+    def test_pool_profile_transaction_pooler_small_pool_without_pre_ping(self) -> None:
+        config = build_engine_config(EngineSettings(profile=PoolProfile.TRANSACTION_POOLER, pooler_pool_size=2))
+
+        assert config.pool_size == 2  # noqa: PLR2004
+        assert config.max_overflow == 0
+        assert config.pool_pre_ping is False
+
+    def test_pool_profile_transaction_pooler_prepared_statement_names_are_unique(self) -> None:
+        config = build_engine_config(EngineSettings(profile=PoolProfile.TRANSACTION_POOLER))
+        name = config.connect_args['prepared_statement_name_func']
+
+        assert name() != name()
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import timedelta
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+from hamcrest import assert_that
+from hamcrest import close_to
+from hamcrest import equal_to
+from litestar import post
+from litestar.di import Provide
+from litestar.status_codes import HTTP_201_CREATED
+from litestar.status_codes import HTTP_429_TOO_MANY_REQUESTS
+from litestar.stores.memory import MemoryStore
+from litestar.testing import create_test_client
+import pytest
+
+from core.config import settings
+from core.security import TelegramInitData
+from dependencies import provide_telegram_init_data
+from utils import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowStore(MemoryStore):
+    """Memory store whose reads of ``slow_key`` wait until ``release`` is set, like a round trip to a shared store."""
+
+    def __init__(self, slow_key: str) -> None:
+        super().__init__()
+        self.slow_key = slow_key
+        self.release = asyncio.Event()
+
+    async def get(self, key: str, renew_for: int | timedelta | None = None) -> bytes | None:
+        if key == self.slow_key:
+            await self.release.wait()
+        return await super().get(key, renew_for)
+
+
+def init_data_header(tg_id: int) -> dict[str, str]:
+    data = {'auth_date': str(int(time.time())), 'user': f'{{"id":{tg_id},"first_name":"Ivan"}}'}
+    data_check_string = '\n'.join(f'{k}={v}' for k, v in sorted(data.items()))
+    secret_key = hmac.new(b'WebAppData', settings.bot.token.get_secret_value().encode(), hashlib.sha256).digest()
+    data['hash'] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return {'X-Telegram-Init-Data': urlencode(data)}
+
+
+@post('/auth', dependencies={'init_data': Provide(provide_telegram_init_data)})
+async def auth(init_data: TelegramInitData) -> int:
+    return init_data['id']
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.mark.unit
+class TestTokenBucketLimiter:
+    async def test_rate_limit_allows_burst_up_to_capacity(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=3, refill_rate=0.5, clock=clock)
+        store = MemoryStore()
+
+        granted = [await limiter.acquire(store, 'user') for _ in range(3)]
+        retry_after = await limiter.acquire(store, 'user')
+
+        assert granted == [0, 0, 0]
+        assert_that(retry_after, close_to(2.0, 1e-9))
+
+    async def test_rate_limit_refills_over_time(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=1, refill_rate=0.5, clock=clock)
+        store = MemoryStore()
+        await limiter.acquire(store, 'user')
+
+        clock.now += 1
+        assert_that(await limiter.acquire(store, 'user'), close_to(1.0, 1e-9))
+        clock.now += 1
+        assert_that(await limiter.acquire(store, 'user'), equal_to(0))
+
+    async def test_rate_limit_keys_are_independent(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=1, refill_rate=0.1, clock=clock)
+        store = MemoryStore()
+
+        assert await limiter.acquire(store, 'alice') == 0
+        assert await limiter.acquire(store, 'bob') == 0
+        assert await limiter.acquire(store, 'alice') > 0
+
+    async def test_rate_limit_refill_is_capped_at_capacity(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=2, refill_rate=1, clock=clock)
+        store = MemoryStore()
+        await limiter.acquire(store, 'user')
+
+        clock.now += 100
+        granted = [await limiter.acquire(store, 'user') for _ in range(3)]
+
+        assert granted[:2] == [0, 0]
+        assert granted[2] > 0
+
+    async def test_rate_limit_keys_do_not_wait_for_each_other(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=1, refill_rate=0.1, clock=clock)
+        store = SlowStore(slow_key='alice')
+
+        alice = asyncio.create_task(limiter.acquire(store, 'alice'))
+        await asyncio.sleep(0)
+        async with asyncio.timeout(1):
+            bob = await limiter.acquire(store, 'bob')
+        store.release.set()
+
+        assert bob == 0
+        assert await alice == 0
+
+    async def test_rate_limit_serializes_one_key(self, clock: FakeClock) -> None:
+        limiter = TokenBucketLimiter(capacity=1, refill_rate=0.1, clock=clock)
+        store = SlowStore(slow_key='user')
+
+        callers = [asyncio.create_task(limiter.acquire(store, 'user')) for _ in range(2)]
+        await asyncio.sleep(0)
+        store.release.set()
+        granted, denied = sorted(await asyncio.gather(*callers))
+
+        assert granted == 0
+        assert denied > 0
+
+    def test_rate_limit_auth_dependency_rejects_with_retry_after(self) -> None:
+        with create_test_client(route_handlers=[auth]) as client:
+            statuses = [client.post('/auth', headers=init_data_header(777)).status_code for _ in range(6)]
+            limited = client.post('/auth', headers=init_data_header(777))
+            other_user = client.post('/auth', headers=init_data_header(778))
+
+        assert statuses[: settings.rate_limit.auth_capacity] == [HTTP_201_CREATED] * settings.rate_limit.auth_capacity
+        assert_that(limited.status_code, equal_to(HTTP_429_TOO_MANY_REQUESTS))
+        assert int(limited.headers['Retry-After']) >= 1
+        assert_that(other_user.status_code, equal_to(HTTP_201_CREATED))
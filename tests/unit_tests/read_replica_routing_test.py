@@ -0,0 +1,82 @@
+import asyncio
+
+from litestar import Litestar
+from litestar.stores.memory import MemoryStore
+from litestar.testing import RequestFactory
+import pytest
+
+from core.database import READ_YOUR_WRITES_STORE
+from core.database import ReadYourWritesGuard
+from core.database import pin_writer
+from core.database import should_use_replica
+from core.security import BaseJWTAuth
+
+USER_ID = 123456
+WINDOW = 0.05
+
+
+def auth_headers(user_id: int = USER_ID) -> dict[str, str]:
+    return {'Authorization': f'Bearer {BaseJWTAuth.create_token(user_id).access_token}'}
+
+
+@pytest.fixture
+def store() -> MemoryStore:
+    return MemoryStore()
+
+
+@pytest.fixture
+def guard(store: MemoryStore) -> ReadYourWritesGuard:
+    return ReadYourWritesGuard(store, window=WINDOW)
+
+
+@pytest.mark.unit
+class TestReadReplicaRouting:
+    async def test_read_your_writes_guard_pins_for_window(self, guard: ReadYourWritesGuard) -> None:
+        await guard.pin(USER_ID)
+
+        assert await guard.is_pinned(USER_ID)
+        assert not await guard.is_pinned(USER_ID + 1)
+        await asyncio.sleep(WINDOW * 2)
+        assert not await guard.is_pinned(USER_ID)
+
+    async def test_read_your_writes_guard_pins_are_shared_through_the_store(self, store: MemoryStore) -> None:
+        await ReadYourWritesGuard(store, window=5).pin(USER_ID)
+
+        assert await ReadYourWritesGuard(store, window=5).is_pinned(USER_ID)
+
+    async def test_should_use_replica_for_anonymous_get(self, guard: ReadYourWritesGuard) -> None:
+        request = RequestFactory().get('/users/1')
+
+        assert await should_use_replica(request, guard)
+
+    @pytest.mark.parametrize('method', ['post', 'patch', 'delete'])
+    async def test_should_use_replica_never_for_writes(self, guard: ReadYourWritesGuard, method: str) -> None:
+        request = getattr(RequestFactory(), method)('/gifts', headers=auth_headers())
+
+        assert not await should_use_replica(request, guard)
+
+    async def test_should_use_replica_read_your_writes(self, guard: ReadYourWritesGuard) -> None:
+        read = RequestFactory().get('/users/me/friends', headers=auth_headers())
+        other_user_read = RequestFactory().get('/users/me/friends', headers=auth_headers(USER_ID + 1))
+
+        await pin_writer(RequestFactory().post('/gifts', headers=auth_headers()), guard)
+
+        assert not await should_use_replica(read, guard)
+        assert await should_use_replica(other_user_read, guard)
+        await asyncio.sleep(WINDOW * 2)
+        assert await should_use_replica(read, guard)
+
+    async def test_read_your_writes_uses_the_app_store(self, store: MemoryStore) -> None:
+        factory = RequestFactory(app=Litestar(stores={READ_YOUR_WRITES_STORE: store}))
+
+        await pin_writer(factory.post('/gifts', headers=auth_headers()))
+
+        assert await store.get(str(USER_ID)) is not None
+        assert not await should_use_replica(factory.get('/users/me/friends', headers=auth_headers()))
+
+    async def test_pin_writer_ignores_reads_and_anonymous_writes(self, guard: ReadYourWritesGuard) -> None:
+        await pin_writer(RequestFactory().get('/users/me/friends', headers=auth_headers()), guard)
+        await pin_writer(RequestFactory().post('/users/auth'), guard)
+        await pin_writer(RequestFactory().post('/gifts', headers={'Authorization': 'Bearer invalid'}), guard)
+
+        assert not await guard.is_pinned(USER_ID)
@@ -0,0 +1,103 @@
+from dataclasses import fields
+from datetime import UTC
+from datetime import datetime
+import json
+from typing import TYPE_CHECKING
+
+from litestar.serialization import encode_json
+import msgspec
+import pytest
+
+from domain import Gift
+from domain import User
+from dto.gifts import GiftOwnerDTO
+from dto.gifts import GiftResponse
+from dto.gifts import GiftWithOwnerDTO
+from dto.gifts import GiftWithOwnerResponse
+from dto.users import FriendRequestDTO
+from dto.users import FriendRequestResponse
+from dto.users import UserResponse
+from utils import MsgspecResponse
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+NOW = datetime.now(UTC)
+
+
+def make_gift() -> Gift:
+    return Gift(
+        id=1,
+        user_id=123456,
+        name='Plane',
+        url='https://www.google.com/',
+        wish_rate=10,
+        price=1000000,
+        note='white',
+        created_at=NOW,
+        updated_at=NOW,
+        version=1,
+        is_reserved=True,
+        reserved_by=2,
+    )
+
+
+def make_user() -> User:
+    return User(123456, 'john', 'John', 'Doe', 'https://example.com/avatar.png', NOW, NOW)
+
+
+@pytest.mark.unit
+class TestResponseModels:
+    @pytest.mark.parametrize(
+        ('struct', 'dataclass'),
+        [
+            (GiftResponse, Gift),
+            (GiftWithOwnerResponse, GiftWithOwnerDTO),
+            (UserResponse, User),
+            (FriendRequestResponse, FriendRequestDTO),
+        ],
+        ids=['gift', 'gift_with_owner', 'user', 'friend_request'],
+    )
+    def test_response_models_fields_match_public_dataclass_fields(
+        self,
+        struct: type[msgspec.Struct],
+        dataclass: 'type[DataclassInstance]',
+    ) -> None:
+        public_fields = tuple(field.name for field in fields(dataclass) if not field.name.startswith('_'))
+
+        assert struct.__struct_fields__ == public_fields
+
+    def test_response_models_gift_json_matches_litestar_encoding(self) -> None:
+        gift = make_gift()
+
+        assert msgspec.json.encode(GiftResponse.from_domain(gift)) == encode_json(gift)
+
+    def test_response_models_gift_with_owner_json_matches_litestar_encoding(self) -> None:
+        gift = make_gift()
+        owner = GiftOwnerDTO('John', 'Doe', None)
+        gift_with_owner = GiftWithOwnerDTO(*(getattr(gift, field.name) for field in fields(Gift)), owner=owner)
+
+        encoded = msgspec.json.encode(GiftWithOwnerResponse.from_dto(gift_with_owner))
+
+        assert encoded == encode_json(gift_with_owner)
+
+    def test_response_models_user_json_excludes_private_fields(self) -> None:
+        payload = json.loads(msgspec.json.encode(UserResponse.from_domain(make_user())))
+
+        assert set(payload) == {
+            'tg_id',
+            'tg_username',
+            'first_name',
+            'last_name',
+            'avatar_url',
+            'created_at',
+            'updated_at',
+        }
+
+    def test_response_models_msgspec_response_renders_json(self) -> None:
+        user = make_user()
+        response = MsgspecResponse([UserResponse.from_domain(user)])
+        body = response.render(response.content, 'application/json')
+
+        assert json.loads(body)[0]['tg_id'] == user.tg_id
+        assert response.media_type == 'application/json'
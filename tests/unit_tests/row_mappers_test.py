@@ -0,0 +1,117 @@
+from datetime import UTC
+from datetime import datetime
+
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_properties
+from hamcrest import instance_of
+import pytest
+
+from domain import Gift
+from domain import User
+from dto.gifts import GiftOwnerDTO
+from dto.gifts import GiftWithOwnerDTO
+from dto.users import FriendRequestDTO
+from repositories.mappers import GIFT_COLUMNS
+from repositories.mappers import USER_COLUMNS
+from repositories.mappers import friend_request_from_row
+from repositories.mappers import gift_from_row
+from repositories.mappers import gift_with_owner_from_row
+from repositories.mappers import user_from_row
+
+NOW = datetime.now(UTC)
+GIFT_ROW = (1, 123456, 'Plane', 'https://www.google.com/', 10, 1_000_000, 'white', NOW, NOW, 3, True, 123457)
+OWNER_ROW = ('John', 'Doe', 'https://example.com/avatar.png')
+USER_ROW = (123456, 'john', 'John', 'Doe', 'https://example.com/avatar.png', NOW, NOW)
+
+
+@pytest.mark.unit
+class TestRowMappers:
+    def test_row_mappers_gift_columns_follow_dataclass_field_order(self) -> None:
+        columns = [column.strip().removeprefix('g.') for column in GIFT_COLUMNS.split(',')]
+
+        assert columns == list(Gift.__match_args__[: len(columns)])
+
+    def test_row_mappers_user_columns_follow_dataclass_field_order(self) -> None:
+        columns = [column.strip().removeprefix('u.') for column in USER_COLUMNS.split(',')]
+
+        assert columns == list(User.__match_args__[: len(columns)])
+
+    def test_row_mappers_gift_from_row(self) -> None:
+        gift = gift_from_row(GIFT_ROW)
+
+        assert_that(
+            gift,
+            has_properties(
+                id=1,
+                user_id=123456,
+                name='Plane',
+                url='https://www.google.com/',
+                wish_rate=10,
+                price=1_000_000,
+                note='white',
+                created_at=NOW,
+                updated_at=NOW,
+                version=3,
+                is_reserved=True,
+                reserved_by=123457,
+            ),
+        )
+
+    def test_row_mappers_gift_with_owner_from_row(self) -> None:
+        gift = gift_with_owner_from_row(GIFT_ROW + OWNER_ROW)
+
+        assert_that(gift, instance_of(GiftWithOwnerDTO))
+        assert_that(gift, has_properties(id=1, name='Plane', price=1_000_000, reserved_by=123457))
+        assert_that(
+            gift.owner,
+            equal_to(GiftOwnerDTO(first_name='John', last_name='Doe', avatar_url='https://example.com/avatar.png')),
+        )
+
+    def test_row_mappers_user_from_row(self) -> None:
+        user = user_from_row(USER_ROW)
+
+        assert_that(
+            user,
+            has_properties(
+                tg_id=123456,
+                tg_username='john',
+                first_name='John',
+                last_name='Doe',
+                avatar_url='https://example.com/avatar.png',
+                created_at=NOW,
+                updated_at=NOW,
+            ),
+        )
+
+    @pytest.mark.parametrize(
+        ('last_name', 'expected_name'),
+        [
+            ('Doe', 'John Doe'),
+            (None, 'John'),
+        ],
+        ids=['with_last_name', 'without_last_name'],
+    )
+    def test_row_mappers_friend_request_from_row(self, last_name: str | None, expected_name: str) -> None:
+        request = friend_request_from_row((123457, 123456, 'pending', NOW, 'John', last_name, 'john'))
+
+        assert request == FriendRequestDTO(
+            sender_tg_id=123457,
+            receiver_tg_id=123456,
+            status='pending',
+            created_at=NOW,
+            sender_name=expected_name,
+            sender_username='john',
+        )
+
+    @pytest.mark.parametrize(
+        'obj',
+        [
+            gift_from_row(GIFT_ROW),
+            gift_with_owner_from_row(GIFT_ROW + OWNER_ROW),
+            user_from_row(USER_ROW),
+        ],
+        ids=['gift', 'gift_with_owner', 'user'],
+    )
+    def test_row_mappers_objects_are_slotted(self, obj: object) -> None:
+        assert not hasattr(obj, '__dict__')
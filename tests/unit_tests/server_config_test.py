@@ -0,0 +1,24 @@
+from hamcrest import assert_that
+from hamcrest import equal_to
+import pytest
+
+from core.config.server import ServerConfig
+
+
+@pytest.mark.unit
+class TestServerConfig:
+    def test_server_config_defaults_to_single_worker(self) -> None:
+        assert_that(ServerConfig().worker_count, equal_to(1))
+
+    def test_server_config_explicit_workers(self) -> None:
+        assert_that(ServerConfig(workers=4).worker_count, equal_to(4))
+
+    def test_server_config_zero_workers_means_one_per_cpu(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr('os.cpu_count', lambda: 8)
+
+        assert_that(ServerConfig(workers=0).worker_count, equal_to(8))
+
+    def test_server_config_zero_workers_without_cpu_count(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr('os.cpu_count', lambda: None)
+
+        assert_that(ServerConfig(workers=0).worker_count, equal_to(1))
@@ -0,0 +1,51 @@
+from datetime import UTC
+from datetime import datetime
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain import User
+from exceptions.database import NotFoundInDbError
+from repositories import GiftRepository
+from repositories import UserRepository
+
+NOW = datetime.now(UTC)
+
+
+def make_user(tg_id: int) -> User:
+    return User(tg_id, 'john', 'John', 'Doe', None, NOW, NOW)
+
+
+@pytest.mark.unit
+class TestSessionLoader:
+    async def test_session_loader_user_lookups_share_one_query(self, mocker: MockerFixture) -> None:
+        session = AsyncSession()
+        get_many = mocker.patch.object(UserRepository, 'get_many', return_value=[make_user(1), make_user(2)])
+
+        first = await UserRepository(session).load_many([1, 2])
+        second = await UserRepository(session).get(2)
+
+        assert [user.tg_id for user in first] == [1, 2]
+        assert second is first[1]
+        get_many.assert_awaited_once_with([1, 2])
+
+    async def test_session_loader_is_scoped_to_session(self, mocker: MockerFixture) -> None:
+        get_many = mocker.patch.object(UserRepository, 'get_many', return_value=[make_user(1)])
+
+        await UserRepository(AsyncSession()).get(1)
+        await UserRepository(AsyncSession()).get(1)
+
+        assert get_many.await_count == 2  # noqa: PLR2004
+
+    async def test_session_loader_user_not_found(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(UserRepository, 'get_many', return_value=[])
+
+        with pytest.raises(NotFoundInDbError, match='User with id=1 not found'):
+            await UserRepository(AsyncSession()).get(1)
+
+    async def test_session_loader_users_and_gifts_are_separate(self) -> None:
+        session = AsyncSession()
+
+        assert UserRepository(session)._users is not GiftRepository(session)._gifts  # noqa: SLF001
+        assert UserRepository(session)._users is UserRepository(session)._users  # noqa: SLF001
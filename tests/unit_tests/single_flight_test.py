@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from utils import SingleFlight
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError('boom')
+        return self.calls
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    async def test_single_flight_shares_concurrent_calls(self) -> None:
+        flights: SingleFlight[int, int] = SingleFlight()
+        counter = Counter()
+
+        callers = [asyncio.create_task(flights.do(1, counter)) for _ in range(5)]
+        await asyncio.sleep(0)
+        counter.release.set()
+
+        assert await asyncio.gather(*callers) == [1] * 5
+        assert counter.calls == 1
+        assert not flights.in_flight(1)
+
+    async def test_single_flight_keys_do_not_share(self) -> None:
+        flights: SingleFlight[int, int] = SingleFlight()
+        counter = Counter()
+        counter.release.set()
+
+        await asyncio.gather(flights.do(1, counter), flights.do(2, counter))
+
+        assert counter.calls == 2  # noqa: PLR2004
+
+    async def test_single_flight_starts_a_new_call_after_completion(self) -> None:
+        flights: SingleFlight[int, int] = SingleFlight()
+        counter = Counter()
+        counter.release.set()
+
+        assert await flights.do(1, counter) == 1
+        assert await flights.do(1, counter) == 2  # noqa: PLR2004
+
+    async def test_single_flight_propagates_errors_to_every_caller(self) -> None:
+        flights: SingleFlight[int, int] = SingleFlight()
+        counter = Counter()
+        counter.fail = True
+
+        callers = [asyncio.create_task(flights.do(1, counter)) for _ in range(3)]
+        await asyncio.sleep(0)
+        counter.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert counter.calls == 1
+
+    async def test_single_flight_cancelled_caller_does_not_cancel_the_call(self) -> None:
+        flights: SingleFlight[int, int] = SingleFlight()
+        counter = Counter()
+
+        leader = asyncio.create_task(flights.do(1, counter))
+        follower = asyncio.create_task(flights.do(1, counter))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        counter.release.set()
+
+        assert await follower == 1
+        assert leader.cancelled()
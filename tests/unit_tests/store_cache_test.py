@@ -0,0 +1,43 @@
+from datetime import UTC
+from datetime import datetime
+
+from hamcrest import all_of
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import greater_than
+from hamcrest import less_than_or_equal_to
+import pytest
+
+from dto.users import WishlistStatsDTO
+from utils import BoundedMemoryStore
+from utils import StoreCache
+
+
+@pytest.mark.unit
+class TestStoreCache:
+    async def test_store_cache_round_trips_values(self) -> None:
+        cache = StoreCache(BoundedMemoryStore(max_entries=10), WishlistStatsDTO, ttl=60)
+        stats = {
+            1: WishlistStatsDTO(3, 2, datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=UTC)),
+            2: WishlistStatsDTO(0, 0, None),
+        }
+
+        await cache.set_many(stats)
+
+        assert_that(await cache.get_many([1, 2, 3]), equal_to(stats))
+
+    async def test_store_cache_delete_drops_entries(self) -> None:
+        cache = StoreCache(BoundedMemoryStore(max_entries=10), WishlistStatsDTO, ttl=60)
+        await cache.set_many({1: WishlistStatsDTO(1, 1, None), 2: WishlistStatsDTO(2, 2, None)})
+
+        await cache.delete(1, 3)
+
+        assert_that(await cache.get_many([1, 2]), equal_to({2: WishlistStatsDTO(2, 2, None)}))
+
+    async def test_store_cache_entries_expire(self) -> None:
+        store = BoundedMemoryStore(max_entries=10)
+        cache = StoreCache(store, WishlistStatsDTO, ttl=60)
+
+        await cache.set_many({1: WishlistStatsDTO(1, 1, None)})
+
+        assert_that(await store.expires_in('1'), all_of(greater_than(0), less_than_or_equal_to(60)))
@@ -0,0 +1,44 @@
+from collections.abc import AsyncIterator
+import json
+
+import msgspec
+import pytest
+
+from utils import stream_json_array
+
+
+class Item(msgspec.Struct):
+    value: int
+
+
+async def make_batches(*batches: list[int]) -> AsyncIterator[list[int]]:
+    for batch in batches:
+        yield batch
+
+
+async def collect(batches: AsyncIterator[list[int]]) -> bytes:
+    return b''.join([chunk async for chunk in stream_json_array(batches, Item)])
+
+
+@pytest.mark.unit
+class TestStreamJsonArray:
+    @pytest.mark.parametrize(
+        ('batches', 'expected'),
+        [
+            ((), []),
+            (([],), []),
+            (([1],), [{'value': 1}]),
+            (([1, 2], [3]), [{'value': 1}, {'value': 2}, {'value': 3}]),
+            (([1], [], [2]), [{'value': 1}, {'value': 2}]),
+        ],
+        ids=['no_batches', 'empty_batch', 'single_item', 'several_batches', 'empty_batch_in_between'],
+    )
+    async def test_stream_json_array_produces_valid_json(self, batches: tuple[list[int], ...], expected: list) -> None:
+        body = await collect(make_batches(*batches))
+
+        assert json.loads(body) == expected
+
+    async def test_stream_json_array_yields_chunk_per_batch(self) -> None:
+        chunks = [chunk async for chunk in stream_json_array(make_batches([1], [2]), Item)]
+
+        assert chunks == [b'[', b'{"value":1}', b',{"value":2}', b']']
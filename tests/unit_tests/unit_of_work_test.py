@@ -0,0 +1,53 @@
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories import UnitOfWork
+
+
+@pytest.fixture
+def session(mocker: MockerFixture) -> AsyncSession:
+    session = mocker.AsyncMock(spec=AsyncSession)
+    session.info = {}
+    return session
+
+
+@pytest.mark.unit
+class TestUnitOfWork:
+    async def test_unit_of_work_commits_once_on_success(self, session: AsyncSession) -> None:
+        async with UnitOfWork(session):
+            pass
+
+        session.commit.assert_awaited_once()  # ty:ignore[unresolved-attribute]
+        session.rollback.assert_not_awaited()  # ty:ignore[unresolved-attribute]
+
+    async def test_unit_of_work_nested_blocks_commit_once(self, session: AsyncSession) -> None:
+        unit_of_work = UnitOfWork(session)
+
+        async with unit_of_work:
+            async with UnitOfWork(session):
+                pass
+            session.commit.assert_not_awaited()  # ty:ignore[unresolved-attribute]
+
+        session.commit.assert_awaited_once()  # ty:ignore[unresolved-attribute]
+
+    async def test_unit_of_work_rolls_back_and_resets_identity_map_on_error(self, session: AsyncSession) -> None:
+        session.info['loaders'] = {'users': object()}
+
+        with pytest.raises(RuntimeError):
+            async with UnitOfWork(session):
+                raise RuntimeError
+
+        session.commit.assert_not_awaited()  # ty:ignore[unresolved-attribute]
+        session.rollback.assert_awaited_once()  # ty:ignore[unresolved-attribute]
+        assert 'loaders' not in session.info
+
+    async def test_unit_of_work_is_reusable(self, session: AsyncSession) -> None:
+        unit_of_work = UnitOfWork(session)
+
+        async with unit_of_work:
+            pass
+        async with unit_of_work:
+            pass
+
+        assert session.commit.await_count == 2  # ty:ignore[unresolved-attribute]  # noqa: PLR2004